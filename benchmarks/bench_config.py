@@ -0,0 +1,148 @@
+#
+#  ICRAR - International Centre for Radio Astronomy Research
+#  UWA - The University of Western Australia
+#
+#  Copyright (c) 2026.
+#  Copyright by UWA (in the framework of the ICRAR)
+#  All rights reserved
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+#  MA 02111-1307  USA
+#
+"""
+Time read_yaml, make_hierarchy and get_children on synthetic configurations
+with many keys and deep nesting.
+
+    python benchmarks/bench_config.py --keys 5000 --depth 12 --output config.json
+
+read_yaml/safe uses the C parser only when ruamel.yaml.clib is installed.
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+
+from ruamel.yaml import YAML
+
+from common_kv import FlatConfig
+from common_kv.yaml_to_kwargs import get_children, make_hierarchy, read_yaml
+from harness import add_arguments, measure, report
+
+
+def make_config(keys: int, depth: int, fan_out: int) -> dict:
+    """
+    A tree with about keys leaves: fan_out children per level, down to depth
+    levels on the first branch and shallow everywhere else
+    """
+    config = {}
+    node = config
+    for level in range(depth):
+        node = node.setdefault(f"level_{level}", {})
+        for index in range(fan_out):
+            node[f"value_{index}"] = index * 1.5
+    leaves = depth * fan_out
+    section = 0
+    while leaves < keys:
+        children = {}
+        for index in range(fan_out):
+            children[f"key_{index}"] = {
+                "name": f"section {section} key {index}",
+                "size": index,
+                "enabled": index % 2 == 0,
+                "items": [1, 2, 3],
+            }
+            leaves += 4
+        config[f"section_{section}"] = children
+        section += 1
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keys", nargs="+", type=int, default=[100, 1000, 10000])
+    parser.add_argument("--depth", type=int, default=12)
+    parser.add_argument("--fan-out", type=int, default=10)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for keys in args.keys:
+            path = Path(directory) / f"config_{keys}.yaml"
+            with open(path, "w") as file:
+                YAML().dump(make_config(keys, args.depth, args.fan_out), file)
+            with open(path) as file:
+                tree = YAML().load(file)
+            flat = make_hierarchy(tree)
+            view = FlatConfig(tree)
+            deepest = "/".join(f"level_{level}" for level in range(args.depth))
+            parameters = {"keys": keys, "depth": args.depth, "flat_keys": len(flat)}
+
+            results += [
+                measure(
+                    f"read_yaml/{keys}",
+                    lambda: read_yaml(str(path)),
+                    repeat=args.repeat,
+                    **parameters,
+                ),
+                measure(
+                    f"read_yaml/safe/{keys}",
+                    lambda: read_yaml(str(path), loader="safe"),
+                    repeat=args.repeat,
+                    **parameters,
+                ),
+                measure(
+                    f"read_yaml/cached/{keys}",
+                    lambda: read_yaml(str(path), cache=True, cache_dir=directory),
+                    repeat=args.repeat,
+                    **parameters,
+                ),
+                measure(
+                    f"make_hierarchy/{keys}",
+                    lambda: make_hierarchy(tree),
+                    repeat=args.repeat,
+                    **parameters,
+                ),
+                measure(
+                    f"flat_config/{keys}",
+                    lambda: FlatConfig(tree),
+                    repeat=args.repeat,
+                    **parameters,
+                ),
+                measure(
+                    f"flat_config/get_children/deep/{keys}",
+                    lambda: view.get_children(deepest),
+                    repeat=args.repeat,
+                    **parameters,
+                ),
+                measure(
+                    f"get_children/root/{keys}",
+                    lambda: get_children("", **flat),
+                    repeat=args.repeat,
+                    **parameters,
+                ),
+                measure(
+                    f"get_children/deep/{keys}",
+                    lambda: get_children(deepest, **flat),
+                    repeat=args.repeat,
+                    **parameters,
+                ),
+            ]
+
+    report(results, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#
+#  ICRAR - International Centre for Radio Astronomy Research
+#  UWA - The University of Western Australia
+#
+#  Copyright (c) 2026.
+#  Copyright by UWA (in the framework of the ICRAR)
+#  All rights reserved
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+#  MA 02111-1307  USA
+#
+"""
+Measure the per-tick cost of the monitor for each system backend.
+
+    python benchmarks/bench_monitoring.py --ticks 200 --children 8
+
+Pass --process-memory to include the USS, PSS and open files of each process.
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from typing import List
+
+from common_kv.monitoring import Monitor
+
+OPTIONS = ["network", "memory", "cpu", "processes"]
+
+
+def time_backend(backend: str, ticks: int, options: List[str]):
+    monitor_ = Monitor(sinks=[], monitor_options=options, backend=backend)
+    monitor_.sample()  # Warm up the caches
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    for _ in range(ticks):
+        monitor_.sample()
+    wall = (time.perf_counter() - wall_start) / ticks
+    cpu = (time.process_time() - cpu_start) / ticks
+
+    processes = len(monitor_.latest.processes)
+    monitor_.close()
+    return wall, cpu, processes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument(
+        "--children",
+        type=int,
+        default=8,
+        help="the number of child processes to track, like DataLoader workers",
+    )
+    parser.add_argument("--process-memory", action="store_true")
+    args = parser.parse_args()
+    options = OPTIONS + ["process_memory"] if args.process_memory else OPTIONS
+
+    # The children run the same executable so the monitor tracks them
+    children = [
+        subprocess.Popen([sys.executable, "-c", "import time; time.sleep(3600)"])
+        for _ in range(args.children)
+    ]
+    try:
+        results = {
+            backend: time_backend(backend, args.ticks, options)
+            for backend in ("psutil", "procfs")
+        }
+    finally:
+        for child in children:
+            child.kill()
+            child.wait()
+
+    print(f"{'backend':10} {'wall/tick':>12} {'cpu/tick':>12} {'processes':>10}")
+    for backend, (wall, cpu, processes) in results.items():
+        print(f"{backend:10} {wall * 1e6:10.0f}us {cpu * 1e6:10.0f}us {processes:10d}")
+    speedup = results["psutil"][1] / results["procfs"][1]
+    print(f"procfs uses {speedup:.1f}x less CPU per tick than psutil")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#
+#  ICRAR - International Centre for Radio Astronomy Research
+#  UWA - The University of Western Australia
+#
+#  Copyright (c) 2026.
+#  Copyright by UWA (in the framework of the ICRAR)
+#  All rights reserved
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+#  MA 02111-1307  USA
+#
+"""
+Time fit, transform and inverse_transform of the scalers over array sizes and
+dtypes. Arrays at or above --memmap-from are memory mapped .npy files.
+
+    python benchmarks/bench_scalers.py --sizes 64K 16M 2G --output scalers.json
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from humanfriendly import format_size, parse_size
+
+from common_kv.scalers import (
+    AxisMinMaxScaler,
+    FlatMinMaxScaler,
+    PercentileScaler,
+    StandardScaler,
+    StretchMinMaxScaler,
+)
+from harness import add_arguments, measure, report
+
+SCALERS = {
+    "flat": lambda: FlatMinMaxScaler((0, 1)),
+    "axis": lambda: AxisMinMaxScaler((0, 1), axis=-1),
+    "percentile": lambda: PercentileScaler((0, 1)),
+    "standard": lambda: StandardScaler(),
+    "asinh": lambda: StretchMinMaxScaler((0, 1), stretch="asinh"),
+}
+CHANNELS = 16
+
+
+def empty_array(name: str, shape, dtype, directory: Path, memmap: bool) -> np.ndarray:
+    """An uninitialised array, memory mapped to a .npy file in directory if memmap"""
+    if memmap:
+        return np.lib.format.open_memmap(
+            directory / f"{name}.npy", mode="w+", dtype=dtype, shape=shape
+        )
+    return np.empty(shape, dtype=dtype)
+
+
+def make_array(size: int, dtype, directory: Path, memmap: bool) -> np.ndarray:
+    """An array of about size bytes, CHANNELS wide, filled a chunk at a time"""
+    rows = max(1, size // (np.dtype(dtype).itemsize * CHANNELS))
+    array = empty_array(
+        f"{size}_{np.dtype(dtype).name}", (rows, CHANNELS), dtype, directory, memmap
+    )
+    rng = np.random.default_rng(0)
+    step = max(1, (16 << 20) // (np.dtype(dtype).itemsize * CHANNELS))
+    for start in range(0, rows, step):
+        chunk = array[start : start + step]
+        chunk[...] = rng.standard_normal(chunk.shape, dtype=np.float32)
+    return array
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", nargs="+", default=["64K", "4M", "64M"])
+    parser.add_argument("--dtypes", nargs="+", default=["float32", "float64"])
+    parser.add_argument("--scalers", nargs="+", default=list(SCALERS), choices=SCALERS)
+    parser.add_argument("--memmap-from", default="1G")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in map(parse_size, args.sizes):
+            for dtype in args.dtypes:
+                memmap = size >= parse_size(args.memmap_from)
+                array = make_array(size, dtype, Path(directory), memmap)
+                # The outputs live beside the input so a memory mapped run is
+                # not limited by RAM
+                output, scaled = (
+                    empty_array(role, array.shape, dtype, Path(directory), memmap)
+                    for role in ("output", "scaled")
+                )
+                parameters = {
+                    "size": size,
+                    "dtype": dtype,
+                    "memmap": memmap,
+                }
+                label = f"{format_size(size, binary=True)}/{dtype}"
+                for name in args.scalers:
+                    scaler = SCALERS[name]().fit(array)
+                    scaler.transform(array, out=scaled)
+                    results += [
+                        measure(
+                            f"{name}/fit/{label}",
+                            lambda: SCALERS[name]().fit(array),
+                            repeat=args.repeat,
+                            **parameters,
+                        ),
+                        measure(
+                            f"{name}/transform/{label}",
+                            lambda: scaler.transform(array),
+                            repeat=args.repeat,
+                            **parameters,
+                        ),
+                        measure(
+                            f"{name}/transform_out/{label}",
+                            lambda: scaler.transform(array, out=output),
+                            repeat=args.repeat,
+                            **parameters,
+                        ),
+                        measure(
+                            f"{name}/inverse_transform/{label}",
+                            lambda: scaler.inverse_transform(scaled, out=output),
+                            repeat=args.repeat,
+                            **parameters,
+                        ),
+                    ]
+                del array, output, scaled
+
+    report(results, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#
+#  ICRAR - International Centre for Radio Astronomy Research
+#  UWA - The University of Western Australia
+#
+#  Copyright (c) 2026.
+#  Copyright by UWA (in the framework of the ICRAR)
+#  All rights reserved
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+#  MA 02111-1307  USA
+#
+"""
+Shared timing, memory and baseline handling for the benchmark scripts.
+
+Each script measures a list of named cases and can save them as a JSON
+baseline, or compare them against one:
+
+    python benchmarks/bench_scalers.py --output before.json
+    python benchmarks/bench_scalers.py --baseline before.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+
+def measure(
+    name: str,
+    function: Callable[[], object],
+    setup: Optional[Callable[[], object]] = None,
+    repeat: int = 5,
+    **parameters,
+) -> Dict:
+    """
+    Time function over repeat runs, after calling setup before each one, and
+    record the peak memory traced by tracemalloc during an extra run. NumPy
+    reports its allocations to tracemalloc; memory mapped pages are not counted.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "name": name,
+        "parameters": parameters,
+        "time_min": min(times),
+        "time_median": statistics.median(times),
+        "peak_memory": peak,
+    }
+
+
+def _metadata() -> Dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "time": time.time(),
+    }
+
+
+def save_results(results: List[Dict], path: str):
+    with open(path, "w") as file:
+        json.dump({"metadata": _metadata(), "results": results}, file, indent=2)
+
+
+def compare(results: List[Dict], baseline_path: str, threshold: float) -> List[str]:
+    """
+    Print each case against the baseline and return the names of those slower
+    (by minimum time) or larger (by peak memory) than threshold times it
+    """
+    with open(baseline_path) as file:
+        baseline = {result["name"]: result for result in json.load(file)["results"]}
+
+    regressions = []
+    print(f"{'case':60} {'time':>8} {'memory':>8}")
+    for result in results:
+        before = baseline.get(result["name"])
+        if before is None:
+            print(f"{result['name']:60} {'new':>8} {'new':>8}")
+            continue
+        time_ratio = result["time_min"] / before["time_min"]
+        memory_ratio = (result["peak_memory"] + 1) / (before["peak_memory"] + 1)
+        print(f"{result['name']:60} {time_ratio:7.2f}x {memory_ratio:7.2f}x")
+        if time_ratio > threshold or memory_ratio > threshold:
+            regressions.append(result["name"])
+    return regressions
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="save the results as a JSON baseline")
+    parser.add_argument("--baseline", help="compare against a saved baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="the ratio to the baseline that counts as a regression",
+    )
+
+
+def report(results: List[Dict], args: argparse.Namespace):
+    """Print, save and compare the results as the command line asked"""
+    print(f"{'case':60} {'min':>10} {'median':>10} {'peak memory':>12}")
+    for result in results:
+        print(
+            f"{result['name']:60} {result['time_min'] * 1e3:8.3f}ms "
+            f"{result['time_median'] * 1e3:8.3f}ms {result['peak_memory']:12d}"
+        )
+    if args.output:
+        save_results(results, args.output)
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
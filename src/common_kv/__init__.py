@@ -22,8 +22,23 @@
 #  MA 02111-1307  USA
 #
 
-from .monitoring import monitor
+from .config_watcher import ConfigWatcher
+from .flat_config import FlatConfig
+from .monitoring import Monitor, monitor
 from .pytorch_lightning import get_model_path
-from .yaml_to_kwargs import read_yaml, check_keys, get_children
+from .sweeps import expand_sweeps, sweep_size
+from .yaml_to_kwargs import read_yaml, check_keys, get_children, load_all
 
-__all__ = ["read_yaml", "check_keys", "get_children", "monitor", "get_model_path"]
+__all__ = [
+    "read_yaml",
+    "load_all",
+    "expand_sweeps",
+    "sweep_size",
+    "check_keys",
+    "get_children",
+    "FlatConfig",
+    "ConfigWatcher",
+    "Monitor",
+    "monitor",
+    "get_model_path",
+]
@@ -0,0 +1,254 @@
+#
+#  ICRAR - International Centre for Radio Astronomy Research
+#  UWA - The University of Western Australia
+#
+#  Copyright (c) 2026.
+#  Copyright by UWA (in the framework of the ICRAR)
+#  All rights reserved
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+#  MA 02111-1307  USA
+#
+"""
+Reload a YAML configuration when its file changes and tell subscribers which
+keys changed:
+
+    watcher = ConfigWatcher("service.yaml", interval=2)
+    watcher.subscribe(resize_batches, keys=["inference/batch_size"])
+    with watcher:
+        serve(watcher.config)
+"""
+
+import hashlib
+import os
+import threading
+from os.path import exists
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .flat_config import FlatConfig
+from .yaml_to_kwargs import _make_yaml
+
+
+class _Missing:
+    def __repr__(self):
+        return "MISSING"
+
+
+# The old value of an added key and the new value of a removed one
+MISSING = _Missing()
+
+Changes = Dict[Any, Tuple[Any, Any]]
+
+
+def _leaves(config: FlatConfig) -> Dict:
+    """The paths holding values rather than mappings"""
+    index = config._index
+    return {
+        path: value
+        for path, value in index.values.items()
+        if path not in index.spans or not value
+    }
+
+
+def diff_configs(old: FlatConfig, new: FlatConfig) -> Changes:
+    """
+    The flattened keys whose values differ between two configs, mapped to their
+    (old, new) values, with MISSING for keys only one of them has. Mappings are
+    compared through the keys below them.
+    """
+    old_leaves = _leaves(old)
+    new_leaves = _leaves(new)
+    changes = {}
+    for path, value in old_leaves.items():
+        new_value = new_leaves.get(path, MISSING)
+        if new_value is MISSING or new_value != value:
+            changes[path] = (value, new_value)
+    for path, value in new_leaves.items():
+        if path not in old_leaves:
+            changes[path] = (MISSING, value)
+    return changes
+
+
+class ConfigWatcher:
+    """
+    Watch a YAML file and keep a read-only FlatConfig of its latest contents
+
+    Each poll costs one os.stat. The file is only read when its modification
+    time, size or inode changes, and only parsed when its contents have.
+    The first load raises, as read_yaml does, if the file cannot be read or
+    parsed. A reload that fails (while the file is half written, say) leaves
+    the current config in place and is reported through log_function.
+    """
+
+    def __init__(
+        self,
+        yaml_file: str,
+        interval: float = 1.0,
+        loader: str = "rt",
+        log_function: Callable = print,
+    ):
+        if not exists(yaml_file):
+            raise FileNotFoundError(f"Could not find the file: {yaml_file}")
+        self.yaml_file = yaml_file
+        self.interval = interval
+        self.loader = loader
+        self.log_function = log_function
+
+        self._subscribers: List[Tuple[Callable, Optional[Tuple[str, ...]]]] = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self._stat = None
+        self._digest = None
+        self._config = None
+        self.poll()
+
+    @property
+    def config(self) -> FlatConfig:
+        """The most recently loaded config"""
+        return self._config
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def subscribe(
+        self,
+        callback: Callable[[Changes, FlatConfig], None],
+        keys: Optional[Iterable[str]] = None,
+    ) -> Callable[[], None]:
+        """
+        Call callback(changes, config) after each reload that changes something
+
+        Parameters
+        ----------
+        callback
+            receives the changed keys, mapped to their (old, new) values, and
+            the new config
+        keys
+            only call back when one of these keys, or a key below one of them,
+            changes
+
+        Returns
+        -------
+            a function that unsubscribes the callback
+        """
+        subscriber = (callback, None if keys is None else tuple(keys))
+        with self._lock:
+            self._subscribers.append(subscriber)
+
+        def unsubscribe():
+            with self._lock:
+                if subscriber in self._subscribers:
+                    self._subscribers.remove(subscriber)
+
+        return unsubscribe
+
+    def poll(self) -> Optional[Changes]:
+        """
+        Reload the file if it has changed
+
+        Returns
+        -------
+            the changes, or None if the config was not reloaded
+        """
+        try:
+            stat = os.stat(self.yaml_file)
+        except OSError as error:
+            if self._config is None:
+                raise
+            self.log_function(f"Could not check {self.yaml_file}: {error}")
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if signature == self._stat:
+            return None
+
+        try:
+            with open(self.yaml_file, "rb") as file:
+                data = file.read()
+        except OSError as error:
+            if self._config is None:
+                raise
+            self.log_function(f"Could not read {self.yaml_file}: {error}")
+            return None
+        self._stat = signature
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        if digest == self._digest:
+            return None
+        self._digest = digest
+
+        try:
+            config = FlatConfig(_make_yaml(self.loader).load(data))
+        except Exception as error:
+            if self._config is None:
+                raise
+            self.log_function(f"Could not parse {self.yaml_file}: {error}")
+            return None
+
+        old_config = self._config
+        self._config = config
+        if old_config is None:
+            return None
+        changes = diff_configs(old_config, config)
+        if changes:
+            self._notify(changes, config)
+        return changes
+
+    def _notify(self, changes: Changes, config: FlatConfig):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback, keys in subscribers:
+            if keys is not None and not any(
+                str(path) == key or str(path).startswith(f"{key}/")
+                for path in changes
+                for key in keys
+            ):
+                continue
+            try:
+                callback(changes, config)
+            except Exception as error:
+                self.log_function(f"Config subscriber {callback!r} failed: {error}")
+
+    def start(self) -> "ConfigWatcher":
+        """Poll on a daemon thread every interval seconds"""
+        if self.running:
+            raise RuntimeError("The watcher is already running")
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self.run, name="common-kv-config-watcher", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the polling thread and wait for it to finish"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if not self._thread.is_alive():
+                self._thread = None
+
+    def __enter__(self) -> "ConfigWatcher":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def run(self):
+        """Poll until stopped"""
+        while not self._stop_event.wait(self.interval):
+            self.poll()
@@ -0,0 +1,148 @@
+#
+#  ICRAR - International Centre for Radio Astronomy Research
+#  UWA - The University of Western Australia
+#
+#  Copyright (c) 2026.
+#  Copyright by UWA (in the framework of the ICRAR)
+#  All rights reserved
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+#  MA 02111-1307  USA
+#
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+
+class _Index:
+    """
+    Every path in a nested tree, in the order make_hierarchy produces them,
+    with the value at each path and, for mappings, the span of their
+    descendants in that order
+    """
+
+    def __init__(self, tree: Mapping):
+        self.tree = tree
+        self.paths: List[Any] = []
+        self.values: Dict[Any, Any] = {}
+        self.spans: Dict[Any, Tuple[int, int]] = {}
+        self._walk(tree, None)
+
+    def _walk(self, node: Mapping, prefix: Optional[str]):
+        for key, value in node.items():
+            path = key if prefix is None else f"{prefix}/{key}"
+            if path not in self.values:
+                self.paths.append(path)
+            self.values[path] = value
+            if isinstance(value, dict):
+                start = len(self.paths)
+                self._walk(value, path)
+                self.spans[path] = (start, len(self.paths))
+
+
+class FlatConfig(Mapping):
+    """
+    A read-only view of a nested configuration with the same keys and values
+    as make_hierarchy: "key1", "key1/key2" and so on, where the value of a
+    mapping is itself a FlatConfig of everything below it.
+
+    The tree is stored once, with an index holding one entry per path, whereas
+    make_hierarchy copies every value into each of its ancestors. Children and
+    key checks use the index rather than scanning every key.
+    """
+
+    __slots__ = ("_index", "_prefix", "_start", "_end", "_node")
+
+    def __init__(self, tree: Mapping):
+        self._index = _Index(tree)
+        self._prefix = ""
+        self._start = 0
+        self._end = len(self._index.paths)
+        self._node = tree
+
+    @classmethod
+    def _view(cls, index: _Index, path) -> "FlatConfig":
+        view = cls.__new__(cls)
+        view._index = index
+        view._prefix = f"{path}/"
+        view._start, view._end = index.spans[path]
+        view._node = index.values[path]
+        return view
+
+    def _path(self, key):
+        return f"{self._prefix}{key}" if self._prefix else key
+
+    def __getitem__(self, key):
+        path = self._path(key)
+        try:
+            value = self._index.values[path]
+        except (KeyError, TypeError):
+            raise KeyError(key) from None
+        if path in self._index.spans:
+            return FlatConfig._view(self._index, path)
+        return value
+
+    def __contains__(self, key) -> bool:
+        try:
+            return self._path(key) in self._index.values
+        except TypeError:
+            return False
+
+    def __iter__(self) -> Iterator:
+        paths = self._index.paths
+        if not self._prefix:
+            return iter(paths)
+        length = len(self._prefix)
+        return (paths[index][length:] for index in range(self._start, self._end))
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def __repr__(self) -> str:
+        return f"FlatConfig({self._node!r})"
+
+    def get_children(self, tag: str = "") -> Optional[List]:
+        """
+        The same as get_children(tag, **config), without copying the config
+
+        Returns
+        -------
+            None if tag is not a mapping
+            A list of the keys directly below tag
+        """
+        if tag == "":
+            node = self._node
+        else:
+            path = self._path(tag)
+            if path not in self._index.spans:
+                return None
+            node = self._index.values[path]
+        return [key for key in node.keys() if "/" not in str(key)]
+
+    def check_keys(self, *keys):
+        """
+        The same as check_keys(*keys, **config), without copying the config
+
+        Throws a value exception if a key is missing
+        """
+        missing_keys = [key for key in keys if key not in self]
+        if missing_keys:
+            error_message = "\n  ".join(missing_keys)
+            raise ValueError(f"The following keys are missing:\n  {error_message}")
+
+    def to_dict(self) -> Dict:
+        """A mutable copy, as make_hierarchy would produce"""
+        return {
+            key: value.to_dict() if isinstance(value, FlatConfig) else value
+            for key, value in self.items()
+        }
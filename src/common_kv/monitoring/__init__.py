@@ -0,0 +1,99 @@
+#
+#  ICRAR - International Centre for Radio Astronomy Research
+#  UWA - The University of Western Australia
+#
+#  Copyright (c) 2021.
+#  Copyright by UWA (in the framework of the ICRAR)
+#  All rights reserved
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+#  MA 02111-1307  USA
+#
+from .backends import ProcfsBackend, PsutilBackend, get_backend
+from .collector import (
+    AgentSink,
+    ClusterView,
+    Collector,
+    NodeSample,
+    format_cluster_view,
+)
+from .gpu import (
+    FakeGpuBackend,
+    GPUtilBackend,
+    GpuBackend,
+    NvmlBackend,
+    get_gpu_backend,
+)
+from .history import History
+from .profiler import Region, RegionProfiler, default_profiler, profile_region
+from .samples import (
+    DiskSample,
+    GpuProcessSample,
+    GpuSample,
+    MemorySample,
+    MonitorSample,
+    NetworkInterfaceSample,
+    ProcessSample,
+    ProcessTreeSample,
+    Sample,
+)
+from .sampler import DEFAULT_MONITOR_OPTIONS, Monitor, monitor
+from .sinks import (
+    CsvSink,
+    JsonLinesSink,
+    PrometheusSink,
+    TextSink,
+    format_sample,
+    sample_metrics,
+)
+
+__all__ = [
+    "DEFAULT_MONITOR_OPTIONS",
+    "Monitor",
+    "monitor",
+    "PsutilBackend",
+    "ProcfsBackend",
+    "get_backend",
+    "GpuBackend",
+    "NvmlBackend",
+    "GPUtilBackend",
+    "FakeGpuBackend",
+    "get_gpu_backend",
+    "History",
+    "Region",
+    "RegionProfiler",
+    "default_profiler",
+    "profile_region",
+    "AgentSink",
+    "Collector",
+    "ClusterView",
+    "NodeSample",
+    "format_cluster_view",
+    "Sample",
+    "DiskSample",
+    "GpuSample",
+    "GpuProcessSample",
+    "MemorySample",
+    "MonitorSample",
+    "NetworkInterfaceSample",
+    "ProcessSample",
+    "ProcessTreeSample",
+    "TextSink",
+    "JsonLinesSink",
+    "CsvSink",
+    "PrometheusSink",
+    "format_sample",
+    "sample_metrics",
+]
@@ -0,0 +1,702 @@
+#
+#  ICRAR - International Centre for Radio Astronomy Research
+#  UWA - The University of Western Australia
+#
+#  Copyright (c) 2026.
+#  Copyright by UWA (in the framework of the ICRAR)
+#  All rights reserved
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+#  MA 02111-1307  USA
+#
+"""
+System backends used by ``Monitor`` to read CPU, memory, network and process
+statistics. ``PsutilBackend`` works everywhere psutil does; ``ProcfsBackend`` is
+a Linux-only fast path that reads ``/proc`` directly through file descriptors
+that are kept open between ticks.
+"""
+
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import psutil
+
+from .samples import DiskSample, MemorySample, NetworkInterfaceSample, ProcessSample
+
+
+class _RateTracker:
+    """Turn monotonically increasing counters into per-second rates"""
+
+    def __init__(self):
+        self._previous: Dict[object, Tuple[float, Tuple[int, ...]]] = {}
+
+    def update(self, key, now: float, counters: Tuple[int, ...]) -> Tuple[float, ...]:
+        previous = self._previous.get(key)
+        self._previous[key] = now, counters
+        if previous is None or now <= previous[0]:
+            return (0.0,) * len(counters)
+
+        elapsed = now - previous[0]
+        # A counter that goes backwards has wrapped or been reset
+        return tuple(
+            max(0.0, (counter - previous_) / elapsed)
+            for counter, previous_ in zip(counters, previous[1])
+        )
+
+    def retain(self, keys):
+        """Forget the counters of anything not in keys"""
+        for key in [key_ for key_ in self._previous if key_ not in keys]:
+            del self._previous[key]
+
+
+class PsutilBackend:
+    name = "psutil"
+
+    def __init__(self):
+        self._process_dictionary: Dict[int, psutil.Process] = {}
+        self._name: Optional[str] = None
+        self._names: Dict[int, str] = {}
+        self._root_process: Optional[Tuple[int, psutil.Process]] = None
+        self._network_rates = _RateTracker()
+        self._disk_rates = _RateTracker()
+        self._process_rates = _RateTracker()
+
+    @staticmethod
+    def available() -> bool:
+        return True
+
+    @staticmethod
+    def cpu_percent() -> List[float]:
+        return psutil.cpu_percent(percpu=True)
+
+    @staticmethod
+    def memory() -> MemorySample:
+        vm = psutil.virtual_memory()
+        return MemorySample(vm.total, vm.used, vm.available, vm.percent)
+
+    def network(self) -> List[NetworkInterfaceSample]:
+        now = time.monotonic()
+        io_counters = psutil.net_io_counters(pernic=True)
+        interfaces = []
+        for name, stats in psutil.net_if_stats().items():
+            counters = io_counters.get(name)
+            rates = self._network_rates.update(
+                name,
+                now,
+                (
+                    (0, 0, 0, 0)
+                    if counters is None
+                    else (
+                        counters.bytes_sent,
+                        counters.bytes_recv,
+                        counters.packets_sent,
+                        counters.packets_recv,
+                    )
+                ),
+            )
+            interfaces.append(
+                NetworkInterfaceSample(name, stats.isup, stats.speed, *rates)
+            )
+        self._network_rates.retain({interface.name for interface in interfaces})
+        return interfaces
+
+    def disk(self) -> List[DiskSample]:
+        now = time.monotonic()
+        disks = []
+        for name, counters in (psutil.disk_io_counters(perdisk=True) or {}).items():
+            rates = self._disk_rates.update(
+                name,
+                now,
+                (
+                    counters.read_bytes,
+                    counters.write_bytes,
+                    counters.read_count,
+                    counters.write_count,
+                ),
+            )
+            disks.append(DiskSample(name, *rates))
+        self._disk_rates.retain({disk.name for disk in disks})
+        return disks
+
+    def processes(
+        self, process_parent: int = 0, memory_full: bool = False
+    ) -> List[ProcessSample]:
+        # Fetch all the processes associated with me. The handles and names of
+        # the processes are cached so only new PIDs cost a lookup.
+        process_dictionary = self._process_dictionary
+        root = self._root(process_parent)
+        descendants = _descendants(root.pid)
+        for key in [key_ for key_ in self._names if key_ not in descendants]:
+            del self._names[key]
+        process_ids = [root.pid] + [
+            pid for pid in descendants if self._process_name(pid) == self._name
+        ]
+
+        # Remove dead processes from the map
+        live = set(process_ids)
+        for key in [key_ for key_ in process_dictionary if key_ not in live]:
+            del process_dictionary[key]
+        self._process_rates.retain(live)
+
+        processes = []
+        now = time.monotonic()
+        for process_id in process_ids:
+            # While fetching the processes, some of the subprocesses may exit
+            # Hence we need to put this code in try-except block
+            try:
+                p = process_dictionary.get(process_id)
+                if p is None:
+                    p = process_dictionary[process_id] = psutil.Process(process_id)
+
+                with p.oneshot():
+                    processes.append(self._process_sample(p, now, memory_full))
+
+            except psutil.Error:
+                process_dictionary.pop(process_id, None)
+
+        return processes
+
+    def _root(self, process_parent: int) -> psutil.Process:
+        if self._name is None:
+            me = psutil.Process()
+            self._name = me.name()
+            self._process_dictionary[me.pid] = me
+
+        if self._root_process is None or self._root_process[0] != process_parent:
+            process = self._process_dictionary.get(os.getpid()) or psutil.Process()
+            for _ in range(process_parent):
+                process = process.parent()
+            self._root_process = process_parent, process
+        return self._root_process[1]
+
+    def _process_name(self, pid: int) -> Optional[str]:
+        name = self._names.get(pid)
+        if name is None:
+            try:
+                name = self._names[pid] = psutil.Process(pid).name()
+            except psutil.Error:
+                pass
+        return name
+
+    def _process_sample(
+        self, p: psutil.Process, now: float, memory_full: bool
+    ) -> ProcessSample:
+        memory = None
+        if memory_full:
+            try:
+                memory = p.memory_full_info()
+            except psutil.AccessDenied:
+                pass
+        if memory is None:
+            memory = p.memory_info()
+        try:
+            io_counters = p.io_counters()
+            io = io_counters.read_bytes, io_counters.write_bytes
+        except (psutil.AccessDenied, AttributeError):
+            # Not permitted, or not supported on this platform
+            io = 0, 0
+        num_fds = None
+        if memory_full:
+            try:
+                num_fds = p.num_fds()
+            except (psutil.AccessDenied, AttributeError):
+                num_fds = 0
+        ctx_switches = p.num_ctx_switches()
+        read_rate, write_rate = self._process_rates.update(p.pid, now, io)
+
+        return ProcessSample(
+            pid=p.pid,
+            ppid=p.ppid(),
+            name=p.name(),
+            status=p.status(),
+            cpu_percent=p.cpu_percent(),
+            num_threads=p.num_threads(),
+            read_bytes_per_second=read_rate,
+            write_bytes_per_second=write_rate,
+            rss=memory.rss,
+            uss=getattr(memory, "uss", 0) if memory_full else None,
+            pss=getattr(memory, "pss", 0) if memory_full else None,
+            swap=getattr(memory, "swap", 0) if memory_full else None,
+            num_fds=num_fds,
+            voluntary_ctx_switches=ctx_switches.voluntary,
+            involuntary_ctx_switches=ctx_switches.involuntary,
+            read_bytes=io[0],
+            write_bytes=io[1],
+        )
+
+    def close(self):
+        self._process_dictionary.clear()
+        self._names.clear()
+
+
+def _children(pid: int) -> List[int]:
+    children = []
+    try:
+        tasks = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return children
+
+    for task in tasks:
+        try:
+            with open(f"/proc/{pid}/task/{task}/children", "rb") as file:
+                children.extend(int(child) for child in file.read().split())
+        except OSError:
+            pass
+    return children
+
+
+def _descendants(pid: int) -> List[int]:
+    """
+    The PIDs of all the descendants of a process. On Linux only the subtree is
+    walked through /proc/<pid>/task/<tid>/children; elsewhere psutil scans every
+    process on the machine.
+    """
+    if not os.path.exists(f"/proc/{pid}/task/{pid}/children"):
+        # Not Linux, or a kernel without CONFIG_PROC_CHILDREN
+        try:
+            return [process.pid for process in psutil.Process(pid).children(True)]
+        except psutil.Error:
+            return []
+
+    descendants = []
+    stack = _children(pid)
+    while stack:
+        child = stack.pop()
+        descendants.append(child)
+        stack.extend(_children(child))
+    return descendants
+
+
+class _ProcFile:
+    """
+    A /proc or /sys file that stays open and is re-read from the start into a
+    preallocated buffer on every tick. A closed file is reopened by the next
+    read, so a backend can be used again after close().
+    """
+
+    def __init__(self, path: str, size: int = 16384):
+        self.path = path
+        self.fd = None
+        self.fd = os.open(path, os.O_RDONLY)
+        self._buffer = bytearray(size)
+
+    def read(self) -> bytes:
+        if self.fd is None:
+            self.fd = os.open(self.path, os.O_RDONLY)
+        os.lseek(self.fd, 0, os.SEEK_SET)
+        length = 0
+        while True:
+            with memoryview(self._buffer) as view:
+                count = os.readv(self.fd, [view[length:]])
+            if count == 0:
+                break
+            length += count
+            if length == len(self._buffer):
+                self._buffer.extend(bytes(len(self._buffer)))
+
+        return bytes(self._buffer[:length])
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __del__(self):
+        self.close()
+
+
+class _ProcessFiles:
+    """
+    The open /proc/<pid> files of one process. Only the stat file is opened up
+    front; the others are opened the first time they are needed.
+    """
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.stat = _ProcFile(f"/proc/{pid}/stat", size=1024)
+        self._files: Dict[str, Optional[_ProcFile]] = {}
+
+    def _read(self, name: str) -> Optional[bytes]:
+        if name not in self._files:
+            try:
+                self._files[name] = _ProcFile(f"/proc/{self.pid}/{name}", size=4096)
+            except OSError:
+                # Another user's process or not supported by this kernel
+                self._files[name] = None
+
+        file = self._files[name]
+        if file is None:
+            return None
+        try:
+            return file.read()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _fields(data: Optional[bytes], keys: Tuple[bytes, ...]) -> Dict[bytes, int]:
+        # Parse the "Key: value" lines of the status, io and smaps_rollup files
+        fields = {}
+        if data is not None:
+            # Find the few keys wanted rather than splitting every line
+            data = b"\n" + data + b"\n"
+            for key in keys:
+                start = data.find(b"\n" + key + b":")
+                if start >= 0:
+                    start += len(key) + 2
+                    end = data.find(b"\n", start)
+                    fields[key] = int(data[start:end].split()[0])
+        return fields
+
+    def io_bytes(self) -> Tuple[int, int]:
+        fields = self._fields(self._read("io"), (b"read_bytes", b"write_bytes"))
+        return fields.get(b"read_bytes", 0), fields.get(b"write_bytes", 0)
+
+    def ctx_switches(self) -> Tuple[int, int]:
+        fields = self._fields(
+            self._read("status"),
+            (b"voluntary_ctxt_switches", b"nonvoluntary_ctxt_switches"),
+        )
+        return (
+            fields.get(b"voluntary_ctxt_switches", 0),
+            fields.get(b"nonvoluntary_ctxt_switches", 0),
+        )
+
+    def memory(self) -> Tuple[int, int, int]:
+        """The USS, PSS and swap in bytes (the same as psutil.memory_full_info)"""
+        fields = self._fields(
+            self._read("smaps_rollup"),
+            (b"Pss", b"Private_Clean", b"Private_Dirty", b"Private_Hugetlb", b"Swap"),
+        )
+        uss = (
+            fields.get(b"Private_Clean", 0)
+            + fields.get(b"Private_Dirty", 0)
+            + fields.get(b"Private_Hugetlb", 0)
+        )
+        return uss * 1024, fields.get(b"Pss", 0) * 1024, fields.get(b"Swap", 0) * 1024
+
+    def num_fds(self) -> int:
+        try:
+            return len(os.listdir(f"/proc/{self.pid}/fd"))
+        except OSError:
+            return 0
+
+    def close(self):
+        self.stat.close()
+        for file in self._files.values():
+            if file is not None:
+                file.close()
+
+
+# The same names as psutil._pslinux.PROC_STATUSES
+_PROCESS_STATUSES = {
+    b"R": "running",
+    b"S": "sleeping",
+    b"D": "disk-sleep",
+    b"T": "stopped",
+    b"t": "tracing-stop",
+    b"Z": "zombie",
+    b"X": "dead",
+    b"x": "dead",
+    b"K": "wake-kill",
+    b"W": "waking",
+    b"I": "idle",
+    b"P": "parked",
+}
+
+
+class ProcfsBackend:
+    """
+    Read the statistics straight from ``/proc`` on Linux.
+
+    The files are opened once and re-read with ``lseek``/``readv`` into
+    preallocated buffers, the CPU counters are parsed into NumPy arrays and the
+    process tree is walked through ``/proc/<pid>/task/<tid>/children`` instead
+    of scanning every process on the node.
+    """
+
+    name = "procfs"
+
+    def __init__(self):
+        self._stat = _ProcFile("/proc/stat")
+        self._meminfo = _ProcFile("/proc/meminfo")
+        self._net_dev = _ProcFile("/proc/net/dev")
+        self._diskstats = _ProcFile("/proc/diskstats")
+        self._clock_ticks = os.sysconf("SC_CLK_TCK")
+        self._page_size = os.sysconf("SC_PAGE_SIZE")
+        self._previous_cpu: Optional[np.ndarray] = None
+        self._interfaces: Dict[str, Tuple[_ProcFile, Optional[_ProcFile]]] = {}
+        self._processes: Dict[int, _ProcessFiles] = {}
+        self._network_rates = _RateTracker()
+        self._disk_rates = _RateTracker()
+        self._process_rates = _RateTracker()
+
+    @staticmethod
+    def available() -> bool:
+        return sys.platform.startswith("linux") and os.access("/proc/stat", os.R_OK)
+
+    def cpu_percent(self) -> List[float]:
+        lines = self._stat.read().split(b"\n")
+        # The aggregate "cpu" line is followed by one "cpuN" line per online core
+        cpu_lines = []
+        for line in lines[1:]:
+            if not line.startswith(b"cpu"):
+                break
+            cpu_lines.append(line)
+
+        fields = b" ".join(cpu_lines).split()
+        times = np.array(fields).reshape(len(cpu_lines), -1)[:, 1:].astype(np.int64)
+        # Guest time is already included in user and nice, so only the first 8
+        # columns count (see psutil.cpu_percent)
+        current = np.empty((len(cpu_lines), 2), dtype=np.int64)
+        current[:, 0] = times[:, :8].sum(axis=1)
+        current[:, 1] = times[:, 3] + times[:, 4]
+
+        previous = self._previous_cpu
+        self._previous_cpu = current
+        if previous is None or previous.shape != current.shape:
+            return [0.0] * len(cpu_lines)
+
+        total = current[:, 0] - previous[:, 0]
+        busy = total - (current[:, 1] - previous[:, 1])
+        percent = np.round(100.0 * busy / np.maximum(total, 1), 1)
+        return np.clip(percent, 0.0, 100.0).tolist()
+
+    def memory(self) -> MemorySample:
+        values = {}
+        for line in self._meminfo.read().split(b"\n"):
+            key, _, value = line.partition(b":")
+            if key in (b"MemTotal", b"MemFree", b"MemAvailable"):
+                values[key] = int(value.split()[0]) * 1024
+                if len(values) == 3:
+                    break
+
+        total = values[b"MemTotal"]
+        available = values.get(b"MemAvailable", values[b"MemFree"])
+        used = total - available
+        return MemorySample(
+            total=total,
+            used=used,
+            available=available,
+            percent=round(100.0 * used / total, 1) if total else 0.0,
+        )
+
+    def network(self) -> List[NetworkInterfaceSample]:
+        now = time.monotonic()
+        counters = {}
+        for line in self._net_dev.read().split(b"\n")[2:]:
+            if line:
+                name, _, fields = line.partition(b":")
+                fields = fields.split()
+                # bytes sent, bytes received, packets sent, packets received
+                counters[name.strip().decode()] = (
+                    int(fields[8]),
+                    int(fields[0]),
+                    int(fields[9]),
+                    int(fields[1]),
+                )
+        names = list(counters)
+
+        for name in [name_ for name_ in self._interfaces if name_ not in names]:
+            for file in self._interfaces.pop(name):
+                if file is not None:
+                    file.close()
+
+        interfaces = []
+        for name in names:
+            try:
+                files = self._interfaces.get(name)
+                if files is None:
+                    files = self._open_interface(name)
+                flags_file, speed_file = files
+                is_up = bool(int(flags_file.read(), 16) & 0x1)  # IFF_UP
+                speed = 0
+                if speed_file is not None:
+                    try:
+                        speed = max(0, int(speed_file.read()))
+                    except (OSError, ValueError):
+                        # Virtual interfaces have no speed
+                        pass
+            except OSError:
+                continue
+            rates = self._network_rates.update(name, now, counters[name])
+            interfaces.append(NetworkInterfaceSample(name, is_up, speed, *rates))
+
+        self._network_rates.retain(counters)
+        return interfaces
+
+    def disk(self) -> List[DiskSample]:
+        now = time.monotonic()
+        disks = []
+        for line in self._diskstats.read().split(b"\n"):
+            fields = line.split()
+            if len(fields) < 14:
+                continue
+            # See Documentation/admin-guide/iostats.rst, sectors are 512 bytes
+            name = fields[2].decode()
+            rates = self._disk_rates.update(
+                name,
+                now,
+                (
+                    int(fields[5]) * 512,
+                    int(fields[9]) * 512,
+                    int(fields[3]),
+                    int(fields[7]),
+                ),
+            )
+            disks.append(DiskSample(name, *rates))
+
+        self._disk_rates.retain({disk.name for disk in disks})
+        return disks
+
+    def _open_interface(self, name: str) -> Tuple[_ProcFile, Optional[_ProcFile]]:
+        flags_file = _ProcFile(f"/sys/class/net/{name}/flags", size=64)
+        try:
+            speed_file = _ProcFile(f"/sys/class/net/{name}/speed", size=64)
+        except OSError:
+            speed_file = None
+        self._interfaces[name] = flags_file, speed_file
+        return flags_file, speed_file
+
+    @staticmethod
+    def _parse_stat(data: bytes) -> Tuple[bytes, List[bytes]]:
+        # The name is in brackets and may itself contain spaces or brackets
+        start = data.find(b"(")
+        end = data.rfind(b")")
+        return data[start + 1 : end], data[end + 2 :].split()
+
+    def _read_stat(self, pid: int) -> Optional[Tuple[bytes, List[bytes]]]:
+        files = self._processes.get(pid)
+        if files is not None:
+            try:
+                return self._parse_stat(files.stat.read())
+            except OSError:
+                # The process has gone, the PID may have been reused
+                self._forget_process(pid)
+
+        try:
+            files = _ProcessFiles(pid)
+            data = files.stat.read()
+        except OSError:
+            return None
+        self._processes[pid] = files
+        return self._parse_stat(data)
+
+    def _forget_process(self, pid: int):
+        self._processes.pop(pid).close()
+        self._process_rates.retain(self._processes)
+
+    def processes(
+        self, process_parent: int = 0, memory_full: bool = False
+    ) -> List[ProcessSample]:
+        pid = os.getpid()
+        stat = self._read_stat(pid)
+        process_name = stat[0]
+        for _ in range(process_parent):
+            pid = int(stat[1][1])
+            stat = self._read_stat(pid)
+
+        process_ids = [pid] + _descendants(pid)
+
+        # Remove dead processes from the map
+        live = set(process_ids)
+        for key in [key_ for key_ in self._processes if key_ not in live]:
+            self._forget_process(key)
+
+        processes = []
+        now = time.monotonic()
+        for process_id in process_ids:
+            stat = self._read_stat(process_id)
+            if stat is None:
+                continue
+
+            name, fields = stat
+            if process_id != pid and name != process_name:
+                continue
+
+            # Fields are numbered from 3 (state) in proc(5)
+            cpu_ticks = int(fields[11]) + int(fields[12])
+            files = self._processes[process_id]
+            read_bytes, write_bytes = files.io_bytes()
+            # smaps_rollup walks every mapping, so it costs more the larger
+            # the process
+            uss, pss, swap = files.memory() if memory_full else (None, None, None)
+            voluntary, involuntary = files.ctx_switches()
+            tick_rate, read_rate, write_rate = self._process_rates.update(
+                process_id, now, (cpu_ticks, read_bytes, write_bytes)
+            )
+
+            processes.append(
+                ProcessSample(
+                    pid=process_id,
+                    ppid=int(fields[1]),
+                    name=name.decode(errors="replace"),
+                    status=_PROCESS_STATUSES.get(fields[0], "?"),
+                    cpu_percent=round(100.0 * tick_rate / self._clock_ticks, 1),
+                    num_threads=int(fields[17]),
+                    read_bytes_per_second=read_rate,
+                    write_bytes_per_second=write_rate,
+                    rss=int(fields[21]) * self._page_size,
+                    uss=uss,
+                    pss=pss,
+                    swap=swap,
+                    num_fds=files.num_fds() if memory_full else None,
+                    voluntary_ctx_switches=voluntary,
+                    involuntary_ctx_switches=involuntary,
+                    read_bytes=read_bytes,
+                    write_bytes=write_bytes,
+                )
+            )
+
+        return processes
+
+    def close(self):
+        for file in (self._stat, self._meminfo, self._net_dev, self._diskstats):
+            file.close()
+        for files in self._interfaces.values():
+            for file in files:
+                if file is not None:
+                    file.close()
+        for files in self._processes.values():
+            files.close()
+        self._interfaces.clear()
+        self._processes.clear()
+
+
+def get_backend(
+    backend: Union[str, PsutilBackend, ProcfsBackend] = "psutil",
+) -> Union[PsutilBackend, ProcfsBackend]:
+    """
+    Get a system backend
+
+    Parameters
+    ----------
+    backend
+        "psutil", "procfs" or a backend instance. "procfs" falls back to psutil
+        where /proc is not available.
+
+    Returns
+    -------
+        the backend
+    """
+    if not isinstance(backend, str):
+        return backend
+    if backend == "procfs":
+        return ProcfsBackend() if ProcfsBackend.available() else PsutilBackend()
+    if backend == "psutil":
+        return PsutilBackend()
+    raise ValueError(f"Unknown monitor backend: {backend}")
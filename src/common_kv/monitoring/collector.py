@@ -0,0 +1,572 @@
+#
+#  ICRAR - International Centre for Radio Astronomy Research
+#  UWA - The University of Western Australia
+#
+#  Copyright (c) 2026.
+#  Copyright by UWA (in the framework of the ICRAR)
+#  All rights reserved
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+#  MA 02111-1307  USA
+#
+"""
+Cluster-wide monitoring for multi-node jobs. Every node runs a ``Monitor`` with
+an ``AgentSink``, which sends a compact binary summary of each sample to a
+``Collector`` over TCP or a Unix socket. The collector merges the summaries
+into a ``ClusterView`` with per-node and aggregate figures and flags the
+slowest node: the one spending longest per step on its own work, computing or
+waiting for data, before the ranks synchronise.
+"""
+
+import os
+import selectors
+import socket
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from humanfriendly import format_size
+from tabulate import tabulate
+
+from .samples import GpuSample, Sample
+
+Address = Union[str, Tuple[str, int]]
+
+WIRE_VERSION = 2
+# Each frame is a 4-byte length followed by the header, the node name, the body
+# and one GPU record per GPU
+_LENGTH = struct.Struct("!I")
+# version, timestamp, steps, compute time, wait time, name length
+_HEADER = struct.Struct("<BdQddH")
+_BODY = struct.Struct("<HffQQddddfQH")
+_GPU = struct.Struct("<fQQf")  # load, memory used, memory total, temperature
+
+
+@dataclass
+class NodeSample:
+    """A summary of one node's sample. Rates are per second."""
+
+    node: str
+    timestamp: float
+    steps: int = 0
+    compute_time: float = 0.0  # Seconds spent on the steps, less collective waits
+    wait_time: float = 0.0  # Seconds spent waiting for data
+    cpu_count: int = 0
+    cpu_percent: float = 0.0  # Mean over the cores
+    cpu_max_percent: float = 0.0  # The busiest core
+    memory_used: int = 0
+    memory_total: int = 0
+    network_sent_bytes_per_second: float = 0.0
+    network_recv_bytes_per_second: float = 0.0
+    disk_read_bytes_per_second: float = 0.0
+    disk_write_bytes_per_second: float = 0.0
+    process_cpu_percent: float = 0.0
+    process_pss: int = 0
+    gpus: List[GpuSample] = field(default_factory=list)
+
+    @classmethod
+    def from_sample(
+        cls,
+        sample: Sample,
+        node: str,
+        steps: int = 0,
+        compute_time: float = 0.0,
+        wait_time: float = 0.0,
+    ) -> "NodeSample":
+        node_sample = cls(
+            node=node,
+            timestamp=sample.timestamp,
+            steps=steps,
+            compute_time=compute_time,
+            wait_time=wait_time,
+        )
+        if sample.cpu:
+            node_sample.cpu_count = len(sample.cpu)
+            node_sample.cpu_percent = sum(sample.cpu) / len(sample.cpu)
+            node_sample.cpu_max_percent = max(sample.cpu)
+        if sample.memory is not None:
+            node_sample.memory_used = sample.memory.used
+            node_sample.memory_total = sample.memory.total
+        if sample.network is not None:
+            # The loopback traffic never leaves the node
+            nics = [nic for nic in sample.network if nic.name != "lo"]
+            node_sample.network_sent_bytes_per_second = sum(
+                nic.bytes_sent_per_second for nic in nics
+            )
+            node_sample.network_recv_bytes_per_second = sum(
+                nic.bytes_recv_per_second for nic in nics
+            )
+        if sample.disk is not None:
+            # Partitions and stacked devices repeat the traffic of their disks
+            physical = _physical_disks()
+            disks = [
+                disk
+                for disk in sample.disk
+                if physical is None or disk.name in physical
+            ]
+            node_sample.disk_read_bytes_per_second = sum(
+                disk.read_bytes_per_second for disk in disks
+            )
+            node_sample.disk_write_bytes_per_second = sum(
+                disk.write_bytes_per_second for disk in disks
+            )
+        if sample.process_tree is not None:
+            node_sample.process_cpu_percent = sample.process_tree.cpu_percent
+            node_sample.process_pss = sample.process_tree.pss or 0
+        if sample.gpu is not None:
+            node_sample.gpus = list(sample.gpu)
+        return node_sample
+
+    def encode(self) -> bytes:
+        """Encode the sample as a length-prefixed frame"""
+        name = self.node.encode()
+        payload = [
+            _HEADER.pack(
+                WIRE_VERSION,
+                self.timestamp,
+                self.steps,
+                self.compute_time,
+                self.wait_time,
+                len(name),
+            ),
+            name,
+            _BODY.pack(
+                self.cpu_count,
+                self.cpu_percent,
+                self.cpu_max_percent,
+                self.memory_used,
+                self.memory_total,
+                self.network_sent_bytes_per_second,
+                self.network_recv_bytes_per_second,
+                self.disk_read_bytes_per_second,
+                self.disk_write_bytes_per_second,
+                self.process_cpu_percent,
+                self.process_pss,
+                len(self.gpus),
+            ),
+        ]
+        payload.extend(
+            _GPU.pack(gpu.load, gpu.memory_used, gpu.memory_total, gpu.temperature)
+            for gpu in self.gpus
+        )
+        payload = b"".join(payload)
+        return _LENGTH.pack(len(payload)) + payload
+
+    @classmethod
+    def decode(cls, payload: bytes) -> "NodeSample":
+        """Decode the payload of a frame (without the length prefix)"""
+        header = _HEADER.unpack_from(payload)
+        version, timestamp, steps, compute_time, wait_time, name_length = header
+        if version != WIRE_VERSION:
+            raise ValueError(f"Unsupported wire version: {version}")
+
+        offset = _HEADER.size
+        node = payload[offset : offset + name_length].decode()
+        offset += name_length
+        body = _BODY.unpack_from(payload, offset)
+        offset += _BODY.size
+
+        gpus = []
+        for index in range(body[-1]):
+            load, memory_used, memory_total, temperature = _GPU.unpack_from(
+                payload, offset
+            )
+            offset += _GPU.size
+            gpus.append(
+                GpuSample(
+                    id=index,
+                    load=load,
+                    memory_used=memory_used,
+                    memory_free=memory_total - memory_used,
+                    memory_total=memory_total,
+                    temperature=temperature,
+                )
+            )
+
+        return cls(
+            node, timestamp, steps, compute_time, wait_time, *body[:-1], gpus=gpus
+        )
+
+
+def _physical_disks(sys_block: str = "/sys/block") -> Optional[Set[str]]:
+    """
+    The names of the whole physical disks, or None where the kernel does not
+    list them. /sys/block holds whole devices only, so partitions are left out,
+    and loop, RAM, device-mapper and software RAID devices live under
+    /sys/devices/virtual.
+    """
+    try:
+        names = os.listdir(sys_block)
+    except OSError:
+        return None
+    virtual = os.sep + os.path.join("devices", "virtual") + os.sep
+    return {
+        # /proc/diskstats writes the "!" of cciss!c0d0 as "/"
+        name.replace("!", "/")
+        for name in names
+        if virtual not in os.path.realpath(os.path.join(sys_block, name))
+    }
+
+
+def _socket_family(address: Address) -> int:
+    return socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+
+
+class AgentSink:
+    """
+    A monitor sink that streams each sample to a ``Collector``.
+
+    Call ``step()`` from the training loop to report progress, with the time
+    the step spent computing and waiting for data. Under lockstep data-parallel
+    training every rank runs at the same step rate, so the collector finds the
+    straggler by these times instead; leave the time blocked in collectives out
+    of compute_time, as that is where the other ranks wait for the straggler.
+    If the collector cannot be reached the sample is dropped and the connection
+    is retried on the next tick, so a missing collector never stalls the
+    monitor.
+
+    >>> agent = AgentSink(("head-node", 9123))
+    >>> with Monitor(sleep=5, sinks=[agent]):
+    ...     fetched = time.perf_counter()
+    ...     for batch in loader:
+    ...         started = time.perf_counter()
+    ...         loss = forward_backward(batch)
+    ...         computed = time.perf_counter()
+    ...         all_reduce_and_update()
+    ...         agent.step(compute_time=computed - started, wait_time=started - fetched)
+    ...         fetched = time.perf_counter()
+    """
+
+    def __init__(
+        self,
+        address: Address,
+        node: Optional[str] = None,
+        timeout: float = 1.0,
+    ):
+        self.address = address
+        self.node = socket.gethostname() if node is None else node
+        self.timeout = timeout
+        self.steps = 0
+        self.compute_time = 0.0
+        self.wait_time = 0.0
+        self.dropped = 0
+        self._socket: Optional[socket.socket] = None
+
+    def step(self, count: int = 1, compute_time: float = 0.0, wait_time: float = 0.0):
+        """
+        Record count steps that spent compute_time seconds on the node's own
+        work and wait_time seconds waiting for data
+        """
+        self.steps += count
+        self.compute_time += compute_time
+        self.wait_time += wait_time
+
+    def __call__(self, sample: Sample):
+        frame = NodeSample.from_sample(
+            sample, self.node, self.steps, self.compute_time, self.wait_time
+        ).encode()
+        try:
+            if self._socket is None:
+                self._socket = socket.socket(_socket_family(self.address))
+                self._socket.settimeout(self.timeout)
+                self._socket.connect(self.address)
+            self._socket.sendall(frame)
+        except OSError:
+            self.dropped += 1
+            self.close()
+
+    def close(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+
+@dataclass
+class ClusterView:
+    nodes: Dict[str, NodeSample]
+    step_rates: Dict[str, float]
+    compute_times: Dict[str, float]
+    wait_times: Dict[str, float]
+    stale: List[str]
+    slowest: Optional[str]
+    total: NodeSample
+
+
+class Collector:
+    """
+    Receive samples from ``AgentSink``s and merge them into one cluster view.
+
+    The collector serves all the agents from a single background thread. Use
+    port 0 to bind to a free port and read it back from ``address``.
+
+    >>> with Collector(("0.0.0.0", 9123)) as collector:
+    ...     while training:
+    ...         time.sleep(30)
+    ...         print(format_cluster_view(collector.view()))
+    """
+
+    def __init__(self, address: Address, stale_after: float = 30.0):
+        self.stale_after = stale_after
+        self._server = socket.socket(_socket_family(address))
+        if isinstance(address, str):
+            if os.path.exists(address):
+                os.unlink(address)
+        else:
+            self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(address)
+        self._server.listen()
+        self._server.setblocking(False)
+        self.address = self._server.getsockname()
+
+        self._latest: Dict[str, NodeSample] = {}
+        self._previous: Dict[str, NodeSample] = {}
+        self._received: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "Collector":
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._serve, name="common-kv-collector", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._server.close()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+
+    def __enter__(self) -> "Collector":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _serve(self):
+        selector = selectors.DefaultSelector()
+        selector.register(self._server, selectors.EVENT_READ)
+        buffers: Dict[socket.socket, bytearray] = {}
+        try:
+            while not self._stop_event.is_set():
+                for key, _ in selector.select(timeout=0.1):
+                    if key.fileobj is self._server:
+                        connection, _ = self._server.accept()
+                        connection.setblocking(False)
+                        selector.register(connection, selectors.EVENT_READ)
+                        buffers[connection] = bytearray()
+                        continue
+
+                    connection = key.fileobj
+                    try:
+                        data = connection.recv(65536)
+                    except OSError:
+                        data = b""
+                    if not data:
+                        selector.unregister(connection)
+                        connection.close()
+                        del buffers[connection]
+                        continue
+
+                    buffer = buffers[connection]
+                    buffer.extend(data)
+                    try:
+                        self._read_frames(buffer)
+                    except (ValueError, struct.error):
+                        # Not an agent, or a different version of one
+                        selector.unregister(connection)
+                        connection.close()
+                        del buffers[connection]
+        finally:
+            for connection in buffers:
+                connection.close()
+            selector.close()
+
+    def _read_frames(self, buffer: bytearray):
+        while len(buffer) >= _LENGTH.size:
+            (length,) = _LENGTH.unpack_from(buffer)
+            if len(buffer) < _LENGTH.size + length:
+                return
+            payload = bytes(buffer[_LENGTH.size : _LENGTH.size + length])
+            del buffer[: _LENGTH.size + length]
+            self.receive(NodeSample.decode(payload))
+
+    def receive(self, node_sample: NodeSample):
+        """Add a sample from a node"""
+        with self._lock:
+            self._received[node_sample.node] = time.time()
+            previous = self._latest.get(node_sample.node)
+            if previous is not None:
+                self._previous[node_sample.node] = previous
+            self._latest[node_sample.node] = node_sample
+
+    def view(self, now: Optional[float] = None) -> ClusterView:
+        """
+        The current state of the cluster
+
+        Parameters
+        ----------
+        now
+            the current time, used to find the nodes that have gone quiet
+
+        Returns
+        -------
+        ClusterView
+            the latest sample from each node, each node's step rate and its
+            compute and data wait seconds per step, the nodes that have not
+            reported within ``stale_after`` seconds, the node spending longest
+            per step on its own work and the totals across the live nodes
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            nodes = dict(self._latest)
+            previous = dict(self._previous)
+            received = dict(self._received)
+
+        step_rates = {}
+        compute_times = {}
+        wait_times = {}
+        for name, node_sample in nodes.items():
+            before = previous.get(name)
+            if before is None:
+                continue
+            if node_sample.timestamp > before.timestamp:
+                step_rates[name] = (node_sample.steps - before.steps) / (
+                    node_sample.timestamp - before.timestamp
+                )
+            steps = node_sample.steps - before.steps
+            compute_time = node_sample.compute_time - before.compute_time
+            wait_time = node_sample.wait_time - before.wait_time
+            # Nodes that don't time their steps can't be compared
+            if steps > 0 and compute_time + wait_time > 0:
+                compute_times[name] = compute_time / steps
+                wait_times[name] = wait_time / steps
+
+        # Use the time the sample arrived so clock skew between nodes is ignored
+        stale = sorted(
+            name for name in nodes if now - received[name] > self.stale_after
+        )
+        live = [nodes[name] for name in sorted(nodes) if name not in stale]
+
+        # Lockstep ranks share one step rate, so compare the time each spends
+        # before it reaches the collectives
+        step_times = {
+            name: compute_times[name] + wait_times[name]
+            for name in compute_times
+            if name not in stale
+        }
+        slowest = max(step_times, key=step_times.get) if step_times else None
+
+        return ClusterView(
+            nodes=nodes,
+            step_rates=step_rates,
+            compute_times=compute_times,
+            wait_times=wait_times,
+            stale=stale,
+            slowest=slowest,
+            total=_total(live, now),
+        )
+
+
+def _total(nodes: List[NodeSample], now: float) -> NodeSample:
+    total = NodeSample(node="total", timestamp=now)
+    cpu_count = sum(node.cpu_count for node in nodes)
+    if cpu_count:
+        # Weight each node's mean by its number of cores
+        total.cpu_count = cpu_count
+        total.cpu_percent = (
+            sum(node.cpu_percent * node.cpu_count for node in nodes) / cpu_count
+        )
+        total.cpu_max_percent = max(node.cpu_max_percent for node in nodes)
+    total.steps = sum(node.steps for node in nodes)
+    total.compute_time = sum(node.compute_time for node in nodes)
+    total.wait_time = sum(node.wait_time for node in nodes)
+    total.memory_used = sum(node.memory_used for node in nodes)
+    total.memory_total = sum(node.memory_total for node in nodes)
+    total.network_sent_bytes_per_second = sum(
+        node.network_sent_bytes_per_second for node in nodes
+    )
+    total.network_recv_bytes_per_second = sum(
+        node.network_recv_bytes_per_second for node in nodes
+    )
+    total.disk_read_bytes_per_second = sum(
+        node.disk_read_bytes_per_second for node in nodes
+    )
+    total.disk_write_bytes_per_second = sum(
+        node.disk_write_bytes_per_second for node in nodes
+    )
+    total.process_cpu_percent = sum(node.process_cpu_percent for node in nodes)
+    total.process_pss = sum(node.process_pss for node in nodes)
+    total.gpus = [gpu for node in nodes for gpu in node.gpus]
+    return total
+
+
+def format_cluster_view(view: ClusterView, table_format: str = "psql") -> str:
+    """Render a cluster view as a table with one row per node and a total row"""
+
+    def row(node_sample: NodeSample, flag: str):
+        gpus = node_sample.gpus
+        gpu_load = sum(gpu.load for gpu in gpus) / len(gpus) if gpus else 0.0
+        step_rate = view.step_rates.get(node_sample.node)
+        compute_time = view.compute_times.get(node_sample.node)
+        wait_time = view.wait_times.get(node_sample.node)
+        return [
+            node_sample.node,
+            flag,
+            "" if step_rate is None else f"{step_rate:.2f}",
+            "" if compute_time is None else f"{compute_time * 1000:.1f} ms",
+            "" if wait_time is None else f"{wait_time * 1000:.1f} ms",
+            f"{node_sample.cpu_percent:.1f}%",
+            f"{format_size(node_sample.memory_used)} / {format_size(node_sample.memory_total)}",
+            f"{len(gpus)} @ {gpu_load * 100:.1f}%",
+            f"{format_size(sum(gpu.memory_used for gpu in gpus))}",
+            f"{format_size(node_sample.network_sent_bytes_per_second)}/s",
+            f"{format_size(node_sample.network_recv_bytes_per_second)}/s",
+        ]
+
+    table = []
+    for name in sorted(view.nodes):
+        flag = ""
+        if name in view.stale:
+            flag = "STALE"
+        elif name == view.slowest:
+            flag = "SLOWEST"
+        table.append(row(view.nodes[name], flag))
+    table.append(row(view.total, ""))
+
+    return tabulate(
+        table,
+        headers=[
+            "Node",
+            "",
+            "Steps/s",
+            "Compute/step",
+            "Wait/step",
+            "CPU",
+            "Memory",
+            "GPUs",
+            "GPU Memory",
+            "Sent",
+            "Received",
+        ],
+        tablefmt=table_format,
+    )
@@ -0,0 +1,252 @@
+#
+#  ICRAR - International Centre for Radio Astronomy Research
+#  UWA - The University of Western Australia
+#
+#  Copyright (c) 2026.
+#  Copyright by UWA (in the framework of the ICRAR)
+#  All rights reserved
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+#  MA 02111-1307  USA
+#
+"""
+GPU backends used by ``Monitor``. ``NvmlBackend`` talks to the NVIDIA driver
+in-process through pynvml and keeps the library handle open between ticks;
+``GPUtilBackend`` forks ``nvidia-smi`` on every tick and is kept as the
+fallback; ``FakeGpuBackend`` serves canned samples for testing.
+"""
+
+import math
+from typing import Dict, List, Sequence, Union
+
+import GPUtil
+
+from .samples import GpuProcessSample, GpuSample
+
+
+class GpuBackend:
+    """The interface of a GPU backend"""
+
+    name = "none"
+
+    def gpus(self) -> List[GpuSample]:
+        return []
+
+    def processes(self) -> List[GpuProcessSample]:
+        return []
+
+    def close(self):
+        pass
+
+
+class NvmlBackend(GpuBackend):
+    """
+    Read the GPUs through NVML. Requires the ``nvidia-ml-py`` package; raises an
+    ``ImportError`` if it is missing or a ``RuntimeError`` if NVML cannot be
+    initialised (e.g. no driver). After close() the next tick initialises NVML
+    again. A query the GPU does not support (e.g. on MIG devices) is reported
+    as NaN, or as no processes, rather than failing the tick.
+    """
+
+    name = "nvml"
+
+    def __init__(self):
+        import pynvml
+
+        self._nvml = pynvml
+        self._handles = None
+        self._open()
+
+    def _open(self):
+        nvml = self._nvml
+        try:
+            nvml.nvmlInit()
+        except nvml.NVMLError as e:
+            raise RuntimeError(f"Could not initialise NVML: {e}") from e
+
+        try:
+            self._handles = [
+                nvml.nvmlDeviceGetHandleByIndex(index)
+                for index in range(nvml.nvmlDeviceGetCount())
+            ]
+        except nvml.NVMLError as e:
+            nvml.nvmlShutdown()
+            raise RuntimeError(f"Could not list the GPUs: {e}") from e
+        # NVML only returns the process utilisation samples newer than this
+        self._last_seen: Dict[int, int] = {
+            index: 0 for index in range(len(self._handles))
+        }
+
+    def gpus(self) -> List[GpuSample]:
+        if self._handles is None:
+            self._open()
+        nvml = self._nvml
+        gpus = []
+        for index, handle in enumerate(self._handles):
+            utilisation = self._query(nvml.nvmlDeviceGetUtilizationRates, handle)
+            memory = self._query(nvml.nvmlDeviceGetMemoryInfo, handle)
+            temperature = self._query(
+                nvml.nvmlDeviceGetTemperature, handle, nvml.NVML_TEMPERATURE_GPU
+            )
+            gpus.append(
+                GpuSample(
+                    id=index,
+                    load=math.nan if utilisation is None else utilisation.gpu / 100.0,
+                    memory_used=0 if memory is None else memory.used,
+                    memory_free=0 if memory is None else memory.free,
+                    memory_total=0 if memory is None else memory.total,
+                    temperature=math.nan if temperature is None else float(temperature),
+                )
+            )
+        return gpus
+
+    def processes(self) -> List[GpuProcessSample]:
+        if self._handles is None:
+            self._open()
+        nvml = self._nvml
+        processes = []
+        for index, handle in enumerate(self._handles):
+            memory_used = {}
+            for query in (
+                nvml.nvmlDeviceGetComputeRunningProcesses,
+                nvml.nvmlDeviceGetGraphicsRunningProcesses,
+            ):
+                for running in self._query(query, handle) or []:
+                    # usedGpuMemory is None where the driver can't report it
+                    # (e.g. WDDM)
+                    memory_used[running.pid] = running.usedGpuMemory or 0
+
+            utilisation = {}
+            try:
+                for utilisation_sample in nvml.nvmlDeviceGetProcessUtilization(
+                    handle, self._last_seen[index]
+                ):
+                    utilisation[utilisation_sample.pid] = utilisation_sample.smUtil
+                    self._last_seen[index] = max(
+                        self._last_seen[index], utilisation_sample.timeStamp
+                    )
+            except nvml.NVMLError:
+                # No samples since the last tick, or not supported by this GPU
+                pass
+
+            processes.extend(
+                GpuProcessSample(
+                    pid=pid,
+                    gpu_id=index,
+                    memory_used=memory,
+                    utilisation=float(utilisation.get(pid, 0.0)),
+                )
+                for pid, memory in memory_used.items()
+            )
+        return processes
+
+    def _query(self, function, *args):
+        """Call an NVML query, or return None if the GPU does not support it"""
+        try:
+            return function(*args)
+        except self._nvml.NVMLError:
+            return None
+
+    def close(self):
+        if self._handles is not None:
+            self._handles = None
+            self._nvml.nvmlShutdown()
+
+
+class GPUtilBackend(GpuBackend):
+    """Read the GPUs by running ``nvidia-smi`` through GPUtil"""
+
+    name = "gputil"
+
+    def __init__(self):
+        self._available = False
+        try:
+            GPUtil.getAvailable(order="first", limit=1)
+            self._available = True
+        except ValueError:
+            pass
+
+    def gpus(self) -> List[GpuSample]:
+        if not self._available:
+            return []
+
+        # GPUtil reports the memory in MB
+        return [
+            GpuSample(
+                id=gpu.id,
+                load=gpu.load,
+                memory_used=int(gpu.memoryUsed * 1000**2),
+                memory_free=int(gpu.memoryFree * 1000**2),
+                memory_total=int(gpu.memoryTotal * 1000**2),
+                temperature=gpu.temperature,
+            )
+            for gpu in GPUtil.getGPUs()
+        ]
+
+
+class FakeGpuBackend(GpuBackend):
+    """
+    An in-memory backend for testing the GPU path on machines without GPUs.
+    Assign to ``gpu_samples`` and ``process_samples`` to change what the next
+    tick reports.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        gpu_samples: Sequence[GpuSample] = (),
+        process_samples: Sequence[GpuProcessSample] = (),
+    ):
+        self.gpu_samples = list(gpu_samples)
+        self.process_samples = list(process_samples)
+        self.closed = False
+
+    def gpus(self) -> List[GpuSample]:
+        return list(self.gpu_samples)
+
+    def processes(self) -> List[GpuProcessSample]:
+        return list(self.process_samples)
+
+    def close(self):
+        self.closed = True
+
+
+def get_gpu_backend(backend: Union[str, GpuBackend] = "auto") -> GpuBackend:
+    """
+    Get a GPU backend
+
+    Parameters
+    ----------
+    backend
+        "auto", "nvml", "gputil" or a backend instance. "auto" uses NVML if
+        pynvml is installed and a driver is present, otherwise GPUtil.
+
+    Returns
+    -------
+        the backend
+    """
+    if not isinstance(backend, str):
+        return backend
+    if backend == "nvml":
+        return NvmlBackend()
+    if backend == "gputil":
+        return GPUtilBackend()
+    if backend == "auto":
+        try:
+            return NvmlBackend()
+        except (ImportError, RuntimeError):
+            return GPUtilBackend()
+    raise ValueError(f"Unknown GPU backend: {backend}")
@@ -0,0 +1,305 @@
+#
+#  ICRAR - International Centre for Radio Astronomy Research
+#  UWA - The University of Western Australia
+#
+#  Copyright (c) 2026.
+#  Copyright by UWA (in the framework of the ICRAR)
+#  All rights reserved
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+#  MA 02111-1307  USA
+#
+import json
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .samples import Sample
+from .sinks import sample_metrics
+
+MetricKey = Tuple[str, str]
+
+
+class History:
+    """
+    A fixed-size time series store for monitor samples.
+
+    Every metric produced by ``sample_metrics`` gets its own column in a
+    preallocated ``capacity x max_columns`` array, so memory use is fixed no
+    matter how long the job runs. Once ``capacity`` samples have been recorded
+    the oldest rows are overwritten. Columns for metrics that have not been seen
+    for a full window (e.g. a worker process that has exited) are recycled.
+
+    If ``path`` is given the arrays are memory-mapped ``.npy`` files
+    (``<path>.timestamps.npy``, ``<path>.values.npy`` and the column names in
+    ``<path>.keys.json``) so long runs don't have to be kept in RAM.
+
+    A ``History`` is a sink, so it can be passed straight to ``Monitor``:
+
+    >>> history = History(capacity=86400)
+    >>> with Monitor(sleep=1, sinks=[history]):
+    ...     epoch_start = time.time()
+    ...     train_one_epoch()
+    ...     epoch_end = time.time()
+    >>> history.summary("process_tree_rss_bytes", start=epoch_start, end=epoch_end)
+    """
+
+    def __init__(
+        self,
+        capacity: int = 3600,
+        max_columns: int = 512,
+        path: Optional[str] = None,
+        dtype=np.float32,
+    ):
+        if capacity <= 0 or max_columns <= 0:
+            raise ValueError("capacity and max_columns must be positive")
+
+        self.capacity = capacity
+        self.max_columns = max_columns
+        self.path = path
+        self.dropped = 0
+
+        if path is None:
+            self._timestamps = np.full(capacity, np.nan, dtype=np.float64)
+            self._values = np.full((capacity, max_columns), np.nan, dtype=dtype)
+        else:
+            self._timestamps = np.lib.format.open_memmap(
+                f"{path}.timestamps.npy", mode="w+", dtype=np.float64, shape=(capacity,)
+            )
+            self._values = np.lib.format.open_memmap(
+                f"{path}.values.npy",
+                mode="w+",
+                dtype=dtype,
+                shape=(capacity, max_columns),
+            )
+            self._timestamps[:] = np.nan
+            self._values[:] = np.nan
+
+        self._columns: Dict[MetricKey, int] = {}
+        self._keys: List[Optional[MetricKey]] = [None] * max_columns
+        self._last_written = np.full(
+            max_columns, np.iinfo(np.int64).min, dtype=np.int64
+        )
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    def __call__(self, sample: Sample):
+        self.record(
+            sample.timestamp,
+            (
+                ((name, "" if label is None else label), value)
+                for name, _, label, value in sample_metrics(sample)
+            ),
+        )
+
+    def keys(self) -> List[MetricKey]:
+        """The (metric, label) pairs currently held"""
+        with self._lock:
+            return list(self._columns)
+
+    def record(self, timestamp: float, metrics: Iterable[Tuple[MetricKey, float]]):
+        """
+        Record one row of metrics
+
+        Parameters
+        ----------
+        timestamp
+            the time of the sample in seconds since the epoch
+        metrics
+            ((metric, label), value) pairs; use "" as the label of unlabelled metrics
+        """
+        with self._lock:
+            columns = []
+            values = []
+            for key, value in metrics:
+                column = self._columns.get(key)
+                if column is None:
+                    column = self._allocate_column(key)
+                    if column is None:
+                        self.dropped += 1
+                        continue
+                columns.append(column)
+                values.append(value)
+
+            row = self._count % self.capacity
+            self._timestamps[row] = timestamp
+            self._values[row] = np.nan
+            self._values[row, columns] = values
+            self._last_written[columns] = self._count
+            self._count += 1
+
+    def _allocate_column(self, key: MetricKey) -> Optional[int]:
+        # A column is free if it has never been used or all of its values have
+        # already been overwritten by newer rows
+        free = np.flatnonzero(self._last_written <= self._count - self.capacity)
+        if len(free) == 0:
+            return None
+
+        column = int(free[0])
+        old_key = self._keys[column]
+        if old_key is not None:
+            del self._columns[old_key]
+        self._keys[column] = key
+        self._columns[key] = column
+        self._values[:, column] = np.nan
+        self._last_written[column] = self._count
+
+        if self.path is not None:
+            with open(f"{self.path}.keys.json", "w") as file:
+                json.dump(self._keys, file)
+        return column
+
+    def _window(self, start: Optional[float], end: Optional[float]) -> np.ndarray:
+        # The rows in chronological order, restricted to start <= time <= end
+        if self._count <= self.capacity:
+            rows = np.arange(self._count)
+        else:
+            head = self._count % self.capacity
+            rows = np.concatenate((np.arange(head, self.capacity), np.arange(0, head)))
+
+        timestamps = self._timestamps[rows]
+        first = 0 if start is None else np.searchsorted(timestamps, start, "left")
+        last = len(rows) if end is None else np.searchsorted(timestamps, end, "right")
+        return rows[first:last]
+
+    def query(
+        self,
+        metric: str,
+        label: str = "",
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the raw values of a metric
+
+        Parameters
+        ----------
+        metric
+            the metric name, e.g. "memory_used_bytes"
+        label
+            the label value, e.g. the cpu number or interface name
+        start
+            only include samples at or after this time
+        end
+            only include samples at or before this time
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            the timestamps and the values (NaN where the metric was missing)
+        """
+        with self._lock:
+            column = self._columns.get((metric, label))
+            rows = self._window(start, end)
+            timestamps = self._timestamps[rows]
+            if column is None:
+                return timestamps, np.full(len(rows), np.nan)
+            return timestamps, np.asarray(self._values[rows, column])
+
+    def summary(
+        self,
+        metric: str,
+        label: str = "",
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> Dict[str, float]:
+        """
+        The min, mean and max of a metric over a time window
+
+        Returns
+        -------
+        Dict[str, float]
+            {"min": ..., "mean": ..., "max": ..., "count": ...}; the statistics
+            are NaN if the metric was not recorded in the window
+        """
+        _, values = self.query(metric, label, start, end)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return {"min": np.nan, "mean": np.nan, "max": np.nan, "count": 0}
+
+        return {
+            "min": float(values.min()),
+            "mean": float(values.mean(dtype=np.float64)),
+            "max": float(values.max()),
+            "count": len(values),
+        }
+
+    def downsample(
+        self,
+        metric: str,
+        interval: float,
+        label: str = "",
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Downsample a metric into fixed time buckets
+
+        Parameters
+        ----------
+        metric
+            the metric name
+        interval
+            the bucket width in seconds
+        label
+            the label value
+        start
+            only include samples at or after this time
+        end
+            only include samples at or before this time
+
+        Returns
+        -------
+        Dict[str, np.ndarray]
+            "time" (the start of each bucket), "min", "mean", "max" and "count"
+            arrays with one entry per non-empty bucket
+        """
+        timestamps, values = self.query(metric, label, start, end)
+        valid = ~np.isnan(values)
+        timestamps = timestamps[valid]
+        values = values[valid].astype(np.float64)
+        if len(values) == 0:
+            empty = np.empty(0)
+            return {
+                "time": empty,
+                "min": empty,
+                "mean": empty,
+                "max": empty,
+                "count": empty,
+            }
+
+        origin = timestamps[0] if start is None else start
+        buckets = np.floor((timestamps - origin) / interval).astype(np.int64)
+        # The rows are in time order so each bucket is a contiguous run
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        counts = np.diff(np.r_[starts, len(values)])
+
+        return {
+            "time": origin + buckets[starts] * interval,
+            "min": np.minimum.reduceat(values, starts),
+            "mean": np.add.reduceat(values, starts) / counts,
+            "max": np.maximum.reduceat(values, starts),
+            "count": counts,
+        }
+
+    def flush(self):
+        """Flush a memory-mapped history to disk"""
+        if self.path is not None:
+            self._timestamps.flush()
+            self._values.flush()
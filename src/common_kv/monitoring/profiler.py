@@ -0,0 +1,296 @@
+#
+#  ICRAR - International Centre for Radio Astronomy Research
+#  UWA - The University of Western Australia
+#
+#  Copyright (c) 2026.
+#  Copyright by UWA (in the framework of the ICRAR)
+#  All rights reserved
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+#  MA 02111-1307  USA
+#
+"""
+Time and measure named regions of code:
+
+    with profile_region("dataload"):
+        batch = next(loader)
+
+    @profile_region("forward")
+    def forward(batch):
+        ...
+
+    print(default_profiler.format_table())
+"""
+
+import functools
+import json
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Union
+
+from humanfriendly import format_size
+from tabulate import tabulate
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ru_maxrss is in KiB on Linux and bytes on macOS
+_MAXRSS_SCALE = 1 if sys.platform == "darwin" else 1024
+
+
+def _max_rss() -> int:
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _MAXRSS_SCALE
+
+
+class _RegionStats:
+    """The running totals of one region, updated in place on every exit"""
+
+    __slots__ = (
+        "count",
+        "wall_total",
+        "wall_min",
+        "wall_max",
+        "cpu_total",
+        "rss_increase_total",
+        "rss_increase_max",
+        "traced_peak_max",
+    )
+
+    def __init__(self):
+        self.count = 0
+        self.wall_total = 0.0
+        self.wall_min = float("inf")
+        self.wall_max = 0.0
+        self.cpu_total = 0.0
+        self.rss_increase_total = 0
+        self.rss_increase_max = 0
+        self.traced_peak_max = 0
+
+
+class Region:
+    """
+    One named region. Use it as a context manager or a decorator; each
+    ``with`` block or decorated call is measured separately.
+    """
+
+    __slots__ = (
+        "_profiler",
+        "_stats",
+        "name",
+        "_wall",
+        "_cpu",
+        "_rss",
+        "_traced",
+        "_traced_peak",
+    )
+
+    def __init__(self, profiler: "RegionProfiler", name: str):
+        self._profiler = profiler
+        self._stats = profiler._stats_for(name)
+        self.name = name
+
+    def __enter__(self) -> "Region":
+        if self._profiler.trace_memory:
+            self._traced = self._profiler._push_traced(self)
+        self._rss = _max_rss()
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        rss = _max_rss() - self._rss
+        traced_peak = (
+            self._profiler._pop_traced(self) - self._traced
+            if self._profiler.trace_memory
+            else 0
+        )
+
+        stats = self._stats
+        with self._profiler._lock:
+            stats.count += 1
+            stats.wall_total += wall
+            if wall < stats.wall_min:
+                stats.wall_min = wall
+            if wall > stats.wall_max:
+                stats.wall_max = wall
+            stats.cpu_total += cpu
+            stats.rss_increase_total += rss
+            if rss > stats.rss_increase_max:
+                stats.rss_increase_max = rss
+            if traced_peak > stats.traced_peak_max:
+                stats.traced_peak_max = traced_peak
+
+    def __call__(self, function: Callable) -> Callable:
+        profiler = self._profiler
+        name = self.name
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with Region(profiler, name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+
+class RegionProfiler:
+    """
+    Aggregate the wall time, process CPU time and memory of named regions.
+
+    The memory figures are the increase in the process's peak RSS (from
+    ``getrusage``) during the region and, with ``trace_memory=True``, the peak
+    Python allocation traced by ``tracemalloc`` above what was allocated when
+    the region started. Tracing slows allocation-heavy code down, so it is off
+    by default.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self._stats: Dict[str, _RegionStats] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def region(self, name: str) -> Region:
+        return Region(self, name)
+
+    def _stats_for(self, name: str) -> _RegionStats:
+        stats = self._stats.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(name, _RegionStats())
+        return stats
+
+    def _push_traced(self, region: Region) -> int:
+        # tracemalloc has a single peak, so it is reset for every region and the
+        # peaks of inner regions are carried over to the enclosing one
+        stack = self._local.__dict__.setdefault("stack", [])
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1]._traced_peak = max(stack[-1]._traced_peak, peak)
+        tracemalloc.reset_peak()
+        region._traced_peak = current
+        stack.append(region)
+        return current
+
+    def _pop_traced(self, region: Region) -> int:
+        stack = self._local.stack
+        _, peak = tracemalloc.get_traced_memory()
+        peak = max(region._traced_peak, peak)
+        stack.pop()
+        if stack:
+            stack[-1]._traced_peak = max(stack[-1]._traced_peak, peak)
+        return peak
+
+    def reset(self):
+        with self._lock:
+            for stats in self._stats.values():
+                stats.__init__()
+
+    def summary(self) -> List[Dict[str, Union[str, int, float]]]:
+        """
+        The statistics of every region that has run, slowest (by total wall
+        time) first. Times are in seconds and memory in bytes.
+        """
+        with self._lock:
+            regions = [
+                {
+                    "name": name,
+                    "count": stats.count,
+                    "wall_total": stats.wall_total,
+                    "wall_mean": stats.wall_total / stats.count,
+                    "wall_min": stats.wall_min,
+                    "wall_max": stats.wall_max,
+                    "cpu_total": stats.cpu_total,
+                    "cpu_mean": stats.cpu_total / stats.count,
+                    "rss_increase_total": stats.rss_increase_total,
+                    "rss_increase_max": stats.rss_increase_max,
+                    "traced_peak_max": stats.traced_peak_max,
+                }
+                for name, stats in self._stats.items()
+                if stats.count > 0
+            ]
+        return sorted(regions, key=lambda region: region["wall_total"], reverse=True)
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.summary(), **kwargs)
+
+    def format_table(self, table_format: str = "psql") -> str:
+        table = [
+            [
+                region["name"],
+                region["count"],
+                f"{region['wall_total']:.3f}",
+                f"{region['wall_mean'] * 1000:.3f}",
+                f"{region['wall_max'] * 1000:.3f}",
+                f"{region['cpu_total']:.3f}",
+                format_size(region["rss_increase_max"]),
+                format_size(region["traced_peak_max"]) if self.trace_memory else "",
+            ]
+            for region in self.summary()
+        ]
+        return tabulate(
+            table,
+            headers=[
+                "Region",
+                "Count",
+                "Wall (s)",
+                "Mean (ms)",
+                "Max (ms)",
+                "CPU (s)",
+                "Peak RSS Increase",
+                "Traced Peak",
+            ],
+            tablefmt=table_format,
+        )
+
+
+default_profiler = RegionProfiler()
+
+
+def profile_region(
+    name: Union[str, Callable, None] = None,
+    profiler: Optional[RegionProfiler] = None,
+):
+    """
+    Measure a region of code with a ``RegionProfiler``
+
+    Parameters
+    ----------
+    name
+        the name of the region. When used as a bare decorator the function's
+        qualified name is used.
+    profiler
+        the profiler to record into; defaults to ``default_profiler``
+
+    Returns
+    -------
+        a ``Region`` to use as a context manager or decorator, or the wrapped
+        function when used as a bare decorator
+    """
+    profiler = default_profiler if profiler is None else profiler
+    if callable(name):
+        return Region(profiler, name.__qualname__)(name)
+    if name is None:
+        raise ValueError("A region needs a name")
+    return Region(profiler, name)
@@ -0,0 +1,344 @@
+#
+#  ICRAR - International Centre for Radio Astronomy Research
+#  UWA - The University of Western Australia
+#
+#  Copyright (c) 2021.
+#  Copyright by UWA (in the framework of the ICRAR)
+#  All rights reserved
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+#  MA 02111-1307  USA
+#
+import math
+import threading
+from typing import Callable, List, Optional, Sequence, Union
+
+import psutil
+import time
+
+from .backends import PsutilBackend, ProcfsBackend, get_backend
+from .gpu import GpuBackend, get_gpu_backend
+from .samples import MonitorSample, ProcessTreeSample, Sample
+from .sinks import TextSink
+
+DEFAULT_MONITOR_OPTIONS = (
+    "battery",
+    "network",
+    "disk",
+    "memory",
+    "cpu",
+    "processes",
+    "gpu",
+)
+
+
+class _AdaptiveInterval:
+    """
+    Choose the time to the next tick: shorten it while the metrics are moving
+    quickly, lengthen it while they are steady, and never let the monitor's own
+    CPU cost exceed the overhead budget.
+    """
+
+    # The relative change between ticks that counts as fast or steady
+    FAST = 0.05
+    STEADY = 0.01
+
+    def __init__(self, min_sleep: float, max_sleep: float, overhead_budget: float):
+        self.min_sleep = min_sleep
+        self.max_sleep = max_sleep
+        self.overhead_budget = overhead_budget
+        self.interval = max_sleep
+        self._previous: Optional[Sample] = None
+
+    @staticmethod
+    def change(previous: Sample, sample: Sample) -> float:
+        """The largest relative change of the memory, CPU and process tree"""
+        changes = [0.0]
+        if sample.memory is not None and previous.memory is not None:
+            changes.append(
+                abs(sample.memory.used - previous.memory.used)
+                / max(sample.memory.total, 1)
+            )
+        if sample.cpu and previous.cpu and len(sample.cpu) == len(previous.cpu):
+            changes.append(
+                sum(abs(a - b) for a, b in zip(sample.cpu, previous.cpu))
+                / (100.0 * len(sample.cpu))
+            )
+        if sample.process_tree is not None and previous.process_tree is not None:
+            changes.append(
+                abs(sample.process_tree.rss - previous.process_tree.rss)
+                / max(previous.process_tree.rss, 1)
+            )
+        return max(changes)
+
+    def update(self, sample: Sample, tick_cpu_time: float) -> float:
+        if self._previous is not None:
+            change = self.change(self._previous, sample)
+            if change > self.FAST:
+                self.interval /= 2
+            elif change < self.STEADY:
+                self.interval *= 1.5
+        self._previous = sample
+
+        # The budget wins over min_sleep and max_sleep
+        budget_floor = tick_cpu_time / self.overhead_budget
+        self.interval = max(
+            min(max(self.interval, self.min_sleep), self.max_sleep), budget_floor
+        )
+        return self.interval
+
+
+class Monitor:
+    """
+    Sample the system at a fixed cadence, either in the calling thread (``run``)
+    or on a daemon thread (``start``/``stop``).
+
+    The cadence is anchored to the time the monitor started, so the time taken
+    to collect and log a sample does not accumulate as drift. If a sample takes
+    longer than ``sleep`` the missed ticks are skipped rather than bunched up.
+
+    Each tick produces a ``Sample`` of raw numbers which is passed to every sink.
+    By default the only sink is a ``TextSink`` that logs the familiar tables via
+    ``log_function``; pass ``sinks=[]`` to skip formatting altogether and just
+    read ``latest``.
+
+    The statistics are read through ``backend``: "psutil" (the default) or
+    "procfs", a lower-overhead Linux fast path that falls back to psutil on
+    other platforms. GPUs are read through ``gpu_backend``: "auto" (NVML if
+    pynvml is installed, otherwise GPUtil), "nvml", "gputil" or a ``GpuBackend``
+    such as ``FakeGpuBackend``.
+
+    The "processes" option reports the CPU, RSS and I/O of the process tree.
+    Add "process_memory" for the USS, PSS, swap and open files of each process
+    too; these read ``smaps_rollup``, whose cost grows with the process's
+    memory, so leave it off when sampling several times a second.
+
+    Every sample records the monitor's own wall and CPU time. With
+    ``adaptive=True`` the interval moves between ``min_sleep`` and ``sleep``:
+    it halves while memory, CPU or the process tree are changing quickly and
+    grows again once they settle, and it is always long enough to keep the
+    monitor's CPU use under ``overhead_budget`` (a fraction of one core).
+
+    Examples
+    --------
+    >>> with Monitor(sleep=10, log_function=logger.info) as monitor_:
+    ...     train_one_epoch()
+    >>> monitor_.latest
+    """
+
+    def __init__(
+        self,
+        sleep: float = 5,
+        log_function=print,
+        table_format: str = "psql",
+        iterations: Optional[int] = None,
+        process_parent=0,
+        monitor_options: List[str] = DEFAULT_MONITOR_OPTIONS,
+        sinks: Optional[Sequence[Callable[[Sample], None]]] = None,
+        backend: Union[str, PsutilBackend, ProcfsBackend] = "psutil",
+        gpu_backend: Union[str, GpuBackend] = "auto",
+        adaptive: bool = False,
+        min_sleep: float = 0.5,
+        overhead_budget: float = 0.005,
+    ):
+        if overhead_budget <= 0:
+            raise ValueError("overhead_budget must be positive")
+        self.sleep = sleep
+        self.iterations = iterations
+        self.process_parent = process_parent
+        self.monitor_options = monitor_options
+        self.sinks = (
+            [TextSink(log_function, table_format)] if sinks is None else list(sinks)
+        )
+
+        self._backend = get_backend(backend)
+        self._gpu_backend = (
+            get_gpu_backend(gpu_backend) if "gpu" in monitor_options else GpuBackend()
+        )
+        self._adaptive = (
+            _AdaptiveInterval(min_sleep, sleep, overhead_budget) if adaptive else None
+        )
+        self.interval = sleep
+        # An exponentially weighted average of the CPU time of a whole tick
+        self._tick_cpu_time = None
+        self._latest = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def latest(self) -> Optional[Sample]:
+        """The most recent sample, or None if nothing has been sampled yet"""
+        return self._latest
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "Monitor":
+        """Start sampling on a daemon thread"""
+        if self.running:
+            raise RuntimeError("The monitor is already running")
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self.run, name="common-kv-monitor", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop the sampling thread and wait for it to finish
+
+        Parameters
+        ----------
+        timeout
+            the maximum time to wait for the thread; None waits for the sample
+            in progress (if any) to complete
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if not self._thread.is_alive():
+                self._thread = None
+
+    def close(self):
+        """Stop the monitor and release the backend's resources"""
+        self.stop()
+        self._backend.close()
+        self._gpu_backend.close()
+
+    def __enter__(self) -> "Monitor":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def run(self):
+        """Sample until stopped or the iterations are exhausted"""
+        iterations = self.iterations
+        next_time = time.monotonic()
+        while not self._stop_event.is_set():
+            self.sample()
+
+            if iterations is not None:
+                iterations -= 1
+                if iterations <= 0:
+                    break
+
+            # Wait until the next tick on the schedule, skipping any that have
+            # already passed
+            interval = self.interval
+            next_time += interval
+            now = time.monotonic()
+            if next_time < now and interval > 0:
+                next_time += math.ceil((now - next_time) / interval) * interval
+
+            if self._stop_event.wait(max(0.0, next_time - now)):
+                break
+
+    def sample(self) -> Sample:
+        """Take one sample, pass it to the sinks and return it"""
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        monitor_options = self.monitor_options
+        sample = Sample(timestamp=time.time())
+
+        if "battery" in monitor_options:
+            sample.battery = self._sample_battery()
+        if "network" in monitor_options:
+            sample.network = self._backend.network()
+        if "disk" in monitor_options:
+            sample.disk = self._backend.disk()
+        if "memory" in monitor_options:
+            sample.memory = self._backend.memory()
+        if "cpu" in monitor_options:
+            sample.cpu = self._backend.cpu_percent()
+        if "gpu" in monitor_options:
+            sample.gpu = self._gpu_backend.gpus()
+            sample.gpu_processes = self._gpu_backend.processes()
+        if "processes" in monitor_options:
+            sample.processes = self._backend.processes(
+                self.process_parent, "process_memory" in monitor_options
+            )
+            sample.process_tree = ProcessTreeSample.from_processes(sample.processes)
+
+        sample.monitor = MonitorSample(
+            wall_time=time.perf_counter() - wall_start,
+            cpu_time=time.thread_time() - cpu_start,
+            interval=self.interval,
+            cpu_fraction=(
+                0.0
+                if self._tick_cpu_time is None or self.interval <= 0
+                else self._tick_cpu_time / self.interval
+            ),
+        )
+
+        self._latest = sample
+        for sink in self.sinks:
+            sink(sample)
+
+        tick_cpu_time = time.thread_time() - cpu_start
+        self._tick_cpu_time = (
+            tick_cpu_time
+            if self._tick_cpu_time is None
+            else 0.8 * self._tick_cpu_time + 0.2 * tick_cpu_time
+        )
+        if self._adaptive is not None:
+            self.interval = self._adaptive.update(sample, self._tick_cpu_time)
+        return sample
+
+    @staticmethod
+    def _sample_battery() -> float:
+        battery = psutil.sensors_battery()
+        return math.nan if battery is None else battery.percent
+
+
+def monitor(
+    sleep: int = 5,
+    log_function=print,
+    table_format: str = "psql",
+    iterations: Optional[int] = None,
+    process_parent=0,
+    monitor_options: List[str] = DEFAULT_MONITOR_OPTIONS,
+    sinks: Optional[Sequence[Callable[[Sample], None]]] = None,
+    backend: Union[str, PsutilBackend, ProcfsBackend] = "psutil",
+    gpu_backend: Union[str, GpuBackend] = "auto",
+    adaptive: bool = False,
+    min_sleep: float = 0.5,
+    overhead_budget: float = 0.005,
+):
+    """
+    Monitor the system in the calling thread. Use ``Monitor`` to sample in the
+    background instead.
+    """
+    monitor_ = Monitor(
+        sleep=sleep,
+        log_function=log_function,
+        table_format=table_format,
+        iterations=iterations,
+        process_parent=process_parent,
+        monitor_options=monitor_options,
+        sinks=sinks,
+        backend=backend,
+        gpu_backend=gpu_backend,
+        adaptive=adaptive,
+        min_sleep=min_sleep,
+        overhead_budget=overhead_budget,
+    )
+    try:
+        monitor_.run()
+    finally:
+        monitor_.close()
@@ -0,0 +1,172 @@
+#
+#  ICRAR - International Centre for Radio Astronomy Research
+#  UWA - The University of Western Australia
+#
+#  Copyright (c) 2026.
+#  Copyright by UWA (in the framework of the ICRAR)
+#  All rights reserved
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+#  MA 02111-1307  USA
+#
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+
+@dataclass
+class NetworkInterfaceSample:
+    name: str
+    is_up: bool
+    speed: int  # The NIC speed in Mbit/s as reported by psutil
+    bytes_sent_per_second: float = 0.0
+    bytes_recv_per_second: float = 0.0
+    packets_sent_per_second: float = 0.0
+    packets_recv_per_second: float = 0.0
+
+
+@dataclass
+class DiskSample:
+    name: str
+    read_bytes_per_second: float
+    write_bytes_per_second: float
+    read_iops: float
+    write_iops: float
+
+
+@dataclass
+class MemorySample:
+    total: int
+    used: int
+    available: int
+    percent: float
+
+
+@dataclass
+class GpuSample:
+    id: int
+    load: float  # 0.0 - 1.0
+    memory_used: int
+    memory_free: int
+    memory_total: int
+    temperature: float
+
+
+@dataclass
+class GpuProcessSample:
+    pid: int
+    gpu_id: int
+    memory_used: int
+    utilisation: float  # The SM utilisation, 0 - 100
+
+
+@dataclass
+class ProcessSample:
+    pid: int
+    ppid: int
+    name: str
+    status: str
+    cpu_percent: float
+    num_threads: int
+    read_bytes_per_second: float = 0.0
+    write_bytes_per_second: float = 0.0
+    rss: int = 0
+    # The USS, PSS, swap and open files are None unless the "process_memory"
+    # monitor option is on, as reading them is the costliest part of a sample
+    uss: Optional[int] = None  # Memory unique to the process, freed when it exits
+    pss: Optional[int] = None  # Shared pages split between the sharers
+    swap: Optional[int] = None
+    num_fds: Optional[int] = None
+    voluntary_ctx_switches: int = 0
+    involuntary_ctx_switches: int = 0
+    read_bytes: int = 0
+    write_bytes: int = 0
+
+
+def _sum_optional(values: Iterable[Optional[int]]) -> Optional[int]:
+    """The sum of the values, or None if any of them was not collected"""
+    total = 0
+    for value in values:
+        if value is None:
+            return None
+        total += value
+    return total
+
+
+@dataclass
+class ProcessTreeSample:
+    """
+    Totals across the tracked process tree (e.g. a trainer and its DataLoader
+    workers). Summing RSS counts copy-on-write pages shared by forked workers
+    once per worker; the PSS total is the real footprint of the tree.
+    """
+
+    count: int
+    cpu_percent: float
+    num_threads: int
+    rss: int
+    uss: Optional[int]
+    pss: Optional[int]
+    swap: Optional[int]
+    num_fds: Optional[int]
+    read_bytes_per_second: float
+    write_bytes_per_second: float
+
+    @classmethod
+    def from_processes(cls, processes: List[ProcessSample]) -> "ProcessTreeSample":
+        return cls(
+            count=len(processes),
+            cpu_percent=sum(p.cpu_percent for p in processes),
+            num_threads=sum(p.num_threads for p in processes),
+            rss=sum(p.rss for p in processes),
+            uss=_sum_optional(p.uss for p in processes),
+            pss=_sum_optional(p.pss for p in processes),
+            swap=_sum_optional(p.swap for p in processes),
+            num_fds=_sum_optional(p.num_fds for p in processes),
+            read_bytes_per_second=sum(p.read_bytes_per_second for p in processes),
+            write_bytes_per_second=sum(p.write_bytes_per_second for p in processes),
+        )
+
+
+@dataclass
+class MonitorSample:
+    """The monitor's own cost"""
+
+    wall_time: float  # Seconds spent collecting this sample
+    cpu_time: float  # CPU seconds spent collecting this sample
+    interval: float  # Seconds until the next sample
+    cpu_fraction: float  # Recent CPU cost per tick (sinks included) / interval
+
+
+@dataclass
+class Sample:
+    """
+    One tick of the monitor. All sizes are in bytes and all percentages are
+    0 - 100 unless stated otherwise. Rates are averaged over the time since the
+    previous tick and are zero on the first tick. A section that was not
+    requested in the monitor options is None; a battery that was requested but
+    is not present is NaN.
+    """
+
+    timestamp: float
+    battery: Optional[float] = None
+    network: Optional[List[NetworkInterfaceSample]] = None
+    disk: Optional[List[DiskSample]] = None
+    memory: Optional[MemorySample] = None
+    cpu: Optional[List[float]] = None
+    gpu: Optional[List[GpuSample]] = None
+    gpu_processes: Optional[List[GpuProcessSample]] = None
+    processes: Optional[List[ProcessSample]] = None
+    process_tree: Optional[ProcessTreeSample] = None
+    monitor: Optional[MonitorSample] = None
@@ -0,0 +1,541 @@
+#
+#  ICRAR - International Centre for Radio Astronomy Research
+#  UWA - The University of Western Australia
+#
+#  Copyright (c) 2026.
+#  Copyright by UWA (in the framework of the ICRAR)
+#  All rights reserved
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+#  MA 02111-1307  USA
+#
+"""
+Sinks receive each ``Sample`` from the monitor. A sink is any callable that
+takes a ``Sample``; the classes here render the sample as text, JSON Lines, CSV
+or the Prometheus text exposition format.
+"""
+
+import csv
+import json
+import math
+import os
+from collections import OrderedDict
+from dataclasses import asdict
+from datetime import datetime
+from typing import Iterator, Optional, TextIO, Tuple
+
+from humanfriendly import format_size
+from tabulate import tabulate
+
+from .samples import Sample
+
+
+def _format_optional_size(size: Optional[int]) -> str:
+    # Blank for the sizes that were not collected
+    return "" if size is None else format_size(size)
+
+
+def format_sample(sample: Sample, table_format: str = "psql") -> str:
+    """
+    Render a sample as the human-readable tables ``monitor`` has always logged
+
+    Parameters
+    ----------
+    sample
+        the sample to render
+    table_format
+        the tabulate table format
+
+    Returns
+    -------
+    str
+        the formatted tables
+    """
+    log_string = (
+        f"{os.linesep}============================Process Monitor============================"
+        + f"{os.linesep}{datetime.fromtimestamp(sample.timestamp).strftime('%Y-%m-%d %H:%M:%S')}"
+        + f"{os.linesep}"
+    )
+
+    if sample.battery is not None:
+        log_string += f"----Battery Available----{os.linesep}"
+        if math.isnan(sample.battery):
+            log_string += f"No battery data found{os.linesep}"
+        else:
+            log_string += f"{sample.battery:.1f}%{os.linesep}"
+
+    if sample.network is not None:
+        log_string += f"----Networks----{os.linesep}"
+        table = [
+            [
+                nic.name,
+                "Up" if nic.is_up else "Down",
+                format_size(nic.speed),
+                f"{format_size(nic.bytes_sent_per_second)}/s",
+                f"{format_size(nic.bytes_recv_per_second)}/s",
+                f"{nic.packets_sent_per_second:.1f}",
+                f"{nic.packets_recv_per_second:.1f}",
+            ]
+            for nic in sample.network
+        ]
+        log_string += (
+            tabulate(
+                table,
+                headers=[
+                    "Network",
+                    "Status",
+                    "Speed",
+                    "Sent",
+                    "Received",
+                    "Packets Sent/s",
+                    "Packets Received/s",
+                ],
+                tablefmt=table_format,
+            )
+            + os.linesep
+        )
+
+    if sample.disk is not None:
+        log_string += f"----Disks----{os.linesep}"
+        table = [
+            [
+                disk.name,
+                f"{format_size(disk.read_bytes_per_second)}/s",
+                f"{format_size(disk.write_bytes_per_second)}/s",
+                f"{disk.read_iops:.1f}",
+                f"{disk.write_iops:.1f}",
+            ]
+            for disk in sample.disk
+        ]
+        log_string += (
+            tabulate(
+                table,
+                headers=["Disk", "Read", "Write", "Read IOPS", "Write IOPS"],
+                tablefmt=table_format,
+            )
+            + os.linesep
+        )
+
+    if sample.memory is not None:
+        log_string += f"----Memory----{os.linesep}"
+        vm = sample.memory
+        log_string += (
+            tabulate(
+                [
+                    [
+                        format_size(vm.total),
+                        format_size(vm.used),
+                        format_size(vm.available),
+                        f"{vm.percent}%",
+                    ]
+                ],
+                headers=["Total", "Used", "Available", "Percentage"],
+                tablefmt=table_format,
+            )
+            + os.linesep
+        )
+
+    if sample.cpu is not None:
+        log_string += f"----CPU----{os.linesep}"
+        log_string += (
+            tabulate(
+                [[f"{cpu_}%" for cpu_ in sample.cpu]],
+                headers=[f"CPU{i+1:02d}" for i in range(len(sample.cpu))],
+                tablefmt=table_format,
+            )
+            + os.linesep
+        )
+
+    if sample.gpu is not None:
+        log_string += f"----GPU----{os.linesep}"
+        if sample.gpu:
+            gpu_data = [
+                [
+                    gpu.id,
+                    f"{gpu.load * 100:.1f}%",
+                    format_size(gpu.memory_used),
+                    format_size(gpu.memory_free),
+                    format_size(gpu.memory_total),
+                    f"{gpu.temperature:.1f}C",
+                ]
+                for gpu in sample.gpu
+            ]
+            log_string += (
+                tabulate(
+                    gpu_data,
+                    headers=[
+                        "ID",
+                        "Load",
+                        "Memory Used",
+                        "Memory Free",
+                        "Memory Total",
+                        "Temperature",
+                    ],
+                    tablefmt=table_format,
+                )
+                + os.linesep
+            )
+        else:
+            log_string += f"No GPU data found{os.linesep}"
+
+    if sample.gpu_processes:
+        log_string += f"----GPU Processes----{os.linesep}"
+        log_string += (
+            tabulate(
+                [
+                    [
+                        p.pid,
+                        p.gpu_id,
+                        format_size(p.memory_used),
+                        f"{p.utilisation:.1f}%",
+                    ]
+                    for p in sample.gpu_processes
+                ],
+                headers=["PID", "GPU", "Memory Used", "Utilisation"],
+                tablefmt=table_format,
+            )
+            + os.linesep
+        )
+
+    if sample.processes is not None:
+        log_string += f"----Processes----{os.linesep}"
+        process_table = [
+            [
+                p.pid,
+                p.ppid,
+                p.name,
+                p.status,
+                f"{p.cpu_percent}%",
+                p.num_threads,
+                f"{format_size(p.read_bytes_per_second)}/s",
+                f"{format_size(p.write_bytes_per_second)}/s",
+                format_size(p.rss),
+                _format_optional_size(p.uss),
+                _format_optional_size(p.pss),
+                "" if p.num_fds is None else p.num_fds,
+                f"{p.voluntary_ctx_switches}/{p.involuntary_ctx_switches}",
+            ]
+            for p in sample.processes
+        ]
+        tree = sample.process_tree
+        if tree is not None and tree.count > 1:
+            process_table.append(
+                [
+                    "TOTAL",
+                    "",
+                    f"{tree.count} processes",
+                    "",
+                    f"{tree.cpu_percent:.1f}%",
+                    tree.num_threads,
+                    f"{format_size(tree.read_bytes_per_second)}/s",
+                    f"{format_size(tree.write_bytes_per_second)}/s",
+                    format_size(tree.rss),
+                    _format_optional_size(tree.uss),
+                    _format_optional_size(tree.pss),
+                    "" if tree.num_fds is None else tree.num_fds,
+                    "",
+                ]
+            )
+        log_string += (
+            tabulate(
+                process_table,
+                headers=[
+                    "PID",
+                    "PPID",
+                    "PNAME",
+                    "STATUS",
+                    "CPU",
+                    "NUM THREADS",
+                    "READ",
+                    "WRITE",
+                    "RSS",
+                    "USS",
+                    "PSS",
+                    "FDS",
+                    "CTX SWITCHES",
+                ],
+                tablefmt=table_format,
+            )
+            + os.linesep
+        )
+
+    if sample.monitor is not None:
+        log_string += (
+            f"----Monitor----{os.linesep}"
+            f"Sampled in {sample.monitor.wall_time * 1000:.1f} ms "
+            f"({sample.monitor.cpu_time * 1000:.1f} ms CPU), "
+            f"interval {sample.monitor.interval:.2f} s, "
+            f"{sample.monitor.cpu_fraction * 100:.2f}% of a core{os.linesep}"
+        )
+
+    log_string += (
+        "======================================================================="
+    )
+    return log_string
+
+
+def sample_metrics(
+    sample: Sample,
+) -> Iterator[Tuple[str, Optional[str], Optional[str], float]]:
+    """
+    Flatten a sample into numeric metrics
+
+    Parameters
+    ----------
+    sample
+        the sample to flatten
+
+    Returns
+    -------
+    Iterator
+        (metric name, label name, label value, value) tuples. The label name and
+        value are None for metrics that only have a single value.
+    """
+    if sample.battery is not None and not math.isnan(sample.battery):
+        yield "battery_percent", None, None, sample.battery
+
+    if sample.network is not None:
+        for nic in sample.network:
+            yield "network_up", "interface", nic.name, int(nic.is_up)
+            yield "network_speed_mbps", "interface", nic.name, nic.speed
+            yield (
+                "network_sent_bytes_per_second",
+                "interface",
+                nic.name,
+                nic.bytes_sent_per_second,
+            )
+            yield (
+                "network_received_bytes_per_second",
+                "interface",
+                nic.name,
+                nic.bytes_recv_per_second,
+            )
+            yield (
+                "network_sent_packets_per_second",
+                "interface",
+                nic.name,
+                nic.packets_sent_per_second,
+            )
+            yield (
+                "network_received_packets_per_second",
+                "interface",
+                nic.name,
+                nic.packets_recv_per_second,
+            )
+
+    if sample.disk is not None:
+        for disk in sample.disk:
+            name = disk.name
+            yield "disk_read_bytes_per_second", "disk", name, disk.read_bytes_per_second
+            yield "disk_write_bytes_per_second", "disk", name, disk.write_bytes_per_second
+            yield "disk_read_iops", "disk", name, disk.read_iops
+            yield "disk_write_iops", "disk", name, disk.write_iops
+
+    if sample.memory is not None:
+        yield "memory_total_bytes", None, None, sample.memory.total
+        yield "memory_used_bytes", None, None, sample.memory.used
+        yield "memory_available_bytes", None, None, sample.memory.available
+        yield "memory_percent", None, None, sample.memory.percent
+
+    if sample.cpu is not None:
+        for index, cpu_percent in enumerate(sample.cpu):
+            yield "cpu_percent", "cpu", str(index), cpu_percent
+
+    if sample.gpu is not None:
+        for gpu in sample.gpu:
+            gpu_id = str(gpu.id)
+            yield "gpu_load_ratio", "gpu", gpu_id, gpu.load
+            yield "gpu_memory_used_bytes", "gpu", gpu_id, gpu.memory_used
+            yield "gpu_memory_free_bytes", "gpu", gpu_id, gpu.memory_free
+            yield "gpu_memory_total_bytes", "gpu", gpu_id, gpu.memory_total
+            yield "gpu_temperature_celsius", "gpu", gpu_id, gpu.temperature
+
+    if sample.gpu_processes is not None:
+        for process in sample.gpu_processes:
+            gpu_pid = f"{process.gpu_id}:{process.pid}"
+            yield "gpu_process_memory_used_bytes", "gpu_pid", gpu_pid, process.memory_used
+            yield "gpu_process_utilisation_percent", "gpu_pid", gpu_pid, process.utilisation
+
+    if sample.processes is not None:
+        for process in sample.processes:
+            pid = str(process.pid)
+            yield "process_cpu_percent", "pid", pid, process.cpu_percent
+            yield "process_num_threads", "pid", pid, process.num_threads
+            yield (
+                "process_read_bytes_per_second",
+                "pid",
+                pid,
+                process.read_bytes_per_second,
+            )
+            yield (
+                "process_write_bytes_per_second",
+                "pid",
+                pid,
+                process.write_bytes_per_second,
+            )
+            yield "process_rss_bytes", "pid", pid, process.rss
+            if process.pss is not None:
+                yield "process_uss_bytes", "pid", pid, process.uss
+                yield "process_pss_bytes", "pid", pid, process.pss
+                yield "process_swap_bytes", "pid", pid, process.swap
+                yield "process_open_fds", "pid", pid, process.num_fds
+            yield (
+                "process_voluntary_ctx_switches",
+                "pid",
+                pid,
+                process.voluntary_ctx_switches,
+            )
+            yield (
+                "process_involuntary_ctx_switches",
+                "pid",
+                pid,
+                process.involuntary_ctx_switches,
+            )
+            yield "process_read_bytes", "pid", pid, process.read_bytes
+            yield "process_write_bytes", "pid", pid, process.write_bytes
+
+    if sample.monitor is not None:
+        yield "monitor_wall_seconds", None, None, sample.monitor.wall_time
+        yield "monitor_cpu_seconds", None, None, sample.monitor.cpu_time
+        yield "monitor_interval_seconds", None, None, sample.monitor.interval
+        yield "monitor_cpu_fraction", None, None, sample.monitor.cpu_fraction
+
+    if sample.process_tree is not None:
+        tree = sample.process_tree
+        yield "process_tree_count", None, None, tree.count
+        yield "process_tree_cpu_percent", None, None, tree.cpu_percent
+        yield "process_tree_num_threads", None, None, tree.num_threads
+        yield "process_tree_rss_bytes", None, None, tree.rss
+        if tree.pss is not None:
+            yield "process_tree_uss_bytes", None, None, tree.uss
+            yield "process_tree_pss_bytes", None, None, tree.pss
+            yield "process_tree_swap_bytes", None, None, tree.swap
+            yield "process_tree_open_fds", None, None, tree.num_fds
+        yield (
+            "process_tree_read_bytes_per_second",
+            None,
+            None,
+            tree.read_bytes_per_second,
+        )
+        yield (
+            "process_tree_write_bytes_per_second",
+            None,
+            None,
+            tree.write_bytes_per_second,
+        )
+
+
+class TextSink:
+    """Log the sample as human-readable tables"""
+
+    def __init__(self, log_function=print, table_format: str = "psql"):
+        self.log_function = log_function
+        self.table_format = table_format
+
+    def __call__(self, sample: Sample):
+        self.log_function(format_sample(sample, self.table_format))
+
+
+def _finite(value):
+    # JSON has no NaN or Infinity, so write non-finite floats as null
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_finite(item) for item in value]
+    return value
+
+
+class JsonLinesSink:
+    """
+    Write each sample as one JSON object per line. Non-finite values, such as
+    the NaN of a missing battery, are written as null.
+    """
+
+    def __init__(self, stream: TextIO, flush: bool = True):
+        self.stream = stream
+        self.flush = flush
+
+    def __call__(self, sample: Sample):
+        self.stream.write(
+            json.dumps(_finite(asdict(sample)), separators=(",", ":"), allow_nan=False)
+        )
+        self.stream.write("\n")
+        if self.flush:
+            self.stream.flush()
+
+
+class CsvSink:
+    """
+    Write the samples as CSV in long form, one row per metric:
+    ``timestamp,metric,label,value``. The long form keeps the columns stable as
+    processes, interfaces and GPUs come and go.
+    """
+
+    HEADER = ("timestamp", "metric", "label", "value")
+
+    def __init__(self, stream: TextIO, write_header: bool = True, flush: bool = True):
+        self.stream = stream
+        self.flush = flush
+        self._writer = csv.writer(stream)
+        if write_header:
+            self._writer.writerow(self.HEADER)
+
+    def __call__(self, sample: Sample):
+        self._writer.writerows(
+            (sample.timestamp, name, "" if label is None else label, value)
+            for name, _, label, value in sample_metrics(sample)
+        )
+        if self.flush:
+            self.stream.flush()
+
+
+class PrometheusSink:
+    """
+    Render the latest sample in the Prometheus text exposition format.
+
+    The rendered text is kept in ``text`` so it can be served over HTTP. If a
+    path is given the text is also written there atomically, which suits the
+    node_exporter textfile collector.
+    """
+
+    def __init__(self, path: Optional[str] = None, prefix: str = "common_kv"):
+        self.path = path
+        self.prefix = prefix
+        self.text = ""
+
+    def __call__(self, sample: Sample):
+        # The exposition format requires all the samples of a metric together
+        families = OrderedDict()
+        for name, label_name, label_value, value in sample_metrics(sample):
+            if label_name is None:
+                line = f"{self.prefix}_{name} {value}"
+            else:
+                label_value = label_value.replace("\\", "\\\\").replace('"', '\\"')
+                line = f'{self.prefix}_{name}{{{label_name}="{label_value}"}} {value}'
+            families.setdefault(name, []).append(line)
+
+        lines = []
+        for name, family in families.items():
+            lines.append(f"# TYPE {self.prefix}_{name} gauge")
+            lines.extend(family)
+        self.text = "\n".join(lines) + "\n"
+
+        if self.path is not None:
+            temporary_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temporary_path, "w") as file:
+                file.write(self.text)
+            os.replace(temporary_path, self.path)
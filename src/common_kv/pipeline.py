@@ -0,0 +1,163 @@
+#
+#  ICRAR - International Centre for Radio Astronomy Research
+#  UWA - The University of Western Australia
+#
+#  Copyright (c) 2026.
+#  Copyright by UWA (in the framework of the ICRAR)
+#  All rights reserved
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+#  MA 02111-1307  USA
+#
+"""
+Apply a fitted scaler to a whole dataset of .npy files, writing the results to
+memory mapped .npy files a chunk at a time.
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Union
+
+import numpy as np
+
+ArrayOrPath = Union[np.ndarray, str, Path]
+
+
+def _open_input(array: ArrayOrPath) -> np.ndarray:
+    if isinstance(array, (str, Path)):
+        return np.load(array, mmap_mode="r")
+    return np.asanyarray(array)
+
+
+def _open_output(output: ArrayOrPath, shape, dtype) -> np.ndarray:
+    if isinstance(output, (str, Path)):
+        return np.lib.format.open_memmap(output, mode="w+", dtype=dtype, shape=shape)
+    if output.shape != shape:
+        raise ValueError(f"Output has shape {output.shape}, expected {shape}")
+    return output
+
+
+def transform_files(
+    scaler,
+    inputs: Sequence[ArrayOrPath],
+    outputs: Sequence[ArrayOrPath],
+    inverse: bool = False,
+    dtype=None,
+    chunk_bytes: int = 64 << 20,
+    workers: int = 4,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> List[np.ndarray]:
+    """
+    Transform every input with a fitted scaler into the matching output
+
+    Each input is split into chunks along its first axis. A worker thread reads
+    a chunk into its own buffer, transforms it in place and writes it to the
+    output, so reading, transforming and writing of different chunks overlap.
+    At most 2 * workers chunks are in memory at once.
+
+    Parameters
+    ----------
+    scaler
+        a fitted scaler from common_kv.scalers. Its parameters must broadcast
+        over the first axis.
+    inputs
+        arrays (including ``np.memmap``) or paths to ``.npy`` files, which are
+        memory mapped
+    outputs
+        paths of the ``.npy`` files to create, or preallocated arrays
+    inverse
+        apply inverse_transform instead of transform
+    dtype
+        the dtype of the outputs; defaults to that of the input if it is
+        floating point and float64 if not
+    chunk_bytes
+        the approximate size of a chunk
+    workers
+        the number of threads
+    progress
+        called with the bytes done and the total bytes after each chunk
+
+    Returns
+    -------
+        the outputs, as memory maps for the paths
+    """
+    if len(inputs) != len(outputs):
+        raise ValueError(f"There are {len(inputs)} inputs but {len(outputs)} outputs")
+    if (
+        np.ndim(getattr(scaler, "_scale_factor", None)) > 0
+        and np.shape(scaler._scale_factor)[0] > 1
+    ):
+        raise ValueError("The scaler's parameters vary along the first axis")
+
+    arrays = [_open_input(array) for array in inputs]
+    total = sum(array.nbytes for array in arrays)
+    done = 0
+    lock = threading.Lock()
+    slots = threading.BoundedSemaphore(2 * workers)
+    function = scaler.inverse_transform if inverse else scaler.transform
+
+    def process(source, target, chunk_dtype):
+        nonlocal done
+        try:
+            buffer = np.array(source, dtype=chunk_dtype)
+            function(buffer, inplace=True)
+            target[...] = buffer
+            with lock:
+                done += source.nbytes
+                if progress is not None:
+                    progress(done, total)
+        finally:
+            slots.release()
+
+    results = []
+    with ThreadPoolExecutor(workers) as executor:
+        futures = deque()
+        for array, output in zip(arrays, outputs):
+            output_dtype = dtype
+            if output_dtype is None:
+                output_dtype = (
+                    array.dtype
+                    if np.issubdtype(array.dtype, np.floating)
+                    else np.float64
+                )
+            result = _open_output(output, array.shape, output_dtype)
+            results.append(result)
+
+            source = array.reshape(1) if array.ndim == 0 else array
+            target = result.reshape(1) if result.ndim == 0 else result
+            row_bytes = max(1, source.nbytes // max(1, len(source)))
+            rows = max(1, chunk_bytes // row_bytes)
+            for start in range(0, len(source), rows):
+                slots.acquire()
+                futures.append(
+                    executor.submit(
+                        process,
+                        source[start : start + rows],
+                        target[start : start + rows],
+                        output_dtype,
+                    )
+                )
+                # Fail early rather than after the whole dataset
+                while futures and futures[0].done():
+                    futures.popleft().result()
+        for future in futures:
+            future.result()
+
+    for result in results:
+        if isinstance(result, np.memmap):
+            result.flush()
+    return results
@@ -21,11 +21,222 @@
 #  Foundation, Inc., 59 Temple Place, Suite 330, Boston,
 #  MA 02111-1307  USA
 #
+import copy
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Tuple
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Union
 
 import numpy as np
 
+# Elements reduced at a time, so a block stays in the L2 cache while both the
+# minimum and maximum are taken
+_BLOCK_SIZE = 1 << 16
+# Elements handed to a worker thread at a time
+_TASK_SIZE = 1 << 22
+
+
+def _as_numpy(array) -> np.ndarray:
+    """
+    A NumPy view of an array's memory. NumPy arrays (including memmaps) pass
+    straight through, and other CPU arrays, such as torch tensors and array API
+    arrays, are shared through DLPack or __array__ rather than copied.
+    """
+    if isinstance(array, np.ndarray):
+        return array
+    if hasattr(array, "__dlpack__"):
+        try:
+            return np.from_dlpack(array)
+        except (BufferError, RuntimeError, TypeError, ValueError):
+            # Not on the CPU, or a dtype NumPy lacks
+            pass
+    return np.asanyarray(array)
+
+
+def _namespace(array):
+    """The namespace of a non-NumPy array, used to hand results back as its type"""
+    if isinstance(array, np.ndarray):
+        return None
+    if hasattr(array, "__array_namespace__"):
+        return array.__array_namespace__()
+    # torch tensors have no __array_namespace__, but torch has from_dlpack
+    module = sys.modules.get(type(array).__module__.partition(".")[0])
+    if module is not None and hasattr(module, "from_dlpack"):
+        return module
+    return None
+
+
+def _like(result: np.ndarray, array):
+    """result as the same kind of array as array, sharing its memory"""
+    namespace = _namespace(array)
+    if namespace is None or not hasattr(namespace, "from_dlpack"):
+        return result
+    return namespace.from_dlpack(result)
+
+
+def _blocks(array: np.ndarray, block_size: int = _BLOCK_SIZE) -> List[np.ndarray]:
+    """Split an array into views of about block_size elements"""
+    array = _as_numpy(array)
+    if array.ndim == 0:
+        return [array.reshape(1)]
+    if array.flags.c_contiguous or array.flags.f_contiguous:
+        flat = array.ravel(order="K")
+        return [
+            flat[start : start + block_size]
+            for start in range(0, flat.size, block_size)
+        ]
+    if array.ndim == 1:
+        return [
+            array[start : start + block_size]
+            for start in range(0, array.size, block_size)
+        ]
+    rows = max(1, block_size // max(1, array[0].size))
+    return [array[start : start + rows] for start in range(0, len(array), rows)]
+
+
+def _paired_blocks(array: np.ndarray, out: np.ndarray, block_size: int = _BLOCK_SIZE):
+    """Split an array and its output into matching views of about block_size elements"""
+    if array.ndim == 0:
+        yield array.reshape(1), out.reshape(1)
+        return
+    for order, flag in (("C", "C_CONTIGUOUS"), ("F", "F_CONTIGUOUS")):
+        if array.flags[flag] and out.flags[flag]:
+            flat_array = array.reshape(-1, order=order)
+            flat_out = out.reshape(-1, order=order)
+            for start in range(0, flat_array.size, block_size):
+                yield (
+                    flat_array[start : start + block_size],
+                    flat_out[start : start + block_size],
+                )
+            return
+    rows = max(1, block_size // max(1, array[0].size))
+    for start in range(0, len(array), rows):
+        yield array[start : start + rows], out[start : start + rows]
+
+
+def _output(array: np.ndarray, out: Optional[np.ndarray], inplace: bool) -> np.ndarray:
+    """
+    The array a transform writes to. Floating point data keeps its dtype and
+    anything else becomes float64.
+    """
+    if inplace:
+        if out is not None:
+            raise ValueError("Only one of out or inplace can be specified")
+        if not np.issubdtype(array.dtype, np.floating):
+            raise TypeError(f"Cannot scale an array of {array.dtype} in place")
+        return array
+    if out is None:
+        dtype = array.dtype if np.issubdtype(array.dtype, np.floating) else np.float64
+        return np.empty(array.shape, dtype=dtype)
+    if out.shape != array.shape:
+        raise ValueError(f"out has shape {out.shape}, expected {array.shape}")
+    return out
+
+
+def _apply_blocked(function, blocks, out: np.ndarray, workers: int = 1) -> np.ndarray:
+    """
+    Call function(source, target) on matching (source, target) blocks, so the
+    intermediate results of a fused operation stay in cache. float16 is
+    computed in a float32 scratch block and rounded once. With more than one
+    worker, runs of blocks are spread over a thread pool.
+    """
+    compute_dtype = np.promote_types(out.dtype, np.float32)
+
+    def apply(task):
+        scratch = None
+        for source, target in task:
+            if compute_dtype == out.dtype:
+                function(source, target)
+                continue
+            if scratch is None or scratch.size < source.size:
+                scratch = np.empty(source.size, dtype=compute_dtype)
+            buffer = scratch[: source.size].reshape(source.shape)
+            function(source, buffer)
+            target[...] = buffer
+
+    if workers is None or workers > 1:
+        blocks = list(blocks)
+        per_task = max(1, _TASK_SIZE // _BLOCK_SIZE)
+        tasks = [
+            blocks[start : start + per_task]
+            for start in range(0, len(blocks), per_task)
+        ]
+        if len(tasks) > 1:
+            with ThreadPoolExecutor(workers) as executor:
+                list(executor.map(apply, tasks))
+            return out
+    apply(blocks)
+    return out
+
+
+def _block_min_max(blocks: List[np.ndarray]):
+    """
+    The minimum and maximum of some blocks, or None if any of them is NaN. The
+    minimum propagates NaN, so it doubles as the NaN check.
+    """
+    data_min = None
+    data_max = None
+    for block in blocks:
+        if block.size == 0:
+            continue
+        block_min = np.min(block)
+        if np.isnan(block_min):
+            return None
+        block_max = np.max(block)
+        data_min = block_min if data_min is None else min(data_min, block_min)
+        data_max = block_max if data_max is None else max(data_max, block_max)
+    return data_min, data_max
+
+
+def _min_max(arrays, workers: Optional[int] = None):
+    """
+    Reduce each array to its minimum and maximum in one blocked pass, spreading
+    large arrays over a thread pool (NumPy releases the GIL while reducing).
+
+    Returns
+    -------
+        a (minimum, maximum) pair per array, or None for arrays containing NaN
+    """
+    tasks = []
+    for array_ in arrays:
+        blocks = _blocks(array_)
+        per_task = max(1, _TASK_SIZE // _BLOCK_SIZE)
+        tasks.append(
+            [
+                blocks[start : start + per_task]
+                for start in range(0, len(blocks), per_task)
+            ]
+        )
+
+    workers = os.cpu_count() if workers is None else workers
+    if workers > 1 and sum(len(array_tasks) for array_tasks in tasks) > 1:
+        with ThreadPoolExecutor(workers) as executor:
+            results = [
+                list(executor.map(_block_min_max, array_tasks)) for array_tasks in tasks
+            ]
+    else:
+        results = [
+            [_block_min_max(blocks) for blocks in array_tasks] for array_tasks in tasks
+        ]
+
+    min_max = []
+    for array_results in results:
+        if any(result is None for result in array_results):
+            min_max.append(None)
+            continue
+        array_results = [result for result in array_results if result[0] is not None]
+        if not array_results:
+            raise ValueError("Cannot fit to a zero-size array")
+        min_max.append(
+            (
+                min(result[0] for result in array_results),
+                max(result[1] for result in array_results),
+            )
+        )
+    return min_max
+
 
 @dataclass
 class FlatMinMaxScalerValues:
@@ -57,43 +268,817 @@ class FlatMinMaxScaler:
             self._feature_range = feature_range
             self._minimum = None
             self._scale_factor = None
+        self._reset()
+
+    def fit(self, *arrays, workers: Optional[int] = None):
+        """
+        Fit the scaler to the minimum and maximum over all the arrays
+
+        Parameters
+        ----------
+        arrays
+            the arrays to fit to
+        workers
+            the number of threads used to reduce the arrays; defaults to the
+            number of CPUs
+        """
+        self._reset()
+        for index, min_max in enumerate(self._reduce(arrays, workers)):
+            if min_max is None:
+                raise ValueError(f"Array {index + 1} contains NaN(s)")
+            self._update(min_max)
+        self._set_scale()
+
+        return self
+
+    def partial_fit(self, array, workers: Optional[int] = None):
+        """
+        Extend the fit with another array, so the data can be fitted a piece
+        at a time. A scaler created from scaler values continues from the
+        range those values were fitted to.
+        """
+        self._resume()
+        (min_max,) = self._reduce([array], workers)
+        if min_max is None:
+            raise ValueError("Array contains NaN(s)")
+        self._update(min_max)
+        self._set_scale()
+
+        return self
 
-    def fit(self, *arrays):
-        data_min = None
-        data_max = None
+    def fit_stream(
+        self,
+        arrays: Iterable[Union[np.ndarray, str, Path]],
+        workers: Optional[int] = None,
+    ):
+        """
+        Fit the scaler to a stream of arrays, reading one at a time
+
+        Parameters
+        ----------
+        arrays
+            arrays (including ``np.memmap``) or paths to ``.npy`` files, which
+            are memory mapped. A generator keeps only the current chunk in
+            memory.
+        workers
+            the number of threads used to reduce each array; defaults to the
+            number of CPUs
+        """
+        self._reset()
         for index, array_ in enumerate(arrays):
-            if np.isnan(array_).any():
+            if isinstance(array_, (str, Path)):
+                array_ = np.load(array_, mmap_mode="r")
+            (min_max,) = self._reduce([array_], workers)
+            if min_max is None:
                 raise ValueError(f"Array {index + 1} contains NaN(s)")
+            self._update(min_max)
+            del array_
 
-            if data_min is None:
-                data_min = np.min(array_)
-            else:
-                data_min = min(data_min, np.min(array_))
+        if not self._fitted():
+            raise ValueError("No arrays to fit to")
+        self._set_scale()
 
-            if data_max is None:
-                data_max = np.max(array_)
-            else:
-                data_max = max(data_max, np.max(array_))
+        return self
+
+    def _reset(self):
+        self._data_min = None
+        self._data_max = None
+
+    def _fitted(self) -> bool:
+        """Whether any data has been seen since the last reset"""
+        return self._data_min is not None
+
+    def _resume(self):
+        """Recover the running state from scaler values, to keep fitting"""
+        if self._data_min is None and self._scale_factor is not None:
+            self._data_min = (
+                self._feature_range[0] - self._minimum
+            ) / self._scale_factor
+            self._data_max = (
+                self._feature_range[1] - self._minimum
+            ) / self._scale_factor
 
+    def _reduce(self, arrays, workers: Optional[int]):
+        return _min_max(arrays, workers)
+
+    def _update(self, min_max):
+        array_min, array_max = min_max
+        if self._data_min is None:
+            self._data_min = array_min
+        else:
+            self._data_min = min(self._data_min, array_min)
+
+        if self._data_max is None:
+            self._data_max = array_max
+        else:
+            self._data_max = max(self._data_max, array_max)
+
+    def _set_scale(self):
+        data_min, data_max = self._fitted_range()
         data_range = data_max - data_min
         self._scale_factor = (
             self._feature_range[1] - self._feature_range[0]
         ) / data_range
         self._minimum = self._feature_range[0] - data_min * self._scale_factor
 
-        return self
+    def _fitted_range(self):
+        """The range of the data mapped onto the feature range"""
+        return self._data_min, self._data_max
+
+    def transform(
+        self,
+        array,
+        out: Optional[np.ndarray] = None,
+        inplace: bool = False,
+        workers: Optional[int] = 1,
+    ) -> np.ndarray:
+        """
+        Scale an array into the feature range
 
-    def transform(self, array):
-        x = array * self._scale_factor
-        x += self._minimum
-        return np.clip(x, self._feature_range[0], self._feature_range[1])
+        Parameters
+        ----------
+        array
+            the array to scale: a NumPy array or memmap, or another CPU array
+            such as a torch tensor, which is worked on through a shared view
+        out
+            an array of the same shape to write the result to
+        inplace
+            overwrite array with the result
+        workers
+            the number of threads to use for large arrays; None uses one per CPU
 
-    def inverse_transform(self, array):
-        x = array - self._minimum
-        x /= self._scale_factor
-        return x
+        Returns
+        -------
+            the scaled array, of the same type as array and with its dtype if
+            it is floating point
+        """
+        self._check_fitted()
+        original, original_out = array, out
+        array = _as_numpy(array)
+        out = _output(array, None if out is None else _as_numpy(out), inplace)
+        dtype = np.promote_types(out.dtype, np.float32)
+        scale_factor, minimum = self._parameters(dtype)
+        stretch, _ = self._stretch(dtype)
+        low = dtype.type(self._feature_range[0])
+        high = dtype.type(self._feature_range[1])
+        clip = np.isfinite(low) or np.isfinite(high)
+
+        def scale(source, target):
+            if stretch is None:
+                np.multiply(source, scale_factor, out=target)
+            else:
+                stretch(source, target)
+                np.multiply(target, scale_factor, out=target)
+            np.add(target, minimum, out=target)
+            if clip:
+                np.clip(target, low, high, out=target)
+
+        _apply_blocked(scale, self._paired_blocks(array, out), out, workers)
+        return self._result(out, original, original_out, inplace)
+
+    def inverse_transform(
+        self,
+        array,
+        out: Optional[np.ndarray] = None,
+        inplace: bool = False,
+        workers: Optional[int] = 1,
+    ) -> np.ndarray:
+        """
+        Undo transform. Takes the same arguments.
+        """
+        self._check_fitted()
+        original, original_out = array, out
+        array = _as_numpy(array)
+        out = _output(array, None if out is None else _as_numpy(out), inplace)
+        dtype = np.promote_types(out.dtype, np.float32)
+        scale_factor, minimum = self._parameters(dtype)
+        _, unstretch = self._stretch(dtype)
+
+        def unscale(source, target):
+            np.subtract(source, minimum, out=target)
+            np.divide(target, scale_factor, out=target)
+            if unstretch is not None:
+                unstretch(target, target)
+
+        _apply_blocked(unscale, self._paired_blocks(array, out), out, workers)
+        return self._result(out, original, original_out, inplace)
+
+    def _check_fitted(self):
+        if self._scale_factor is None or self._minimum is None:
+            raise ValueError("The scaler has not been fitted")
+
+    @staticmethod
+    def _result(out: np.ndarray, array, original_out, inplace: bool):
+        """Return what the caller passed in, or a new array of the input's type"""
+        if inplace:
+            return array
+        if original_out is not None:
+            return original_out
+        return _like(out, array)
+
+    def _stretch(self, dtype: np.dtype):
+        """
+        The functions (source, target) applied before scaling and after
+        unscaling, or None
+        """
+        return None, None
+
+    def _parameters(self, dtype: np.dtype):
+        return dtype.type(self._scale_factor), dtype.type(self._minimum)
+
+    def _paired_blocks(self, array: np.ndarray, out: np.ndarray):
+        return _paired_blocks(array, out)
 
     def scaler_values(self):
         return FlatMinMaxScalerValues(
             self._feature_range, self._minimum, self._scale_factor
         )
+
+
+def _normalise_axes(axis, ndim: int) -> Tuple[int, ...]:
+    axes = (axis,) if isinstance(axis, int) else tuple(axis)
+    for axis_ in axes:
+        if not -ndim <= axis_ < ndim:
+            raise ValueError(f"Axis {axis_} is out of bounds for {ndim} dimensions")
+    return tuple(sorted({axis_ % ndim for axis_ in axes}))
+
+
+def _split_axis(array: np.ndarray, parameter_shape: Tuple[int, ...]) -> Optional[int]:
+    """The first axis the parameters are broadcast along, to block over"""
+    for axis, (size, parameter_size) in enumerate(zip(array.shape, parameter_shape)):
+        if size > 1 and parameter_size == 1:
+            return axis
+    return None
+
+
+def _axis_slices(array: np.ndarray, axis: Optional[int]):
+    if axis is None:
+        yield array
+        return
+    rows = max(1, _BLOCK_SIZE // max(1, array.size // max(1, array.shape[axis])))
+    prefix = (slice(None),) * axis
+    for start in range(0, array.shape[axis], rows):
+        yield array[prefix + (slice(start, start + rows),)]
+
+
+@dataclass
+class AxisMinMaxScalerValues(FlatMinMaxScalerValues):
+    """
+    The values of an AxisMinMaxScaler. minimum and scale_factor are arrays with
+    the shape of the fitted data reduced to size 1 along the non-channel axes.
+    """
+
+    axis: Tuple[int, ...]
+
+
+class AxisMinMaxScaler(FlatMinMaxScaler):
+    """
+    Scales each channel separately, where the channels are the entries along
+    the given axis (or axes):
+        X_std = (X - X.min(others)) / (X.max(others) - X.min(others))
+        X_scaled = X_std * (max - min) + min
+
+    The arrays fitted and transformed must have the same number of dimensions
+    and number of channels.
+    """
+
+    def __init__(self, feature_range=None, axis=-1, scaler_values=None):
+        super().__init__(feature_range, scaler_values)
+        self._axis = scaler_values.axis if scaler_values is not None else axis
+
+    def _reduce(self, arrays, workers: Optional[int]):
+        workers = os.cpu_count() if workers is None else workers
+        min_max = []
+        for array_ in arrays:
+            array_ = _as_numpy(array_)
+            channel_axes = _normalise_axes(self._axis, array_.ndim)
+            reduce_axes = tuple(
+                axis for axis in range(array_.ndim) if axis not in channel_axes
+            )
+            parameter_shape = tuple(
+                size if axis in channel_axes else 1
+                for axis, size in enumerate(array_.shape)
+            )
+
+            def reduce(block):
+                return (
+                    np.min(block, axis=reduce_axes, keepdims=True),
+                    np.max(block, axis=reduce_axes, keepdims=True),
+                )
+
+            blocks = list(_axis_slices(array_, _split_axis(array_, parameter_shape)))
+            if workers > 1 and len(blocks) > 1:
+                with ThreadPoolExecutor(workers) as executor:
+                    results = list(executor.map(reduce, blocks))
+            else:
+                results = [reduce(block) for block in blocks]
+
+            array_min = results[0][0]
+            array_max = results[0][1]
+            for block_min, block_max in results[1:]:
+                np.minimum(array_min, block_min, out=array_min)
+                np.maximum(array_max, block_max, out=array_max)
+            min_max.append(
+                None if np.isnan(array_min).any() else (array_min, array_max)
+            )
+        return min_max
+
+    def _update(self, min_max):
+        array_min, array_max = min_max
+        if self._data_min is None:
+            self._data_min = array_min
+            self._data_max = array_max
+        else:
+            # Broadcasting would quietly stretch one array's channels over another's
+            if array_min.shape != np.shape(self._data_min):
+                raise ValueError(
+                    f"The channels have shape {array_min.shape}, "
+                    f"expected {np.shape(self._data_min)}"
+                )
+            self._data_min = np.minimum(self._data_min, array_min)
+            self._data_max = np.maximum(self._data_max, array_max)
+
+    def _parameters(self, dtype: np.dtype):
+        return (
+            np.asarray(self._scale_factor, dtype=dtype),
+            np.asarray(self._minimum, dtype=dtype),
+        )
+
+    def _paired_blocks(self, array: np.ndarray, out: np.ndarray):
+        axis = _split_axis(array, np.shape(self._scale_factor))
+        return zip(_axis_slices(array, axis), _axis_slices(out, axis))
+
+    def scaler_values(self):
+        return AxisMinMaxScalerValues(
+            self._feature_range, self._minimum, self._scale_factor, self._axis
+        )
+
+
+class QuantileSketch:
+    """
+    A mergeable, bounded-memory summary of a stream of values that answers
+    approximate quantile queries (a KLL-style compactor hierarchy).
+
+    Level h holds values that each stand for 2**h of the original values. When
+    a level grows past capacity it is sorted and every other value, starting at
+    a random offset, is promoted to the next level. Memory is about capacity
+    values per level, so O(capacity * log2(count / capacity)), and the rank
+    error is roughly count * sqrt(levels) / capacity. The minimum and maximum
+    are kept exactly.
+
+    Sketches built from different parts of the data (in other processes, say)
+    can be combined with merge and pickled between them.
+    """
+
+    def __init__(self, capacity: int = 1 << 15, seed: Optional[int] = None):
+        if capacity < 2:
+            raise ValueError("The capacity must be at least 2")
+        self.capacity = capacity
+        self.count = 0
+        self.minimum = None
+        self.maximum = None
+        self._levels: List[np.ndarray] = []
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, array) -> "QuantileSketch":
+        for block in _blocks(array, max(self.capacity, _BLOCK_SIZE)):
+            if block.size == 0:
+                continue
+            block_min = np.min(block)
+            if np.isnan(block_min):
+                raise ValueError("Array contains NaN(s)")
+            block_min = float(block_min)
+            block_max = float(np.max(block))
+
+            self.count += block.size
+            if self.minimum is None:
+                self.minimum = block_min
+                self.maximum = block_max
+            else:
+                self.minimum = min(self.minimum, block_min)
+                self.maximum = max(self.maximum, block_max)
+            self._add(0, block.astype(np.float64).reshape(-1))
+            self._compress()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.minimum = other.minimum
+            self.maximum = other.maximum
+        else:
+            self.minimum = min(self.minimum, other.minimum)
+            self.maximum = max(self.maximum, other.maximum)
+        self.count += other.count
+        for level, values in enumerate(other._levels):
+            self._add(level, values)
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        """
+        The approximate quantile(s) q, between 0 and 1, using the inverted
+        empirical CDF like ``np.quantile(..., method="inverted_cdf")``
+        """
+        if self.count == 0:
+            raise ValueError("The sketch is empty")
+        q = np.asarray(q, dtype=np.float64)
+        if np.any((q < 0) | (q > 1)):
+            raise ValueError("Quantiles must be between 0 and 1")
+
+        values = np.concatenate(self._levels)
+        weights = np.concatenate(
+            [
+                np.full(len(values_), 1 << level, dtype=np.int64)
+                for level, values_ in enumerate(self._levels)
+            ]
+        )
+        order = np.argsort(values, kind="stable")
+        values = values[order]
+        cumulative = np.cumsum(weights[order])
+
+        index = np.searchsorted(cumulative, q * cumulative[-1], side="left")
+        result = values[np.minimum(index, len(values) - 1)]
+        result = np.where(q == 0, self.minimum, result)
+        result = np.where(q == 1, self.maximum, result)
+        return result if result.ndim else result[()]
+
+    def _add(self, level: int, values: np.ndarray):
+        while len(self._levels) <= level:
+            self._levels.append(np.empty(0, dtype=np.float64))
+        self._levels[level] = np.concatenate((self._levels[level], values))
+
+    def _compress(self):
+        level = 0
+        while level < len(self._levels):
+            values = self._levels[level]
+            if len(values) > self.capacity:
+                values = np.sort(values)
+                if len(values) % 2:
+                    # Keep a random value back so the weight stays exact
+                    held = self._rng.integers(len(values))
+                    kept = values[held : held + 1]
+                    values = np.delete(values, held)
+                else:
+                    kept = values[:0]
+                self._levels[level] = kept.copy()
+                self._add(level + 1, values[self._rng.integers(2) :: 2])
+            level += 1
+
+
+@dataclass
+class PercentileScalerValues(FlatMinMaxScalerValues):
+    """
+    The values of a PercentileScaler; minimum and scale_factor map the fitted
+    percentiles onto the feature range
+    """
+
+    percentiles: Tuple[float, float]
+
+
+class PercentileScaler(FlatMinMaxScaler):
+    """
+    Scales the data like FlatMinMaxScaler, but between two percentiles of the
+    data rather than its minimum and maximum, so a few extreme values (RFI, hot
+    pixels) do not squash the rest. Values outside the percentiles are clipped.
+
+    The percentiles come from a QuantileSketch, so fitting needs bounded memory
+    and sketches fitted in parallel can be combined with fit_sketch.
+    """
+
+    def __init__(
+        self,
+        feature_range=None,
+        percentiles: Tuple[float, float] = (0.1, 99.9),
+        scaler_values=None,
+        capacity: int = 1 << 15,
+    ):
+        self._capacity = capacity
+        super().__init__(feature_range, scaler_values)
+        self._percentiles = (
+            scaler_values.percentiles if scaler_values is not None else percentiles
+        )
+
+    @property
+    def sketch(self) -> Optional[QuantileSketch]:
+        return self._sketch
+
+    def fit_sketch(self, sketch: QuantileSketch):
+        """Fit the scaler to a sketch of the data, merged from several workers say"""
+        self._reset()
+        self._update(copy.deepcopy(sketch))
+        self._set_scale()
+        return self
+
+    def _fitted(self) -> bool:
+        return self._sketch is not None
+
+    def _resume(self):
+        if self._sketch is None and self._scale_factor is not None:
+            raise ValueError(
+                "Cannot continue fitting from scaler values, as they do not "
+                "include the sketch"
+            )
+
+    def _reset(self):
+        super()._reset()
+        self._sketch = None
+
+    def _reduce(self, arrays, workers: Optional[int]):
+        sketches = []
+        for array_ in arrays:
+            try:
+                sketches.append(QuantileSketch(self._capacity).update(array_))
+            except ValueError:
+                sketches.append(None)
+        return sketches
+
+    def _update(self, sketch: QuantileSketch):
+        if self._sketch is None:
+            self._sketch = sketch
+        else:
+            self._sketch.merge(sketch)
+
+    def _set_scale(self):
+        self._data_min, self._data_max = self._sketch.quantile(
+            np.asarray(self._percentiles) / 100
+        )
+        super()._set_scale()
+
+    def scaler_values(self):
+        return PercentileScalerValues(
+            self._feature_range,
+            self._minimum,
+            self._scale_factor,
+            self._percentiles,
+        )
+
+
+class RunningStatistics:
+    """
+    The count, mean and sum of squared deviations (M2) of a stream of values.
+    Blocks are combined with Chan et al.'s parallel update, which is
+    numerically stable, and statistics from other workers combine the same way
+    with merge.
+    """
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    @property
+    def variance(self) -> float:
+        """The population variance"""
+        return self.m2 / self.count if self.count else float("nan")
+
+    def update(self, array) -> "RunningStatistics":
+        for block in _blocks(array):
+            if block.size == 0:
+                continue
+            block = block.astype(np.float64, copy=False)
+            mean = np.sum(block) / block.size
+            if np.isnan(mean):
+                raise ValueError("Array contains NaN(s)")
+            deviations = block - mean
+            self._combine(block.size, mean, float(np.vdot(deviations, deviations)))
+        return self
+
+    def merge(self, other: "RunningStatistics") -> "RunningStatistics":
+        if other.count:
+            self._combine(other.count, other.mean, other.m2)
+        return self
+
+    def _combine(self, count: int, mean: float, m2: float):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean = float(self.mean + delta * count / total)
+        self.m2 = float(self.m2 + m2 + delta * delta * self.count * count / total)
+        self.count = total
+
+
+@dataclass
+class StandardScalerValues(FlatMinMaxScalerValues):
+    """
+    The values of a StandardScaler. The statistics are kept so a restored
+    scaler can keep fitting.
+    """
+
+    count: int
+    mean: float
+    variance: float
+
+
+class StandardScaler(FlatMinMaxScaler):
+    """
+    Standardises the data to zero mean and unit variance
+        X_scaled = (X - X.mean()) / X.std()
+
+    The mean and variance are found in one streaming pass, and statistics
+    gathered by separate workers can be combined with fit_statistics.
+    """
+
+    def __init__(self, scaler_values=None):
+        super().__init__(
+            (-np.inf, np.inf) if scaler_values is None else None, scaler_values
+        )
+        self._values = scaler_values
+
+    @property
+    def statistics(self) -> Optional[RunningStatistics]:
+        return self._statistics
+
+    def fit_statistics(self, statistics: RunningStatistics):
+        """Fit the scaler to statistics merged from several workers, say"""
+        self._reset()
+        self._update(
+            RunningStatistics(statistics.count, statistics.mean, statistics.m2)
+        )
+        self._set_scale()
+        return self
+
+    def _reset(self):
+        super()._reset()
+        self._statistics = None
+
+    def _fitted(self) -> bool:
+        return self._statistics is not None
+
+    def _resume(self):
+        if self._statistics is None and self._values is not None:
+            self._statistics = RunningStatistics(
+                self._values.count,
+                self._values.mean,
+                self._values.variance * self._values.count,
+            )
+
+    def _reduce(self, arrays, workers: Optional[int]):
+        statistics = []
+        for array_ in arrays:
+            try:
+                statistics.append(RunningStatistics().update(array_))
+            except ValueError:
+                statistics.append(None)
+        return statistics
+
+    def _update(self, statistics: RunningStatistics):
+        if self._statistics is None:
+            self._statistics = statistics
+        else:
+            self._statistics.merge(statistics)
+
+    def _set_scale(self):
+        if self._statistics is None or self._statistics.count == 0:
+            raise ValueError("Cannot fit to a zero-size array")
+        std = np.sqrt(self._statistics.variance)
+        # Constant data is only centred
+        self._scale_factor = 1 / std if std > 0 else 1.0
+        self._minimum = -self._statistics.mean * self._scale_factor
+
+    def scaler_values(self):
+        self._resume()
+        if not self._fitted():
+            raise ValueError("The scaler has not been fitted")
+        return StandardScalerValues(
+            self._feature_range,
+            self._minimum,
+            self._scale_factor,
+            self._statistics.count,
+            self._statistics.mean,
+            self._statistics.variance,
+        )
+
+
+def _asinh_stretch(softening: float, dtype: np.dtype):
+    inverse_softening = dtype.type(1 / softening)
+    softening = dtype.type(softening)
+
+    def forward(source, target):
+        np.multiply(source, inverse_softening, out=target)
+        np.arcsinh(target, out=target)
+
+    def inverse(source, target):
+        np.sinh(source, out=target)
+        np.multiply(target, softening, out=target)
+
+    return forward, inverse
+
+
+def _log_stretch(offset: float, dtype: np.dtype):
+    offset = dtype.type(offset)
+
+    def forward(source, target):
+        np.add(source, offset, out=target)
+        np.log(target, out=target)
+
+    def inverse(source, target):
+        np.exp(source, out=target)
+        np.subtract(target, offset, out=target)
+
+    return forward, inverse
+
+
+def _power_stretch(exponent: float, dtype: np.dtype):
+    def signed_power(exponent_):
+        exponent_ = dtype.type(exponent_)
+
+        def apply(source, target):
+            negative = np.signbit(source)
+            np.abs(source, out=target)
+            np.power(target, exponent_, out=target)
+            np.negative(target, out=target, where=negative)
+
+        return apply
+
+    return signed_power(exponent), signed_power(1 / exponent)
+
+
+_STRETCHES = {
+    "asinh": _asinh_stretch,
+    "log": _log_stretch,
+    "power": _power_stretch,
+}
+
+
+@dataclass
+class StretchScalerValues(FlatMinMaxScalerValues):
+    """
+    The values of a StretchMinMaxScaler; minimum and scale_factor apply to the
+    stretched data
+    """
+
+    stretch: str
+    parameter: float
+
+
+class StretchMinMaxScaler(FlatMinMaxScaler):
+    """
+    Stretches high dynamic range data and then scales it like FlatMinMaxScaler,
+    in the same blocked pass:
+        "asinh": S(X) = arcsinh(X / parameter)
+        "log": S(X) = log(X + parameter)
+        "power": S(X) = sign(X) * |X| ** parameter
+        X_scaled = (S(X) - S(X.min())) / (S(X.max()) - S(X.min())) * (max - min) + min
+
+    The stretches are monotonic, so fitting finds the minimum and maximum of the
+    raw data exactly as FlatMinMaxScaler does and stretches only those two
+    values. inverse_transform applies the exact inverse of the stretch.
+    """
+
+    def __init__(
+        self,
+        feature_range=None,
+        stretch: str = "asinh",
+        parameter: float = 1.0,
+        scaler_values=None,
+    ):
+        super().__init__(feature_range, scaler_values)
+        if scaler_values is not None:
+            stretch = scaler_values.stretch
+            parameter = scaler_values.parameter
+        if stretch not in _STRETCHES:
+            raise ValueError(
+                f"Unknown stretch {stretch}, expected one of {', '.join(_STRETCHES)}"
+            )
+        if stretch != "log" and parameter <= 0:
+            raise ValueError(f"The {stretch} stretch needs a positive parameter")
+        self._stretch_name = stretch
+        self._stretch_parameter = parameter
+
+    def _stretch(self, dtype: np.dtype):
+        return _STRETCHES[self._stretch_name](self._stretch_parameter, dtype)
+
+    def _apply(self, function, *values):
+        values = np.array(values, dtype=np.float64)
+        function(values, values)
+        return tuple(values)
+
+    def _fitted_range(self):
+        if (
+            self._stretch_name == "log"
+            and self._data_min + self._stretch_parameter <= 0
+        ):
+            raise ValueError(
+                f"The log stretch needs data above {-self._stretch_parameter}, "
+                f"the minimum is {self._data_min}"
+            )
+        forward, _ = self._stretch(np.dtype(np.float64))
+        return self._apply(forward, self._data_min, self._data_max)
+
+    def _resume(self):
+        if self._data_min is None and self._scale_factor is not None:
+            super()._resume()
+            _, inverse = self._stretch(np.dtype(np.float64))
+            self._data_min, self._data_max = self._apply(
+                inverse, self._data_min, self._data_max
+            )
+
+    def scaler_values(self):
+        return StretchScalerValues(
+            self._feature_range,
+            self._minimum,
+            self._scale_factor,
+            self._stretch_name,
+            self._stretch_parameter,
+        )
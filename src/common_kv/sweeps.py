@@ -0,0 +1,124 @@
+#
+#  ICRAR - International Centre for Radio Astronomy Research
+#  UWA - The University of Western Australia
+#
+#  Copyright (c) 2026.
+#  Copyright by UWA (in the framework of the ICRAR)
+#  All rights reserved
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+#  MA 02111-1307  USA
+#
+"""
+Expand hyperparameter sweeps written into a configuration. A mapping with the
+single key "$grid" or "$list" marks a swept value:
+
+    model:
+      learning_rate: {$grid: [0.1, 0.01, 0.001]}
+      layers: {$grid: [2, 4]}
+    data:
+      fold: {$list: [0, 1, 2]}
+      seed: {$list: [10, 11, 12]}
+
+"$grid" values form a cartesian product, while "$list" values advance
+together, so the example expands to 3 * 2 * 3 = 18 configurations.
+"""
+
+import copy
+import itertools
+from typing import Any, Iterator, List, Mapping, Tuple
+
+GRID = "$grid"
+LIST = "$list"
+
+_Sweep = Tuple[Tuple[Any, ...], str, List]
+
+
+def _find_sweeps(node, path: Tuple[Any, ...], sweeps: List[_Sweep]):
+    if not isinstance(node, dict):
+        return
+    if len(node) == 1 and (GRID in node or LIST in node):
+        ((kind, values),) = node.items()
+        if not isinstance(values, list) or not values:
+            location = "/".join(map(str, path)) or "the root"
+            raise ValueError(f"The {kind} sweep at {location} needs a non-empty list")
+        sweeps.append((path, kind, values))
+        return
+    for key, value in node.items():
+        _find_sweeps(value, path + (key,), sweeps)
+
+
+def _sweeps(tree: Mapping) -> Tuple[List[_Sweep], List[_Sweep]]:
+    sweeps: List[_Sweep] = []
+    _find_sweeps(tree, (), sweeps)
+    grids = [sweep for sweep in sweeps if sweep[1] == GRID]
+    lists = [sweep for sweep in sweeps if sweep[1] == LIST]
+    lengths = {len(values) for _, _, values in lists}
+    if len(lengths) > 1:
+        raise ValueError(
+            f"Every {LIST} sweep must have the same length, found {sorted(lengths)}"
+        )
+    return grids, lists
+
+
+def sweep_size(tree: Mapping) -> int:
+    """The number of configurations expand_sweeps yields for tree"""
+    grids, lists = _sweeps(tree)
+    size = len(lists[0][2]) if lists else 1
+    for _, _, values in grids:
+        size *= len(values)
+    return size
+
+
+def expand_sweeps(tree: Mapping) -> Iterator[Any]:
+    """
+    Yield each configuration of the sweeps in a parsed YAML tree, lazily
+
+    Only the mappings above a swept value are copied for each configuration,
+    and the rest of the tree is shared between them, so memory does not grow
+    with the number of configurations. A tree without sweeps is yielded as is.
+    """
+    grids, lists = _sweeps(tree)
+    if not grids and not lists:
+        yield tree
+        return
+
+    paths = [path for path, _, _ in grids + lists]
+    axes = [values for _, _, values in grids]
+    if lists:
+        axes.append(list(zip(*(values for _, _, values in lists))))
+
+    for combination in itertools.product(*axes):
+        values = list(combination[: len(grids)])
+        if lists:
+            values += combination[-1]
+        if paths[0] == ():
+            # The whole document is swept
+            yield values[0]
+            continue
+
+        root = copy.copy(tree)
+        copied = {id(root)}
+        for path, value in zip(paths, values):
+            node = root
+            for key in path[:-1]:
+                child = node[key]
+                if id(child) not in copied:
+                    child = copy.copy(child)
+                    copied.add(id(child))
+                    node[key] = child
+                node = child
+            node[path[-1]] = value
+        yield root
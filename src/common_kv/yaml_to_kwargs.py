@@ -22,11 +22,33 @@
 #  MA 02111-1307  USA
 #
 
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
 from os.path import exists
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Mapping, Optional, Union
 
 from ruamel.yaml import YAML
 
+from .flat_config import FlatConfig
+from .sweeps import expand_sweeps
+
+# The number of parsed files kept in memory by read_yaml(..., cache=True)
+CACHE_SIZE = 32
+
+# The ways read_yaml can parse: "rt" round-trips comments and ordering through
+# ruamel's CommentedMap, "safe" builds plain dicts with the C parser when
+# ruamel.yaml.clib is installed, and is much faster
+LOADERS = ("rt", "safe")
+
+# Part of every cache key, so entries written in an older format are ignored
+_CACHE_FORMAT = 2
+
+_cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+_cache_lock = threading.Lock()
+
 
 def make_hierarchy(yaml_config) -> Dict:
     """
@@ -59,7 +81,93 @@ def make_hierarchy(yaml_config) -> Dict:
     return dictionary
 
 
-def read_yaml(yaml_file: str) -> Dict:
+def _make_yaml(loader: str) -> YAML:
+    if loader not in LOADERS:
+        raise ValueError(f"Unknown loader {loader}, expected one of {LOADERS}")
+    if loader == "rt":
+        return YAML()
+    # ruamel picks the libyaml based CParser when ruamel.yaml.clib is
+    # importable and the pure Python parser when not
+    return YAML(typ="safe")
+
+
+def _default_cache_dir() -> str:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "common_kv", "yaml")
+
+
+def _read_cached(yaml_file: str, cache_dir: Optional[str], loader: str):
+    """The parsed tree of a file, from the cache if it has not changed"""
+    path = os.path.realpath(yaml_file)
+    with open(path, "rb") as file:
+        stat = os.fstat(file.fileno())
+        data = file.read()
+    key = (
+        _CACHE_FORMAT,
+        loader,
+        path,
+        stat.st_mtime_ns,
+        stat.st_size,
+        hashlib.blake2b(data, digest_size=16).hexdigest(),
+    )
+
+    with _cache_lock:
+        payload = _cache.get(key)
+        if payload is not None:
+            _cache.move_to_end(key)
+            return pickle.loads(payload)
+
+    cache_file = None
+    if cache_dir is not None:
+        name = hashlib.blake2b(path.encode(), digest_size=16).hexdigest()
+        cache_file = os.path.join(cache_dir, f"{name}.pickle")
+        try:
+            with open(cache_file, "rb") as file:
+                cached_key, payload = pickle.load(file)
+            if cached_key != key:
+                payload = None
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError):
+            payload = None
+
+    if payload is None:
+        payload = pickle.dumps(
+            _make_yaml(loader).load(data),
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+        if cache_file is not None:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                temporary = f"{cache_file}.{os.getpid()}.{threading.get_ident()}"
+                with open(temporary, "wb") as file:
+                    pickle.dump((key, payload), file, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temporary, cache_file)
+            except OSError:
+                # The cache is only an optimisation
+                pass
+
+    with _cache_lock:
+        _cache[key] = payload
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return pickle.loads(payload)
+
+
+def clear_cache():
+    """Empty the in-process cache of read_yaml"""
+    with _cache_lock:
+        _cache.clear()
+
+
+def read_yaml(
+    yaml_file: str,
+    cache: bool = False,
+    cache_dir: Optional[str] = None,
+    loader: str = "rt",
+    read_only: bool = False,
+) -> Union[Dict, FlatConfig]:
     """
     Read a yaml file and produce a dictionary of tags
 
@@ -67,11 +175,28 @@ def read_yaml(yaml_file: str) -> Dict:
     ----------
     yaml_file: str
         the yaml file to read
+    cache: bool
+        reuse the result of parsing the file before, from an in-process LRU
+        cache or from cache_dir. Entries are keyed by the file's path,
+        modification time, size and a hash of its contents, so an edited file
+        is parsed again. Every call returns a fresh copy.
+    cache_dir: str
+        where to keep parsed files between processes, as pickles. Defaults to
+        $XDG_CACHE_HOME/common_kv/yaml when cache is set; only point it at a
+        directory you trust.
+    loader: str
+        "rt" (round trip, the default) keeps ruamel's CommentedMap and
+        CommentedSeq values, with their comments. "safe" returns plain dicts
+        and lists and uses the C parser from ruamel.yaml.clib when it is
+        installed, falling back to pure Python when it is not.
+    read_only: bool
+        return a FlatConfig, which has the same keys and values but stores the
+        tree once and finds children without scanning every key
 
     Returns
     -------
     Dict
-        A dictionary of the data in the form
+        A dictionary (or FlatConfig) of the data in the form
         {
             'key1/key2': blah1,
             'key1/key3': blah2
@@ -82,13 +207,60 @@ def read_yaml(yaml_file: str) -> Dict:
     if not exists(yaml_file):
         raise FileNotFoundError(f"Could not find the file: {yaml_file}")
 
-    with open(yaml_file, "r") as yaml_file:
-        yaml = YAML()
-        yaml_config = yaml.load(yaml_file)
+    if cache:
+        yaml_config = _read_cached(
+            yaml_file,
+            _default_cache_dir() if cache_dir is None else cache_dir,
+            loader,
+        )
+    else:
+        with open(yaml_file, "r") as yaml_file:
+            yaml = _make_yaml(loader)
+            yaml_config = yaml.load(yaml_file)
 
+    if read_only:
+        return FlatConfig(yaml_config)
     return make_hierarchy(yaml_config)
 
 
+def load_all(
+    yaml_file: str,
+    loader: str = "rt",
+    read_only: bool = False,
+    expand: bool = False,
+) -> Iterator[Union[Dict, FlatConfig]]:
+    """
+    Read a yaml file of several documents, one at a time
+
+    Parameters
+    ----------
+    yaml_file: str
+        the yaml file to read
+    loader: str
+        "rt" or "safe", as for read_yaml
+    read_only: bool
+        yield FlatConfig rather than dictionaries, as for read_yaml
+    expand: bool
+        expand the "$grid" and "$list" sweeps in each document (see
+        common_kv.sweeps), yielding one dictionary per configuration
+
+    Returns
+    -------
+        A generator of dictionaries in the form of read_yaml's, parsing each
+        document only when it is needed
+    """
+    if not exists(yaml_file):
+        raise FileNotFoundError(f"Could not find the file: {yaml_file}")
+
+    flatten = FlatConfig if read_only else make_hierarchy
+    with open(yaml_file, "r") as file:
+        for document in _make_yaml(loader).load_all(file):
+            if document is None:
+                continue
+            for yaml_config in expand_sweeps(document) if expand else [document]:
+                yield flatten(yaml_config)
+
+
 def check_keys(*args, **kwargs):
     """
     Check the keys exist.
@@ -132,7 +304,7 @@ def get_children(tag: str, **kwargs) -> Optional[List]:
     if tag == "":
         return [key for key in kwargs.keys() if key.find("/") == -1]
 
-    if tag not in kwargs or not isinstance(kwargs[tag], dict):
+    if tag not in kwargs or not isinstance(kwargs[tag], Mapping):
         return None
 
     return [key for key in kwargs[tag].keys() if key.find("/") == -1]
@@ -22,7 +22,14 @@
 #  MA 02111-1307  USA
 #
 
-from common_kv.yaml_to_kwargs import read_yaml, get_children
+import os
+import pickle
+
+import pytest
+
+from common_kv import yaml_to_kwargs
+from common_kv import FlatConfig
+from common_kv.yaml_to_kwargs import check_keys, get_children, make_hierarchy, read_yaml
 
 
 def test_01():
@@ -85,3 +92,109 @@ def test_03d():
     assert "common" in children
     assert "test2" in children
     assert "test3" in children
+
+
+def test_04_cache(tmp_path, monkeypatch):
+    yaml_to_kwargs.clear_cache()
+    path = tmp_path / "config.yaml"
+    path.write_text("a:\n  b: 1\n  c: [1, 2]\n")
+    cache_dir = tmp_path / "cache"
+
+    parses = []
+    original_load = yaml_to_kwargs.YAML.load
+
+    def load(self, stream):
+        parses.append(stream)
+        return original_load(self, stream)
+
+    monkeypatch.setattr(yaml_to_kwargs.YAML, "load", load)
+
+    config = read_yaml(str(path), cache=True, cache_dir=str(cache_dir))
+    assert config == read_yaml(str(path))
+    assert len(parses) == 2
+
+    # Repeat loads come from memory, as a fresh copy
+    config["a/b"] = 99
+    assert read_yaml(str(path), cache=True, cache_dir=str(cache_dir))["a/b"] == 1
+    assert len(parses) == 2
+
+    # Another process would find it on disk
+    yaml_to_kwargs.clear_cache()
+    assert read_yaml(str(path), cache=True, cache_dir=str(cache_dir))["a/b"] == 1
+    assert len(parses) == 2
+    assert len(os.listdir(cache_dir)) == 1
+
+    # A change with the same size and modification time is still noticed
+    stat = path.stat()
+    path.write_text("a:\n  b: 2\n  c: [1, 2]\n")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert read_yaml(str(path), cache=True, cache_dir=str(cache_dir))["a/b"] == 2
+    assert len(parses) == 3
+
+    # A corrupt cache file is ignored
+    yaml_to_kwargs.clear_cache()
+    (cache_file,) = cache_dir.iterdir()
+    cache_file.write_bytes(b"not a pickle")
+    assert read_yaml(str(path), cache=True, cache_dir=str(cache_dir))["a/b"] == 2
+    with open(cache_file, "rb") as file:
+        assert pickle.load(file)[0][2] == os.path.realpath(path)
+
+
+def test_05_loaders():
+    round_trip = read_yaml("test_01.yaml")
+    safe = read_yaml("test_01.yaml", loader="safe")
+
+    assert safe == round_trip
+    assert not any(
+        type(value).__module__.startswith("ruamel") for value in safe.values()
+    )
+    assert get_children("test3", **safe) == get_children("test3", **round_trip)
+
+    with pytest.raises(ValueError):
+        read_yaml("test_01.yaml", loader="fast")
+
+
+def test_06_flat_config():
+    config = read_yaml("test_01.yaml")
+    flat = read_yaml("test_01.yaml", read_only=True)
+
+    assert isinstance(flat, FlatConfig)
+    assert flat == config
+    assert list(flat) == list(config)
+    assert len(flat) == len(config)
+    assert flat.to_dict() == config
+    assert dict(**flat) == config
+    for key, value in config.items():
+        assert flat[key] == value
+        if isinstance(value, dict):
+            assert list(flat[key]) == list(value)
+
+    for tag in ["", "test3", "test3/child4", "not a tag"]:
+        assert flat.get_children(tag) == get_children(tag, **config)
+        assert get_children(tag, **flat) == get_children(tag, **config)
+    assert flat["test3"].get_children() == get_children("", **config["test3"])
+
+    flat.check_keys("test1", "test3/child1")
+    with pytest.raises(ValueError, match="missing"):
+        flat.check_keys("test1", "test9")
+    with pytest.raises(ValueError, match="missing"):
+        check_keys("test9", **flat)
+
+    with pytest.raises(TypeError):
+        flat["test1"] = 1
+    assert "not a tag" not in flat
+    with pytest.raises(KeyError):
+        flat["not a tag"]
+
+
+def test_07_flat_config_deep():
+    tree = {"a": {"b": {"c": {"d": 1, "e": [1, 2]}, "f": 2}, "g": {}}, "h": 3}
+    flat = FlatConfig(tree)
+
+    assert flat == make_hierarchy(tree)
+    assert list(flat["a/b"]) == ["c", "c/d", "c/e", "f"]
+    assert flat["a"]["b/c/e"] == [1, 2]
+    assert flat["a/g"] == {}
+    assert flat["a/b"].get_children("c") == ["d", "e"]
+    # One entry per path, where make_hierarchy repeats them in every ancestor
+    assert len(flat._index.values) == len(make_hierarchy(tree)) == 8
@@ -21,7 +21,31 @@
 #  Foundation, Inc., 59 Temple Place, Suite 330, Boston,
 #  MA 02111-1307  USA
 #
-from common_kv.monitoring import monitor
+import io
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from common_kv.monitoring import (
+    CsvSink,
+    FakeGpuBackend,
+    JsonLinesSink,
+    MemorySample,
+    Monitor,
+    PrometheusSink,
+    ProcfsBackend,
+    PsutilBackend,
+    Sample,
+    monitor,
+)
+from common_kv.monitoring.sampler import _AdaptiveInterval
 
 
 def test_01():
@@ -76,3 +100,309 @@ def test_03():
     assert "----CPU----" in log_string[0]
     assert "----Processes----" in log_string[0]
 
+
+def test_04():
+    log_string = []
+
+    monitor_ = Monitor(
+        sleep=0.1, log_function=log_string.append, monitor_options=["memory"]
+    )
+    assert monitor_.latest is None
+
+    monitor_.start()
+    time.sleep(0.55)
+    monitor_.stop()
+
+    assert not monitor_.running
+    assert 4 <= len(log_string) <= 7
+    assert isinstance(monitor_.latest, Sample)
+    assert monitor_.latest.memory.total > 0
+
+    # Nothing else is logged once stopped
+    count = len(log_string)
+    time.sleep(0.2)
+    assert len(log_string) == count
+
+
+def test_05():
+    log_string = []
+
+    with Monitor(
+        sleep=60, log_function=log_string.append, monitor_options=["cpu"]
+    ) as monitor_:
+        assert monitor_.running
+
+    # The stop must not wait for the next tick
+    assert not monitor_.running
+    assert len(log_string) == 1
+    assert "----CPU----" in log_string[0]
+
+
+def test_06():
+    stream = io.StringIO()
+    monitor_ = Monitor(
+        sinks=[JsonLinesSink(stream)], monitor_options=["memory", "cpu", "network"]
+    )
+    sample = monitor_.sample()
+    monitor_.sample()
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 2
+    record = json.loads(lines[0])
+    assert record["memory"]["total"] == sample.memory.total
+    assert len(record["cpu"]) == len(sample.cpu)
+    assert record["battery"] is None
+    assert record["processes"] is None
+
+
+def test_07():
+    stream = io.StringIO()
+    sample = Monitor(
+        sinks=[CsvSink(stream)], monitor_options=["memory", "cpu"]
+    ).sample()
+
+    rows = [line.split(",") for line in stream.getvalue().splitlines()]
+    assert rows[0] == ["timestamp", "metric", "label", "value"]
+    metrics = {(row[1], row[2]): float(row[3]) for row in rows[1:]}
+    assert metrics[("memory_total_bytes", "")] == sample.memory.total
+    assert ("cpu_percent", "0") in metrics
+
+
+def test_08():
+    sink = PrometheusSink()
+    Monitor(sinks=[sink], monitor_options=["memory", "cpu"]).sample()
+
+    lines = sink.text.splitlines()
+    assert "# TYPE common_kv_memory_total_bytes gauge" in lines
+    assert any(line.startswith('common_kv_cpu_percent{cpu="0"} ') for line in lines)
+
+    # All the samples of one metric must be grouped after its TYPE line
+    type_lines = [line for line in lines if line.startswith("# TYPE")]
+    assert len(type_lines) == len(set(type_lines))
+
+
+@pytest.mark.skipif(not ProcfsBackend.available(), reason="Needs /proc")
+def test_09():
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    procfs = ProcfsBackend()
+    psutil_ = PsutilBackend()
+    try:
+        assert procfs.memory().total == psutil_.memory().total
+        assert len(procfs.cpu_percent()) == len(psutil_.cpu_percent())
+        assert {nic.name for nic in procfs.network()} >= {"lo"}
+
+        time.sleep(0.1)
+        pids = {process.pid for process in procfs.processes()}
+        assert pids == {process.pid for process in psutil_.processes()}
+        assert child.pid in pids
+
+        # The dead child is dropped on the next tick
+        child.kill()
+        child.wait()
+        assert child.pid not in {process.pid for process in procfs.processes()}
+    finally:
+        child.kill()
+        child.wait()
+        procfs.close()
+
+
+@pytest.mark.parametrize("backend", ["psutil", "procfs"])
+def test_10(backend):
+    monitor_ = Monitor(sinks=[], monitor_options=["network", "disk"], backend=backend)
+    first = monitor_.sample()
+    assert all(nic.bytes_sent_per_second == 0 for nic in first.network)
+
+    # Push some traffic through the loopback interface
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    client = socket.create_connection(server.getsockname())
+    connection, _ = server.accept()
+    payload = b"x" * 1_000_000
+    client.sendall(payload)
+    received = 0
+    while received < len(payload):
+        received += len(connection.recv(65536))
+    for socket_ in (client, connection, server):
+        socket_.close()
+
+    time.sleep(0.05)
+    second = monitor_.sample()
+    loopback = next(nic for nic in second.network if nic.name == "lo")
+    assert loopback.bytes_sent_per_second > 0
+    assert loopback.packets_recv_per_second > 0
+    assert second.disk is not None
+    monitor_.close()
+
+
+@pytest.mark.parametrize("backend", ["psutil", "procfs"])
+def test_11(backend):
+    command = [sys.executable, "-c", "import time; time.sleep(60)"]
+    children = [subprocess.Popen(command)]
+    monitor_ = Monitor(
+        sinks=[], monitor_options=["processes", "process_memory"], backend=backend
+    )
+    try:
+        time.sleep(0.1)
+        sample = monitor_.sample()
+        assert {process.pid for process in sample.processes} >= {children[0].pid}
+
+        # New workers are picked up and dead ones dropped
+        children.append(subprocess.Popen(command))
+        children[0].kill()
+        children[0].wait()
+        time.sleep(0.1)
+        sample = monitor_.sample()
+        pids = {process.pid for process in sample.processes}
+        assert children[1].pid in pids
+        assert children[0].pid not in pids
+
+        me = next(process for process in sample.processes if process.pid == os.getpid())
+        assert me.rss > 0
+        assert me.num_fds > 0
+        if os.path.exists("/proc/self/smaps_rollup"):
+            assert 0 < me.uss <= me.pss <= me.rss
+
+        tree = sample.process_tree
+        assert tree.count == len(sample.processes)
+        assert tree.rss == sum(process.rss for process in sample.processes)
+        assert tree.pss == sum(process.pss for process in sample.processes)
+    finally:
+        for child in children:
+            child.kill()
+            child.wait()
+        monitor_.close()
+
+
+def test_12():
+    monitor_ = Monitor(sleep=2, sinks=[], monitor_options=["memory", "cpu"])
+    first = monitor_.sample()
+    second = monitor_.sample()
+
+    assert first.monitor.wall_time >= first.monitor.cpu_time >= 0
+    assert first.monitor.cpu_fraction == 0
+    assert second.monitor.interval == 2
+    assert 0 < second.monitor.cpu_fraction < 1
+
+
+def test_13():
+    def memory_sample(used):
+        return Sample(
+            timestamp=0,
+            memory=MemorySample(
+                total=1000, used=used, available=1000 - used, percent=0
+            ),
+        )
+
+    adaptive = _AdaptiveInterval(min_sleep=0.5, max_sleep=8, overhead_budget=0.01)
+    assert adaptive.update(memory_sample(100), 0.001) == 8
+
+    # Memory climbing quickly halves the interval down to min_sleep
+    intervals = [
+        adaptive.update(memory_sample(used), 0.001)
+        for used in (200, 300, 400, 500, 600, 700)
+    ]
+    assert intervals == [4, 2, 1, 0.5, 0.5, 0.5]
+
+    # Steady memory backs off again up to max_sleep
+    intervals = [adaptive.update(memory_sample(700), 0.001) for _ in range(8)]
+    assert intervals[0] == 0.75
+    assert intervals[-1] == 8
+
+    # An expensive tick is never sampled faster than the budget allows
+    assert adaptive.update(memory_sample(900), 0.1) == 10
+
+
+def test_14():
+    monitor_ = Monitor(
+        sleep=0.05,
+        sinks=[],
+        monitor_options=["memory", "cpu"],
+        adaptive=True,
+        min_sleep=0.01,
+        overhead_budget=1e-6,
+    )
+    monitor_.sample()
+    # The budget forces a much longer interval than sleep
+    assert monitor_.interval > 1
+
+    with pytest.raises(ValueError):
+        Monitor(sinks=[], adaptive=True, overhead_budget=0)
+
+
+def test_15(monkeypatch):
+    unraisable = []
+    monkeypatch.setattr(sys, "unraisablehook", unraisable.append)
+
+    # A process that has already exited leaves nothing to open in /proc
+    child = subprocess.Popen([sys.executable, "-c", "pass"])
+    child.wait()
+    procfs = ProcfsBackend()
+    try:
+        assert procfs._read_stat(child.pid) is None
+        assert procfs._read_stat(999999) is None
+    finally:
+        procfs.close()
+    assert unraisable == []
+
+
+def test_16():
+    stream = io.StringIO()
+    sample = Monitor(
+        sinks=[JsonLinesSink(stream)], monitor_options=["battery"]
+    ).sample()
+
+    # Without a battery the sample holds NaN, which is not valid JSON
+    record = json.loads(stream.getvalue(), parse_constant=pytest.fail)
+    if math.isnan(sample.battery):
+        assert record["battery"] is None
+    else:
+        assert record["battery"] == sample.battery
+
+
+def test_17(monkeypatch):
+    errors = []
+    monkeypatch.setattr(threading, "excepthook", errors.append)
+    gpu_backend = FakeGpuBackend()
+    with Monitor(
+        sleep=0.01,
+        sinks=[],
+        monitor_options=["memory", "gpu"],
+        backend="procfs",
+        gpu_backend=gpu_backend,
+    ) as monitor_:
+        while monitor_.latest is None:
+            time.sleep(0.01)
+
+    # Leaving the block releases the backends as well as stopping the thread
+    assert not monitor_.running
+    assert gpu_backend.closed
+    assert monitor_._backend._stat.fd is None
+
+    # The same monitor can be used again, once per epoch say
+    first = monitor_.latest
+    with monitor_:
+        deadline = time.monotonic() + 5
+        while monitor_.latest is first and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert monitor_.running
+    assert monitor_.latest is not first
+    assert errors == []
+
+
+@pytest.mark.parametrize("backend", ["psutil", "procfs"])
+def test_18(backend):
+    stream = io.StringIO()
+    monitor_ = Monitor(
+        sinks=[CsvSink(stream)], monitor_options=["processes"], backend=backend
+    )
+    sample = monitor_.sample()
+    monitor_.close()
+
+    # Without process_memory the costly per-process memory is not read
+    me = next(process for process in sample.processes if process.pid == os.getpid())
+    assert me.rss > 0
+    assert me.uss is None and me.pss is None and me.num_fds is None
+    assert sample.process_tree.pss is None
+    assert "process_pss_bytes" not in stream.getvalue()
+    assert "process_rss_bytes" in stream.getvalue()
@@ -0,0 +1,165 @@
+#
+#  ICRAR - International Centre for Radio Astronomy Research
+#  UWA - The University of Western Australia
+#
+#  Copyright (c) 2026.
+#  Copyright by UWA (in the framework of the ICRAR)
+#  All rights reserved
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+#  MA 02111-1307  USA
+#
+import os
+import time
+
+import pytest
+
+from common_kv.monitoring import (
+    AgentSink,
+    Collector,
+    DiskSample,
+    FakeGpuBackend,
+    GpuSample,
+    Monitor,
+    NodeSample,
+    Sample,
+    format_cluster_view,
+)
+from common_kv.monitoring import collector as collector_module
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError
+        time.sleep(0.01)
+
+
+def make_monitor(agent, gpu_load=0.5):
+    gpu = GpuSample(
+        id=0,
+        load=gpu_load,
+        memory_used=1000,
+        memory_free=3000,
+        memory_total=4000,
+        temperature=50.0,
+    )
+    return Monitor(
+        sinks=[agent],
+        monitor_options=["cpu", "memory", "network", "processes", "gpu"],
+        gpu_backend=FakeGpuBackend([gpu]),
+    )
+
+
+def test_encode_decode():
+    node_sample = NodeSample(
+        node="node-01",
+        timestamp=1234.5,
+        steps=42,
+        compute_time=12.25,
+        wait_time=0.5,
+        cpu_count=4,
+        cpu_percent=12.5,
+        memory_used=10,
+        memory_total=20,
+        process_pss=30,
+        gpus=[GpuSample(0, 0.25, 100, 300, 400, 60.0)],
+    )
+    frame = node_sample.encode()
+    assert NodeSample.decode(frame[4:]) == node_sample
+
+
+@pytest.mark.parametrize("transport", ["tcp", "unix"])
+def test_several_agents(transport, tmp_path):
+    address = ("127.0.0.1", 0) if transport == "tcp" else str(tmp_path / "sock")
+    with Collector(address) as collector:
+        agents = [AgentSink(collector.address, node=f"node-{i}") for i in range(3)]
+        monitors = [make_monitor(agent) for agent in agents]
+
+        for monitor_ in monitors:
+            monitor_.sample()
+        time.sleep(0.05)
+        # The ranks run in lockstep, but node-1 computes for longest and the
+        # others wait for it in the collectives
+        for index, (agent, monitor_) in enumerate(zip(agents, monitors)):
+            agent.step(10, compute_time=3.0 if index == 1 else 1.0, wait_time=0.5)
+            monitor_.sample()
+
+        wait_for(lambda: len(collector.view().step_rates) == 3)
+        view = collector.view()
+
+        assert sorted(view.nodes) == ["node-0", "node-1", "node-2"]
+        assert view.slowest == "node-1"
+        assert view.compute_times["node-1"] == pytest.approx(0.3)
+        assert view.compute_times["node-0"] == pytest.approx(0.1)
+        assert view.wait_times["node-2"] == pytest.approx(0.05)
+        assert view.stale == []
+        assert view.total.steps == 30
+        assert len(view.total.gpus) == 3
+        assert view.total.memory_total == 3 * monitors[0].latest.memory.total
+        assert view.nodes["node-0"].cpu_count == len(monitors[0].latest.cpu)
+
+        text = format_cluster_view(view)
+        assert "SLOWEST" in text
+        assert "node-2" in text
+
+        for agent in agents:
+            agent.close()
+
+        # Nodes that stop reporting are flagged and left out of the totals
+        view = collector.view(now=time.time() + 60)
+        assert view.stale == ["node-0", "node-1", "node-2"]
+        assert view.slowest is None
+        assert view.total.memory_total == 0
+
+
+def test_agent_without_collector():
+    agent = AgentSink(("127.0.0.1", 1), node="lonely", timeout=0.1)
+    make_monitor(agent).sample()
+    assert agent.dropped == 1
+
+
+def test_physical_disks(tmp_path):
+    sys_block = tmp_path / "block"
+    sys_block.mkdir()
+    devices = {
+        "sda": "devices/pci0000:00/block/sda",
+        "nvme0n1": "devices/pci0000:00/nvme/block/nvme0n1",
+        "cciss!c0d0": "devices/pci0000:00/cciss/block/cciss!c0d0",
+        "dm-0": "devices/virtual/block/dm-0",
+        "md0": "devices/virtual/block/md0",
+        "loop0": "devices/virtual/block/loop0",
+    }
+    for name, target in devices.items():
+        (tmp_path / target).mkdir(parents=True)
+        os.symlink(tmp_path / target, sys_block / name)
+
+    physical = collector_module._physical_disks(str(sys_block))
+    assert physical == {"sda", "nvme0n1", "cciss/c0d0"}
+    assert collector_module._physical_disks(str(tmp_path / "missing")) is None
+
+
+def test_disk_totals(monkeypatch):
+    monkeypatch.setattr(collector_module, "_physical_disks", lambda: {"sda", "sdb"})
+    # The partitions and the RAID and LVM devices over them carry the same bytes
+    names = ["sda", "sda1", "sda2", "sdb", "sdb1", "md0", "dm-0"]
+    sample = Sample(
+        timestamp=0,
+        disk=[DiskSample(name, 100.0, 10.0, 1.0, 1.0) for name in names],
+    )
+    node_sample = NodeSample.from_sample(sample, "node")
+    assert node_sample.disk_read_bytes_per_second == 200
+    assert node_sample.disk_write_bytes_per_second == 20
@@ -0,0 +1,89 @@
+import os
+import time
+
+import pytest
+from ruamel.yaml import YAMLError
+
+from common_kv import ConfigWatcher
+from common_kv.config_watcher import MISSING
+
+
+def write(path, text, mtime_ns=None):
+    path.write_text(text)
+    # Make sure the change is visible even within the clock's resolution
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, mtime_ns or stat.st_mtime_ns + 1_000_000))
+
+
+def test_poll(tmp_path):
+    path = tmp_path / "service.yaml"
+    write(path, "inference:\n  batch_size: 8\n  threads: 2\nname: a\n")
+    messages = []
+    watcher = ConfigWatcher(str(path), log_function=messages.append)
+    assert watcher.config["inference/batch_size"] == 8
+
+    everything = []
+    batches = []
+    watcher.subscribe(lambda changes, config: everything.append(changes))
+    unsubscribe = watcher.subscribe(
+        lambda changes, config: batches.append(config["inference/batch_size"]),
+        keys=["inference"],
+    )
+
+    assert watcher.poll() is None
+
+    # Touched but unchanged: read but not parsed or reported
+    write(path, path.read_text())
+    assert watcher.poll() is None
+
+    write(path, "inference:\n  batch_size: 16\n  threads: 2\nname: a\nnew: 1\n")
+    changes = watcher.poll()
+    assert changes == {"inference/batch_size": (8, 16), "new": (MISSING, 1)}
+    assert everything == [changes]
+    assert batches == [16]
+
+    write(path, "inference:\n  batch_size: 16\n  threads: 2\nname: b\n")
+    assert watcher.poll() == {"name": ("a", "b"), "new": (1, MISSING)}
+    assert batches == [16]
+
+    # A broken file keeps the current config
+    write(path, "inference: [\n")
+    assert watcher.poll() is None
+    assert watcher.config["name"] == "b"
+    assert "Could not parse" in messages[-1]
+
+    unsubscribe()
+    write(path, "inference:\n  batch_size: 32\n  threads: 2\nname: b\n")
+    assert watcher.poll() == {"inference/batch_size": (16, 32)}
+    assert batches == [16]
+    assert len(everything) == 3
+
+
+def test_broken_at_start(tmp_path):
+    path = tmp_path / "service.yaml"
+    write(path, "inference: [\n")
+    messages = []
+    # Only reloads fall back to the current config; the first load has none
+    with pytest.raises(YAMLError):
+        ConfigWatcher(str(path), log_function=messages.append)
+    assert messages == []
+
+
+def test_thread(tmp_path):
+    path = tmp_path / "service.yaml"
+    write(path, "threads: 2\n")
+    watcher = ConfigWatcher(str(path), interval=0.01)
+    seen = []
+    watcher.subscribe(lambda changes, config: seen.append(config["threads"]))
+
+    with watcher:
+        assert watcher.running
+        with pytest.raises(RuntimeError):
+            watcher.start()
+        write(path, "threads: 4\n")
+        deadline = time.monotonic() + 5
+        while not seen and time.monotonic() < deadline:
+            time.sleep(0.01)
+    assert not watcher.running
+    assert seen == [4]
+    assert watcher.config["threads"] == 4
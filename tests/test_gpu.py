@@ -0,0 +1,192 @@
+#
+#  ICRAR - International Centre for Radio Astronomy Research
+#  UWA - The University of Western Australia
+#
+#  Copyright (c) 2026.
+#  Copyright by UWA (in the framework of the ICRAR)
+#  All rights reserved
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+#  MA 02111-1307  USA
+#
+import math
+import sys
+import types
+from collections import namedtuple
+
+import pytest
+
+from common_kv.monitoring import (
+    FakeGpuBackend,
+    GpuProcessSample,
+    GpuSample,
+    Monitor,
+    NvmlBackend,
+    PrometheusSink,
+    get_gpu_backend,
+)
+
+
+def make_gpu(id_, load):
+    return GpuSample(
+        id=id_,
+        load=load,
+        memory_used=2 * 1024**3,
+        memory_free=14 * 1024**3,
+        memory_total=16 * 1024**3,
+        temperature=55.0,
+    )
+
+
+def test_fake_backend():
+    backend = FakeGpuBackend(
+        [make_gpu(0, 0.5), make_gpu(1, 0.25)],
+        [GpuProcessSample(pid=1234, gpu_id=1, memory_used=1024**3, utilisation=40.0)],
+    )
+    log_string = []
+    monitor_ = Monitor(
+        log_function=log_string.append, monitor_options=["gpu"], gpu_backend=backend
+    )
+    sample = monitor_.sample()
+
+    assert [gpu.load for gpu in sample.gpu] == [0.5, 0.25]
+    assert sample.gpu_processes[0].pid == 1234
+    assert "50.0%" in log_string[0]
+    assert "----GPU Processes----" in log_string[0]
+
+    # The backend can be changed between ticks
+    backend.gpu_samples = []
+    backend.process_samples = []
+    monitor_.sample()
+    assert "No GPU data found" in log_string[1]
+
+    monitor_.close()
+    assert backend.closed
+
+
+def test_fake_backend_metrics():
+    sink = PrometheusSink()
+    Monitor(
+        sinks=[sink],
+        monitor_options=["gpu"],
+        gpu_backend=FakeGpuBackend(
+            [make_gpu(0, 0.5)],
+            [GpuProcessSample(pid=99, gpu_id=0, memory_used=10, utilisation=5.0)],
+        ),
+    ).sample()
+
+    assert 'common_kv_gpu_load_ratio{gpu="0"} 0.5' in sink.text
+    assert 'common_kv_gpu_process_memory_used_bytes{gpu_pid="0:99"} 10' in sink.text
+
+
+def test_no_gpu_backend_without_gpu_option():
+    monitor_ = Monitor(sinks=[], monitor_options=["memory"], gpu_backend="nvml")
+    assert monitor_.sample().gpu is None
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        get_gpu_backend("cuda")
+
+
+@pytest.fixture
+def fake_pynvml(monkeypatch):
+    """A minimal stand-in for the pynvml module with one GPU"""
+    pynvml = types.ModuleType("pynvml")
+    pynvml.NVMLError = type("NVMLError", (Exception,), {})
+    pynvml.NVML_TEMPERATURE_GPU = 0
+    pynvml.calls = []
+    Utilisation = namedtuple("Utilisation", "gpu memory")
+    Memory = namedtuple("Memory", "total free used")
+    Running = namedtuple("Running", "pid usedGpuMemory")
+    ProcessUtilisation = namedtuple("ProcessUtilisation", "pid smUtil timeStamp")
+
+    def get_process_utilization(handle, last_seen):
+        if last_seen >= 200:
+            raise pynvml.NVMLError("Not Found")
+        return [ProcessUtilisation(4321, 75, 200)]
+
+    pynvml.nvmlInit = lambda: pynvml.calls.append("init")
+    pynvml.nvmlShutdown = lambda: pynvml.calls.append("shutdown")
+    pynvml.nvmlDeviceGetCount = lambda: 1
+    pynvml.nvmlDeviceGetHandleByIndex = lambda index: f"handle{index}"
+    pynvml.nvmlDeviceGetUtilizationRates = lambda handle: Utilisation(30, 10)
+    pynvml.nvmlDeviceGetMemoryInfo = lambda handle: Memory(100, 60, 40)
+    pynvml.nvmlDeviceGetTemperature = lambda handle, sensor: 60
+    pynvml.nvmlDeviceGetComputeRunningProcesses = lambda handle: [Running(4321, 40)]
+    pynvml.nvmlDeviceGetGraphicsRunningProcesses = lambda handle: []
+    pynvml.nvmlDeviceGetProcessUtilization = get_process_utilization
+    monkeypatch.setitem(sys.modules, "pynvml", pynvml)
+    return pynvml
+
+
+def test_nvml_backend(fake_pynvml):
+    backend = get_gpu_backend("auto")
+    assert isinstance(backend, NvmlBackend)
+
+    gpus = backend.gpus()
+    assert gpus == [
+        GpuSample(
+            id=0,
+            load=0.3,
+            memory_used=40,
+            memory_free=60,
+            memory_total=100,
+            temperature=60.0,
+        )
+    ]
+    assert backend.processes() == [
+        GpuProcessSample(pid=4321, gpu_id=0, memory_used=40, utilisation=75.0)
+    ]
+    # No new utilisation samples on the next tick
+    assert backend.processes()[0].utilisation == 0.0
+
+    backend.close()
+    backend.close()
+    assert fake_pynvml.calls == ["init", "shutdown"]
+
+    # A closed backend initialises NVML again on the next tick
+    assert backend.gpus() == gpus
+    assert fake_pynvml.calls == ["init", "shutdown", "init"]
+    backend.close()
+
+
+def test_nvml_unsupported_queries(fake_pynvml):
+    def not_supported(*args):
+        raise fake_pynvml.NVMLError("Not Supported")
+
+    # As on a MIG-enabled GPU
+    fake_pynvml.nvmlDeviceGetUtilizationRates = not_supported
+    fake_pynvml.nvmlDeviceGetTemperature = not_supported
+    fake_pynvml.nvmlDeviceGetComputeRunningProcesses = not_supported
+    monitor_ = Monitor(sinks=[], monitor_options=["gpu"], gpu_backend="nvml")
+    sample = monitor_.sample()
+    monitor_.close()
+
+    gpu = sample.gpu[0]
+    assert math.isnan(gpu.load)
+    assert math.isnan(gpu.temperature)
+    assert gpu.memory_used == 40
+    assert sample.gpu_processes == []
+
+
+def test_nvml_enumeration_fails(fake_pynvml):
+    def not_found(*args):
+        raise fake_pynvml.NVMLError("GPU is lost")
+
+    fake_pynvml.nvmlDeviceGetHandleByIndex = not_found
+    with pytest.raises(RuntimeError):
+        NvmlBackend()
+    assert fake_pynvml.calls == ["init", "shutdown"]
@@ -0,0 +1,113 @@
+#
+#  ICRAR - International Centre for Radio Astronomy Research
+#  UWA - The University of Western Australia
+#
+#  Copyright (c) 2026.
+#  Copyright by UWA (in the framework of the ICRAR)
+#  All rights reserved
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+#  MA 02111-1307  USA
+#
+import numpy as np
+import pytest
+
+from common_kv.monitoring import History, MemorySample, Monitor, Sample
+
+
+def make_sample(timestamp, used, cpu):
+    return Sample(
+        timestamp=timestamp,
+        memory=MemorySample(total=100, used=used, available=100 - used, percent=used),
+        cpu=cpu,
+    )
+
+
+def test_query_and_summary():
+    history = History(capacity=10)
+    for second in range(5):
+        history(make_sample(1000.0 + second, used=10 * second, cpu=[second, 2.0]))
+
+    assert len(history) == 5
+    timestamps, values = history.query("memory_used_bytes")
+    assert np.array_equal(timestamps, [1000, 1001, 1002, 1003, 1004])
+    assert np.array_equal(values, [0, 10, 20, 30, 40])
+
+    summary = history.summary("memory_used_bytes", start=1001, end=1003)
+    assert summary == {"min": 10, "mean": 20, "max": 30, "count": 3}
+
+    _, cpu_1 = history.query("cpu_percent", label="1")
+    assert np.array_equal(cpu_1, [2, 2, 2, 2, 2])
+
+
+def test_ring_buffer_wraps():
+    history = History(capacity=4)
+    for second in range(10):
+        history(make_sample(float(second), used=second, cpu=[0.0]))
+
+    assert len(history) == 4
+    timestamps, values = history.query("memory_used_bytes")
+    assert np.array_equal(timestamps, [6, 7, 8, 9])
+    assert np.array_equal(values, [6, 7, 8, 9])
+
+
+def test_downsample():
+    history = History(capacity=100)
+    for second in range(60):
+        history(make_sample(float(second), used=second, cpu=[0.0]))
+
+    result = history.downsample("memory_used_bytes", interval=10)
+    assert np.array_equal(result["time"], [0, 10, 20, 30, 40, 50])
+    assert np.array_equal(result["min"], [0, 10, 20, 30, 40, 50])
+    assert np.array_equal(result["max"], [9, 19, 29, 39, 49, 59])
+    assert np.allclose(result["mean"], [4.5, 14.5, 24.5, 34.5, 44.5, 54.5])
+    assert np.array_equal(result["count"], [10] * 6)
+
+
+def test_columns_are_recycled():
+    history = History(capacity=3, max_columns=2)
+    history.record(0.0, [(("a", ""), 1.0), (("b", ""), 2.0)])
+    history.record(1.0, [(("c", ""), 3.0)])
+    assert history.dropped == 1
+
+    # Once "a" has aged out of the window its column is reused
+    history.record(2.0, [])
+    history.record(3.0, [(("c", ""), 4.0)])
+    assert sorted(history.keys()) == [("b", ""), ("c", "")]
+    _, values = history.query("c")
+    assert np.array_equal(values, [np.nan, np.nan, 4.0], equal_nan=True)
+
+
+def test_memory_mapped(tmp_path):
+    path = str(tmp_path / "history")
+    history = History(capacity=8, path=path)
+    for second in range(3):
+        history(make_sample(float(second), used=second, cpu=[0.0]))
+    history.flush()
+
+    values = np.load(f"{path}.values.npy", mmap_mode="r")
+    assert values.shape == (8, 512)
+    assert np.array_equal(history.query("memory_used_bytes")[1], [0, 1, 2])
+
+
+def test_as_monitor_sink():
+    history = History(capacity=16)
+    monitor_ = Monitor(sinks=[history], monitor_options=["memory", "cpu"])
+    monitor_.sample()
+    monitor_.sample()
+
+    summary = history.summary("memory_total_bytes")
+    assert summary["count"] == 2
+    assert summary["max"] == pytest.approx(monitor_.latest.memory.total, rel=1e-6)
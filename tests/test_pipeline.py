@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from common_kv.pipeline import transform_files
+from common_kv.scalers import AxisMinMaxScaler, FlatMinMaxScaler
+
+
+def test_transform_files(tmp_path):
+    rng = np.random.default_rng(0)
+    arrays = [
+        rng.normal(size=(100, 30)).astype(np.float32),
+        rng.normal(size=(7, 30)).astype(np.float32),
+        rng.integers(-3, 3, size=(50, 30)),
+    ]
+    inputs = []
+    for index, array in enumerate(arrays):
+        inputs.append(tmp_path / f"in_{index}.npy")
+        np.save(inputs[-1], array)
+    outputs = [tmp_path / f"out_{index}.npy" for index in range(len(arrays))]
+
+    scaler = FlatMinMaxScaler((0, 1)).fit_stream(inputs)
+    reports = []
+    results = transform_files(
+        scaler,
+        inputs,
+        outputs,
+        chunk_bytes=1000,
+        workers=3,
+        progress=lambda done, total: reports.append((done, total)),
+    )
+
+    total = sum(array.nbytes for array in arrays)
+    assert reports[-1] == (total, total)
+    assert [done for done, _ in reports] == sorted(done for done, _ in reports)
+    for array, result, output in zip(arrays, results, outputs):
+        saved = np.load(output)
+        assert saved.dtype == (np.float32 if array.dtype == np.float32 else np.float64)
+        np.testing.assert_array_equal(saved, scaler.transform(array))
+        np.testing.assert_array_equal(result, saved)
+
+    # And back again, from memory maps into preallocated arrays
+    restored = [np.empty(array.shape) for array in arrays]
+    transform_files(scaler, results, restored, inverse=True, chunk_bytes=4096)
+    for array, result in zip(arrays, restored):
+        assert np.allclose(result, array, atol=1e-5)
+
+
+def test_transform_files_errors(tmp_path):
+    scaler = FlatMinMaxScaler((0, 1)).fit(np.arange(10.0))
+    with pytest.raises(ValueError, match="2 inputs but 1 outputs"):
+        transform_files(scaler, [np.ones(3), np.ones(3)], [tmp_path / "a.npy"])
+
+    channels = AxisMinMaxScaler((0, 1), axis=0).fit(np.arange(6.0).reshape(3, 2))
+    with pytest.raises(ValueError, match="first axis"):
+        transform_files(channels, [np.ones((3, 2))], [tmp_path / "b.npy"])
+
+    with pytest.raises(TypeError):
+        transform_files(scaler, [np.ones(3)], [np.empty(3, dtype=int)], dtype=int)
@@ -0,0 +1,96 @@
+import json
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from common_kv.monitoring import RegionProfiler, profile_region
+
+
+def test_context_manager():
+    profiler = RegionProfiler()
+    for _ in range(3):
+        with profile_region("sleep", profiler=profiler):
+            time.sleep(0.01)
+
+    (region,) = profiler.summary()
+    assert region["name"] == "sleep"
+    assert region["count"] == 3
+    assert region["wall_total"] >= 0.03
+    assert region["wall_min"] <= region["wall_mean"] <= region["wall_max"]
+    # Sleeping costs next to no CPU
+    assert region["cpu_total"] < region["wall_total"]
+
+
+def test_decorator():
+    profiler = RegionProfiler()
+
+    @profile_region("named", profiler=profiler)
+    def named(value):
+        return value * 2
+
+    def bare(value):
+        return value + 1
+
+    bare = profile_region(bare, profiler=profiler)
+
+    assert named(2) == 4
+    assert bare(2) == 3
+    assert bare(3) == 4
+    counts = {region["name"]: region["count"] for region in profiler.summary()}
+    assert counts == {"named": 1, "test_decorator.<locals>.bare": 2}
+
+
+def test_exception_is_recorded_and_raised():
+    profiler = RegionProfiler()
+    with pytest.raises(KeyError):
+        with profiler.region("fails"):
+            raise KeyError("x")
+    assert profiler.summary()[0]["count"] == 1
+
+
+def test_threads():
+    profiler = RegionProfiler()
+
+    def work():
+        for _ in range(1000):
+            with profiler.region("tick"):
+                pass
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert profiler.summary()[0]["count"] == 4000
+
+
+def test_trace_memory_nested():
+    profiler = RegionProfiler(trace_memory=True)
+    with profiler.region("outer"):
+        with profiler.region("inner"):
+            array = np.ones(1 << 20, dtype=np.uint8)
+            del array
+        small = bytearray(1 << 10)
+        del small
+
+    peaks = {region["name"]: region["traced_peak_max"] for region in profiler.summary()}
+    assert peaks["inner"] >= 1 << 20
+    # The inner region's peak is also the outer region's
+    assert peaks["outer"] >= peaks["inner"]
+
+
+def test_export_and_reset():
+    profiler = RegionProfiler()
+    with profiler.region("a"):
+        pass
+    with profiler.region("b"):
+        time.sleep(0.01)
+
+    assert [region["name"] for region in json.loads(profiler.to_json())] == ["b", "a"]
+    table = profiler.format_table()
+    assert "Region" in table and "b" in table
+
+    profiler.reset()
+    assert profiler.summary() == []
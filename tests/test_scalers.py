@@ -24,7 +24,20 @@
 import numpy as np
 import pytest
 
-from common_kv.scalers import FlatMinMaxScaler, FlatMinMaxScalerValues
+from common_kv.scalers import (
+    AxisMinMaxScaler,
+    AxisMinMaxScalerValues,
+    FlatMinMaxScaler,
+    FlatMinMaxScalerValues,
+    PercentileScaler,
+    PercentileScalerValues,
+    QuantileSketch,
+    RunningStatistics,
+    StandardScaler,
+    StandardScalerValues,
+    StretchMinMaxScaler,
+    StretchScalerValues,
+)
 
 
 @pytest.mark.parametrize(
@@ -161,3 +174,412 @@ def test_inverse_min_max_scaler(expected, test_data, minimum, scale_factor):
 
     assert np.allclose(result, expected)
 
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+@pytest.mark.parametrize(
+    "array",
+    [
+        np.random.default_rng(1).normal(size=(600, 700)).astype(np.float32),
+        np.random.default_rng(2).normal(size=(300, 200, 9))[:, ::3],
+        np.asfortranarray(np.random.default_rng(3).normal(size=(900, 500))),
+        np.random.default_rng(4).integers(-50, 50, size=(1 << 17)),
+    ],
+)
+def test_blocked_fit_matches_numpy(array, workers):
+    scaler = FlatMinMaxScaler((0, 1)).fit(array, workers=workers)
+    data_min = np.min(array)
+    scale_factor = 1 / (np.max(array) - data_min)
+
+    assert scaler.scaler_values().scale_factor == scale_factor
+    assert scaler.scaler_values().minimum == 0 - data_min * scale_factor
+
+
+def test_blocked_fit_finds_late_nan():
+    array = np.zeros(1 << 20, dtype=np.float32)
+    array[-1] = np.nan
+    with pytest.raises(ValueError, match="Array 2 contains NaN"):
+        FlatMinMaxScaler((0, 1)).fit(np.ones(3), array)
+
+
+def test_partial_fit_and_fit_stream(tmp_path):
+    rng = np.random.default_rng(5)
+    chunks = [rng.normal(scale=index + 1, size=(50, 40)) for index in range(6)]
+    expected = FlatMinMaxScaler((0, 1)).fit(*chunks).scaler_values()
+
+    partial = FlatMinMaxScaler((0, 1))
+    for chunk in chunks:
+        partial.partial_fit(chunk)
+    assert partial.scaler_values() == expected
+
+    paths = []
+    for index, chunk in enumerate(chunks):
+        paths.append(tmp_path / f"{index}.npy")
+        np.save(paths[-1], chunk)
+    streamed = FlatMinMaxScaler((0, 1)).fit_stream(path for path in paths)
+    assert streamed.scaler_values() == expected
+
+    # Continue from saved values
+    resumed = FlatMinMaxScaler(scaler_values=partial.scaler_values())
+    resumed.partial_fit(np.array([100.0]))
+    values = resumed.scaler_values()
+    data_min = np.min(chunks)
+    assert np.isclose(values.scale_factor, 1 / (100 - data_min))
+    assert np.isclose(values.minimum, -data_min * values.scale_factor)
+
+    with pytest.raises(ValueError, match="Array 2 contains NaN"):
+        FlatMinMaxScaler((0, 1)).fit_stream(iter([chunks[0], np.array([np.nan])]))
+
+
+@pytest.mark.parametrize("dtype", [np.float16, np.float32, np.float64])
+def test_transform_preserves_dtype(dtype):
+    rng = np.random.default_rng(6)
+    fit_data = rng.normal(size=(300, 400))
+    scaler = FlatMinMaxScaler((-1, 1)).fit(fit_data)
+    array = fit_data.astype(dtype)
+
+    result = scaler.transform(array)
+    assert result.dtype == dtype
+    assert np.allclose(result, scaler.transform(fit_data), atol=1e-2)
+
+    # Non-contiguous input with a preallocated output
+    out = np.empty((300, 200), dtype=dtype)
+    assert scaler.transform(array[:, ::2], out=out) is out
+    np.testing.assert_array_equal(out, result[:, ::2])
+
+    inverse = scaler.inverse_transform(result)
+    assert inverse.dtype == dtype
+    assert np.allclose(inverse, fit_data, atol=5e-2)
+
+    copy = array.copy()
+    assert scaler.transform(copy, inplace=True) is copy
+    np.testing.assert_array_equal(copy, result)
+    scaler.inverse_transform(copy, inplace=True)
+    np.testing.assert_array_equal(copy, inverse)
+
+
+def test_transform_in_place_errors():
+    scaler = FlatMinMaxScaler((0, 1)).fit(np.arange(10))
+    assert scaler.transform(np.arange(10)).dtype == np.float64
+    with pytest.raises(TypeError):
+        scaler.transform(np.arange(10), inplace=True)
+    with pytest.raises(ValueError):
+        scaler.transform(np.arange(10.0), out=np.empty(5))
+
+
+@pytest.mark.parametrize("axis", [1, -1, (1, 3)])
+def test_axis_min_max_scaler(axis):
+    rng = np.random.default_rng(7)
+    # Channels with very different ranges
+    array = rng.normal(size=(40, 4, 30, 3)) * np.array([1, 10, 100, 1000])[
+        None, :, None, None
+    ]
+    array = array.astype(np.float32)
+    channel_axes = (axis,) if isinstance(axis, int) else axis
+    reduce_axes = tuple(
+        index for index in range(4) if index not in [a % 4 for a in channel_axes]
+    )
+
+    scaler = AxisMinMaxScaler((0, 1), axis=axis).fit(array)
+    data_min = array.min(axis=reduce_axes, keepdims=True)
+    data_max = array.max(axis=reduce_axes, keepdims=True)
+    expected = (array - data_min) / (data_max - data_min)
+
+    result = scaler.transform(array)
+    assert result.dtype == np.float32
+    assert np.allclose(result, expected, atol=1e-6)
+    assert np.allclose(result.min(axis=reduce_axes), 0)
+    assert np.allclose(result.max(axis=reduce_axes), 1)
+
+    partial = AxisMinMaxScaler((0, 1), axis=axis)
+    for chunk in np.array_split(array, 7):
+        partial.partial_fit(chunk)
+    np.testing.assert_array_equal(partial.scaler_values().minimum, scaler._minimum)
+
+    values = scaler.scaler_values()
+    assert isinstance(values, AxisMinMaxScalerValues)
+    restored = AxisMinMaxScaler(scaler_values=values)
+    assert np.allclose(restored.inverse_transform(result), array, rtol=1e-4, atol=1e-2)
+
+    restored.transform(array, inplace=True)
+    np.testing.assert_array_equal(array, result)
+
+
+def test_axis_min_max_scaler_nan():
+    array = np.ones((10, 3))
+    array[4, 2] = np.nan
+    with pytest.raises(ValueError, match="Array 1 contains NaN"):
+        AxisMinMaxScaler((0, 1), axis=1).fit(array)
+
+
+def test_quantile_sketch():
+    rng = np.random.default_rng(8)
+    array = rng.normal(size=1_000_000)
+    quantiles = [0, 0.001, 0.25, 0.5, 0.999, 1]
+
+    # Exact while nothing has been compacted
+    small = QuantileSketch(capacity=1 << 12).update(array[:1000])
+    np.testing.assert_array_equal(
+        small.quantile(quantiles),
+        np.quantile(array[:1000], quantiles, method="inverted_cdf"),
+    )
+
+    sketch = QuantileSketch(seed=0).update(array)
+    assert sketch.count == array.size
+    assert sum(len(level) for level in sketch._levels) < 1 << 18
+    ranks = np.searchsorted(np.sort(array), sketch.quantile(quantiles)) / array.size
+    assert np.allclose(ranks, quantiles, atol=5e-4)
+
+    parts = [QuantileSketch(seed=index) for index in range(4)]
+    for part, chunk in zip(parts, np.array_split(array, 4)):
+        part.update(chunk)
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+    assert merged.count == array.size
+    assert merged.minimum == array.min() and merged.maximum == array.max()
+    ranks = np.searchsorted(np.sort(array), merged.quantile(quantiles)) / array.size
+    assert np.allclose(ranks, quantiles, atol=5e-4)
+
+
+def test_percentile_scaler():
+    rng = np.random.default_rng(9)
+    array = rng.uniform(0, 1, size=200_000)
+    array[:10] = 1e6  # a few spikes
+
+    scaler = PercentileScaler((0, 1), percentiles=(1, 99)).fit(array)
+    result = scaler.transform(array)
+    assert np.isclose(np.mean(result[10:] == 0), 0.01, atol=2e-3)
+    assert np.isclose(np.mean(result == 1), 0.01, atol=2e-3)
+    assert np.all(result[:10] == 1)
+
+    values = scaler.scaler_values()
+    assert isinstance(values, PercentileScalerValues)
+    restored = PercentileScaler(scaler_values=values)
+    np.testing.assert_array_equal(restored.transform(array), result)
+    with pytest.raises(ValueError):
+        restored.partial_fit(array)
+
+    sketches = [QuantileSketch().update(chunk) for chunk in np.array_split(array, 3)]
+    for sketch in sketches[1:]:
+        sketches[0].merge(sketch)
+    merged = PercentileScaler((0, 1), percentiles=(1, 99)).fit_sketch(sketches[0])
+    assert np.isclose(merged.scaler_values().minimum, values.minimum, atol=1e-2)
+    assert np.isclose(
+        merged.scaler_values().scale_factor, values.scale_factor, rtol=1e-2
+    )
+
+
+def test_running_statistics():
+    rng = np.random.default_rng(10)
+    # A large offset loses precision with the naive sum of squares
+    array = 1e8 + rng.normal(size=(500, 700))
+
+    statistics = RunningStatistics().update(array)
+    assert statistics.count == array.size
+    assert np.isclose(statistics.mean, array.mean(), rtol=1e-15)
+    assert np.isclose(statistics.variance, array.var(), rtol=1e-9)
+
+    parts = [RunningStatistics().update(chunk) for chunk in np.array_split(array, 5)]
+    merged = RunningStatistics()
+    for part in parts:
+        merged.merge(part)
+    assert merged.count == statistics.count
+    assert np.isclose(merged.mean, statistics.mean, rtol=1e-15)
+    assert np.isclose(merged.variance, statistics.variance, rtol=1e-9)
+
+
+def test_standard_scaler():
+    rng = np.random.default_rng(11)
+    array = (5 + 3 * rng.normal(size=(400, 300))).astype(np.float32)
+
+    scaler = StandardScaler().fit(array)
+    result = scaler.transform(array)
+    assert result.dtype == np.float32
+    assert np.isclose(result.mean(dtype=np.float64), 0, atol=1e-5)
+    assert np.isclose(result.std(dtype=np.float64), 1, atol=1e-5)
+    assert np.allclose(scaler.inverse_transform(result), array, atol=1e-4)
+
+    values = scaler.scaler_values()
+    assert isinstance(values, StandardScalerValues)
+    assert values.count == array.size
+
+    # Resume from saved values and from merged worker statistics
+    resumed = StandardScaler(scaler_values=values).partial_fit(array[:100])
+    combined = StandardScaler().fit(array, array[:100])
+    assert np.isclose(resumed.scaler_values().mean, combined.scaler_values().mean)
+    assert np.isclose(
+        resumed.scaler_values().variance, combined.scaler_values().variance
+    )
+
+    statistics = RunningStatistics()
+    for chunk in np.array_split(array, 3):
+        statistics.merge(RunningStatistics().update(chunk))
+    merged = StandardScaler().fit_statistics(statistics)
+    assert np.isclose(merged.scaler_values().scale_factor, values.scale_factor)
+
+    with pytest.raises(ValueError, match="Array 1 contains NaN"):
+        StandardScaler().fit(np.array([1.0, np.nan]))
+
+
+@pytest.mark.parametrize(
+    "stretch, parameter, function",
+    [
+        ("asinh", 0.5, lambda x: np.arcsinh(x / 0.5)),
+        ("log", 1.0, lambda x: np.log(x + 1.0)),
+        ("power", 0.5, lambda x: np.sign(x) * np.abs(x) ** 0.5),
+    ],
+)
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_stretch_min_max_scaler(stretch, parameter, function, dtype):
+    rng = np.random.default_rng(12)
+    array = rng.lognormal(sigma=3, size=(200, 300))
+    if stretch != "log":
+        array *= rng.choice([-1, 1], size=array.shape)
+    array = array.astype(dtype)
+
+    scaler = StretchMinMaxScaler((0, 1), stretch=stretch, parameter=parameter)
+    scaler.fit(array)
+    stretched = function(array.astype(np.float64))
+    expected = (stretched - stretched.min()) / (stretched.max() - stretched.min())
+
+    result = scaler.transform(array)
+    assert result.dtype == dtype
+    assert np.allclose(result, expected, atol=1e-5)
+    rtol = 1e-4 if dtype == np.float32 else 1e-10
+    assert np.allclose(scaler.inverse_transform(result), array, rtol=rtol, atol=rtol)
+
+    values = scaler.scaler_values()
+    assert isinstance(values, StretchScalerValues)
+    restored = StretchMinMaxScaler(scaler_values=values)
+    copy = array.copy()
+    restored.transform(copy, inplace=True, workers=4)
+    np.testing.assert_array_equal(copy, result)
+
+    # Fitting a piece at a time, resuming from the saved values
+    resumed = StretchMinMaxScaler(scaler_values=values).partial_fit(array[:10])
+    assert np.allclose(resumed.scaler_values().minimum, values.minimum)
+    assert np.allclose(resumed.scaler_values().scale_factor, values.scale_factor)
+
+
+def test_stretch_min_max_scaler_errors():
+    with pytest.raises(ValueError, match="Unknown stretch"):
+        StretchMinMaxScaler((0, 1), stretch="cube")
+    with pytest.raises(ValueError, match="log stretch"):
+        StretchMinMaxScaler((0, 1), stretch="log").fit(np.array([-2.0, 3.0]))
+
+
+def test_array_api_arrays():
+    xp = pytest.importorskip("array_api_strict")
+    array = xp.asarray(np.linspace(-2, 2, 50, dtype=np.float32).reshape(5, 10))
+    scaler = FlatMinMaxScaler((0, 1)).fit(array)
+    assert scaler.scaler_values() == FlatMinMaxScaler((0, 1)).fit(
+        np.linspace(-2, 2, 50, dtype=np.float32)
+    ).scaler_values()
+
+    result = scaler.transform(array)
+    assert type(result) is type(array)
+    assert result.dtype == xp.float32
+
+    assert scaler.transform(array, inplace=True) is array
+    np.testing.assert_array_equal(np.from_dlpack(array), np.from_dlpack(result))
+
+
+def test_torch_tensors():
+    torch = pytest.importorskip("torch")
+    tensor = torch.linspace(-2, 2, 50, dtype=torch.float32).reshape(5, 10)
+    scaler = StandardScaler().fit(tensor)
+
+    result = scaler.transform(tensor)
+    assert isinstance(result, torch.Tensor)
+    assert result.dtype == torch.float32
+    assert abs(float(result.mean())) < 1e-6
+
+    # In place, sharing the tensor's memory
+    pointer = tensor.data_ptr()
+    assert scaler.transform(tensor, inplace=True) is tensor
+    assert tensor.data_ptr() == pointer
+    assert torch.equal(tensor, result)
+    scaler.inverse_transform(tensor, inplace=True)
+    assert torch.allclose(tensor, torch.linspace(-2, 2, 50).reshape(5, 10), atol=1e-6)
+
+
+def test_standard_scaler_fit_stream(tmp_path):
+    rng = np.random.default_rng(13)
+    chunks = [rng.normal(loc=index, size=(100, 20)) for index in range(5)]
+    paths = []
+    for index, chunk in enumerate(chunks):
+        paths.append(tmp_path / f"{index}.npy")
+        np.save(paths[-1], chunk)
+
+    streamed = StandardScaler().fit_stream(path for path in paths)
+    expected = StandardScaler().fit(*chunks)
+    assert streamed.scaler_values().count == sum(chunk.size for chunk in chunks)
+    assert np.isclose(streamed.scaler_values().mean, expected.scaler_values().mean)
+    assert np.isclose(
+        streamed.scaler_values().variance, expected.scaler_values().variance
+    )
+
+    with pytest.raises(ValueError, match="No arrays"):
+        StandardScaler().fit_stream([])
+    with pytest.raises(ValueError, match="not been fitted"):
+        StandardScaler().scaler_values()
+
+
+def test_percentile_scaler_fit_stream():
+    rng = np.random.default_rng(14)
+    chunks = [rng.normal(loc=index, size=50_000) for index in range(6)]
+    array = np.sort(np.concatenate(chunks))
+    capacity = 1 << 12
+
+    def fitted_ranks(scaler):
+        values = scaler.scaler_values()
+        low = (0 - values.minimum) / values.scale_factor
+        high = (1 - values.minimum) / values.scale_factor
+        return np.searchsorted(array, [low, high]) / array.size
+
+    streamed = PercentileScaler((0, 1), percentiles=(1, 99), capacity=capacity)
+    streamed.fit_stream(chunk for chunk in chunks)
+    fitted = PercentileScaler((0, 1), percentiles=(1, 99), capacity=capacity)
+    fitted.fit(*chunks)
+
+    # Both are within the sketch's rank error of the exact percentiles
+    sketch = streamed.sketch
+    levels = len(sketch._levels)
+    error = np.sqrt(levels) / capacity * 4
+    assert sketch.count == array.size
+    assert np.allclose(fitted_ranks(streamed), [0.01, 0.99], atol=error)
+    assert np.allclose(fitted_ranks(fitted), [0.01, 0.99], atol=error)
+    assert np.allclose(fitted_ranks(streamed), fitted_ranks(fitted), atol=2 * error)
+
+
+@pytest.mark.parametrize(
+    "scaler",
+    [
+        FlatMinMaxScaler((0, 1)),
+        AxisMinMaxScaler((0, 1)),
+        PercentileScaler((0, 1)),
+        StandardScaler(),
+    ],
+)
+def test_unfitted_scaler(scaler):
+    array = np.arange(6, dtype=np.float32).reshape(2, 3)
+    with pytest.raises(ValueError, match="not been fitted"):
+        scaler.transform(array)
+    with pytest.raises(ValueError, match="not been fitted"):
+        scaler.inverse_transform(array)
+
+
+def test_axis_min_max_scaler_channels():
+    with pytest.raises(ValueError, match="channels"):
+        AxisMinMaxScaler((0, 1)).fit(np.ones((4, 3)), 5 * np.ones((4, 1)))
+
+    scaler = AxisMinMaxScaler((0, 1)).fit(np.arange(6.0).reshape(2, 3))
+    with pytest.raises(ValueError, match="channels"):
+        scaler.partial_fit(np.ones((4, 2)))
+
+    resumed = AxisMinMaxScaler(scaler_values=scaler.scaler_values())
+    with pytest.raises(ValueError, match="channels"):
+        resumed.partial_fit(np.ones((4, 1)))
+    resumed.partial_fit(np.full((4, 3), 10.0))
+    assert np.allclose(resumed.inverse_transform(np.ones((1, 3))), 10)
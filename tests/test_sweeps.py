@@ -0,0 +1,71 @@
+import pytest
+
+from common_kv import FlatConfig, expand_sweeps, load_all, sweep_size
+
+SWEEP = """\
+model:
+  learning_rate: {$grid: [0.1, 0.01, 0.001]}
+  layers: {$grid: [2, 4]}
+  name: net
+data:
+  fold: {$list: [0, 1, 2]}
+  seed: {$list: [10, 11, 12]}
+"""
+
+
+def test_expand_sweeps():
+    from ruamel.yaml import YAML
+
+    tree = YAML(typ="safe").load(SWEEP)
+    assert sweep_size(tree) == 18
+
+    configs = list(expand_sweeps(tree))
+    assert len(configs) == 18
+    combinations = {
+        (
+            config["model"]["learning_rate"],
+            config["model"]["layers"],
+            config["data"]["fold"],
+            config["data"]["seed"],
+        )
+        for config in configs
+    }
+    assert len(combinations) == 18
+    assert all(seed == fold + 10 for _, _, fold, seed in combinations)
+    assert all(config["model"]["name"] == "net" for config in configs)
+    # The original is untouched
+    assert tree["model"]["layers"] == {"$grid": [2, 4]}
+
+    # Lazily: the first of 10**10 configurations needs none of the others
+    huge = {f"key_{index}": {"$grid": list(range(10))} for index in range(10)}
+    assert sweep_size(huge) == 10**10
+    assert next(expand_sweeps(huge)) == {f"key_{index}": 0 for index in range(10)}
+    assert sweep_size({"a": {"$grid": list(range(1000))}, "b": 1}) == 1000
+
+    assert list(expand_sweeps({"a": 1})) == [{"a": 1}]
+    with pytest.raises(ValueError, match="same length"):
+        list(expand_sweeps({"a": {"$list": [1, 2]}, "b": {"$list": [1]}}))
+    with pytest.raises(ValueError, match="non-empty list"):
+        list(expand_sweeps({"a": {"$grid": []}}))
+
+
+@pytest.mark.parametrize("loader", ["rt", "safe"])
+def test_load_all(tmp_path, loader):
+    path = tmp_path / "runs.yaml"
+    path.write_text("a:\n  b: 1\n---\na:\n  b: 2\n---\n" + SWEEP)
+
+    configs = load_all(str(path), loader=loader)
+    assert next(configs) == {"a": {"b": 1}, "a/b": 1}
+    assert next(configs)["a/b"] == 2
+    # The sweep is one document when not expanded
+    assert next(configs)["model/layers/$grid"] == [2, 4]
+    assert next(configs, None) is None
+
+    expanded = list(load_all(str(path), loader=loader, read_only=True, expand=True))
+    assert len(expanded) == 2 + 18
+    assert all(isinstance(config, FlatConfig) for config in expanded)
+    assert {config["model/learning_rate"] for config in expanded[2:]} == {
+        0.1,
+        0.01,
+        0.001,
+    }